@@ -1,8 +1,42 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Location, Post, Comment, ImageJob, StoredImage
 
 admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Post)
 admin.site.register(Comment)
+
+
+class ImageJobInline(admin.TabularInline):
+    model = ImageJob
+    extra = 0
+    can_delete = False
+    readonly_fields = ('status', 'attempts', 'error', 'created_at',
+                       'started_at', 'finished_at')
+
+
+@admin.register(StoredImage)
+class StoredImageAdmin(admin.ModelAdmin):
+    list_display = ('name', 'refcount', 'width', 'height', 'size', 'variants',
+                    'created_at')
+    search_fields = ('name',)
+    readonly_fields = ('name', 'refcount', 'variants', 'width', 'height',
+                       'size', 'placeholder', 'created_at')
+    inlines = (ImageJobInline,)
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image', 'status', 'attempts', 'created_at',
+                    'finished_at')
+    list_filter = ('status',)
+    search_fields = ('image__name',)
+    readonly_fields = ('image', 'status', 'attempts', 'error',
+                       'created_at', 'started_at', 'finished_at')
+    actions = ('retry',)
+
+    @admin.action(description='Повторить обработку')
+    def retry(self, request, queryset):
+        queryset.exclude(status=ImageJob.RUNNING).update(
+            status=ImageJob.PENDING, attempts=0, error='')
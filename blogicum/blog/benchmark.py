@@ -0,0 +1,90 @@
+"""Набор данных и сценарии для бенчмарка страниц блога.
+
+Данные строит blog.fake_data: один и тот же размер и seed дают те же
+строки (даты отсчитываются от момента запуска), так что замеры разных
+прогонов сравнимы.
+"""
+from django.core.cache import cache
+from django.test import Client
+
+from core.benchmark import measure
+from .fake_data import default_shape, Generator
+from .models import Post
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def dataset_shape(size):
+    return default_shape(size)
+
+
+def seed(size, seed=0):
+    """Заполняет пустую базу size постами и всем, что к ним относится."""
+    return Generator(size, seed=seed).run()
+
+
+def targets():
+    """Объекты, на которых меряются страницы: самый обсуждаемый пост."""
+    post = Post.objects.filter(is_visible=True).order_by(
+        '-comment_count', 'pk').first()
+    return {
+        'post': post,
+        'category': post.category,
+        'author': post.author,
+        'location': post.location,
+    }
+
+
+def post_form(target, title):
+    return {
+        'title': title,
+        'text': 'Текст публикации для бенчмарка.',
+        'pub_date': '2020-06-01 12:00:00',
+        'category': target['category'].pk,
+        'location': target['location'].pk,
+        'is_published': 'on',
+    }
+
+
+def scenarios():
+    """Сценарии: имя -> (вызов, подготовка перед каждым вызовом)."""
+    target = targets()
+    post = target['post']
+    anonymous = Client()
+    author = Client()
+    author.force_login(target['author'])
+
+    def get(client, url):
+        def call():
+            response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+        return call
+
+    def post_to(url, data):
+        def call():
+            response = author.post(url, data)
+            assert response.status_code == 302, (url, response.status_code)
+        return call
+
+    return {
+        'index': (get(anonymous, '/'), cache.clear),
+        'category': (get(anonymous, f'/category/{target["category"].slug}/'),
+                     cache.clear),
+        'profile': (get(anonymous, f'/profile/{target["author"].username}/'),
+                    cache.clear),
+        'post_detail': (get(anonymous, f'/posts/{post.pk}/'), cache.clear),
+        'create_post': (post_to('/posts/create/', post_form(
+            target, 'Новая публикация')), None),
+        'edit_post': (post_to(f'/posts/{post.pk}/edit/', post_form(
+            target, post.title)), None),
+        'add_comment': (post_to(f'/posts/{post.pk}/comment/', {
+            'text': 'Комментарий для бенчмарка.'}), None),
+    }
+
+
+def run(repeat):
+    """Замеры всех сценариев на уже заполненной базе."""
+    return {
+        name: measure(call, repeat, setup)
+        for name, (call, setup) in scenarios().items()
+    }
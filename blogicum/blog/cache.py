@@ -0,0 +1,68 @@
+from hashlib import md5
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from core.cache import get_versions, object_tag
+from .models import Category, Location, Post, StoredImage
+
+User = get_user_model()
+
+# Тег всех страниц-лент: меняется при любом изменении,
+# которое видно в карточках постов.
+FEED_TAG = 'feed'
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Заголовки, которые сохраняются вместе со страницей.
+PAGE_CACHE_HEADERS = ('ETag',)
+
+
+def card_tags(post):
+    """Объекты, от которых зависит карточка поста."""
+    tags = [object_tag(Post, post.pk), object_tag(User, post.author_id)]
+    if post.category_id:
+        tags.append(object_tag(Category, post.category_id))
+    if post.location_id:
+        tags.append(object_tag(Location, post.location_id))
+    if post.stored_image_id:
+        tags.append(object_tag(StoredImage, post.stored_image_id))
+    return tags
+
+
+def page_cache_key(request, params):
+    query = urlencode(sorted(
+        (name, request.GET[name]) for name in params if name in request.GET
+    ))
+    digest = md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return f'page:{digest}'
+
+
+def get_cached_page(key):
+    """Возвращает ответ из кэша, если ни один его тег не устарел."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if get_versions(entry['versions']) != entry['versions']:
+        return None
+    response = HttpResponse(entry['content'],
+                            content_type=entry['content_type'])
+    for name, value in entry.get('headers', {}).items():
+        response[name] = value
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def set_cached_page(key, response, versions):
+    cache.set(key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'versions': versions,
+        'headers': {
+            name: response[name]
+            for name in PAGE_CACHE_HEADERS if response.has_header(name)
+        },
+    }, PAGE_CACHE_TIMEOUT)
+    response['X-Page-Cache'] = 'miss'
@@ -0,0 +1,283 @@
+"""Быстрое наполнение базы правдоподобными данными блога.
+
+Строки создаются потоком: генераторы отдают объекты, которые
+вставляются через bulk_create пачками по chunk_size, каждая пачка
+в своей транзакции. Сигналы моделей при этом не срабатывают, поэтому
+is_visible и comment_count считаются здесь же, а кэш страниц
+сбрасывается в конце.
+
+Распределение неравномерное, как на живом сайте: немногие активные
+авторы пишут большую часть постов, немногие посты собирают большую
+часть комментариев, часть постов снята с публикации или отложена.
+"""
+import random
+from array import array
+from datetime import timedelta
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.cache import invalidate
+from .cache import FEED_TAG
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+CHUNK_SIZE = 5000
+PASSWORD = 'password'
+
+# Доля активных авторов и постов и доля записей, которая им достаётся.
+HOT_AUTHORS = 0.02
+HOT_AUTHOR_POSTS = 0.5
+HOT_POSTS = 0.01
+HOT_POST_COMMENTS = 0.5
+UNPUBLISHED_POSTS = 0.05
+FUTURE_POSTS = 0.02
+# Каждая n-я категория и местоположение сняты с публикации.
+UNPUBLISHED_CATEGORY_EVERY = 10
+UNPUBLISHED_LOCATION_EVERY = 20
+# Столько разных предложений собирается заранее; тексты складываются
+# из них, а не из отдельных слов, — так генерация вчетверо дешевле.
+SENTENCES = 2000
+# Посты за последние столько дней, отложенные — на столько вперёд.
+HISTORY_DAYS = 3 * 365
+FUTURE_DAYS = 30
+
+FIRST_NAMES = (
+    ('Александр', 'alexander'), ('Мария', 'maria'), ('Дмитрий', 'dmitry'),
+    ('Анна', 'anna'), ('Сергей', 'sergey'), ('Елена', 'elena'),
+    ('Иван', 'ivan'), ('Ольга', 'olga'), ('Михаил', 'mikhail'),
+    ('Татьяна', 'tatiana'), ('Андрей', 'andrey'), ('Наталья', 'natalia'),
+)
+LAST_NAMES = (
+    ('Иванов', 'ivanov'), ('Смирнов', 'smirnov'), ('Кузнецов', 'kuznetsov'),
+    ('Попов', 'popov'), ('Соколов', 'sokolov'), ('Лебедев', 'lebedev'),
+    ('Козлов', 'kozlov'), ('Новиков', 'novikov'), ('Морозов', 'morozov'),
+)
+TOPICS = (
+    ('Путешествия', 'travel'), ('Кулинария', 'cooking'),
+    ('Книги', 'books'), ('Кино', 'movies'), ('Спорт', 'sport'),
+    ('Музыка', 'music'), ('Фотография', 'photo'), ('Наука', 'science'),
+    ('Сад и огород', 'garden'), ('Техника', 'tech'),
+)
+PLACES = (
+    'Москва', 'Санкт-Петербург', 'Казань', 'Новосибирск', 'Екатеринбург',
+    'Нижний Новгород', 'Калининград', 'Владивосток', 'Сочи', 'Байкал',
+    'Карелия', 'Алтай', 'Камчатка', 'Ярославль', 'Суздаль',
+)
+ADJECTIVES = (
+    'утренний', 'долгий', 'тёплый', 'новый', 'старый', 'тихий', 'горный',
+    'речной', 'зимний', 'летний', 'вкусный', 'первый', 'лучший',
+)
+NOUNS = (
+    'поход', 'город', 'рецепт', 'маршрут', 'вечер', 'концерт', 'отпуск',
+    'музей', 'пирог', 'роман', 'фильм', 'сад', 'поезд', 'берег', 'парк',
+)
+VERBS = (
+    'увидели', 'нашли', 'прошли', 'приготовили', 'прочитали', 'сняли',
+    'посетили', 'обсудили', 'вспомнили', 'попробовали', 'встретили',
+)
+OBJECTS = (
+    'старую крепость', 'новый маршрут', 'домашний хлеб', 'горное озеро',
+    'редкую книгу', 'уличный концерт', 'рассвет над рекой', 'местный рынок',
+    'заброшенный маяк', 'осенний лес', 'сырники с вареньем',
+)
+
+
+def cumulative(weights):
+    total, result = 0, []
+    for weight in weights:
+        total += weight
+        result.append(total)
+    return result
+
+
+class SkewedChoice:
+    """Выбор номера из range(count), где первые hot номеров популярны.
+
+    Номера 0..hot-1 вместе выпадают с вероятностью hot_share, внутри
+    этой группы — по закону Ципфа; остальные выпадают равномерно.
+    """
+
+    def __init__(self, rng, count, hot, hot_share):
+        self.rng = rng
+        self.count = count
+        self.hot = max(1, min(count, round(count * hot)))
+        self.hot_share = hot_share
+        self.weights = cumulative(
+            1 / rank for rank in range(1, self.hot + 1))
+
+    def __call__(self):
+        if self.hot == self.count or self.rng.random() < self.hot_share:
+            return self.rng.choices(
+                range(self.hot), cum_weights=self.weights)[0]
+        return self.rng.randrange(self.hot, self.count)
+
+
+def default_shape(posts):
+    """Сколько каких строк обычно приходится на posts постов."""
+    return {
+        'users': max(10, posts // 50),
+        'categories': 10 + posts // 10_000,
+        'locations': 20 + posts // 5_000,
+        'comments': posts,
+    }
+
+
+def next_number(model):
+    """Номер, с которого начинать имена.
+
+    С ним повторный запуск не столкнётся с уникальными полями уже
+    созданных строк.
+    """
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Generator:
+    """Создаёт posts постов и остальные строки по shape.
+
+    stats после run() — {модель: (строк, секунд)}.
+    """
+
+    def __init__(self, posts, seed=0, chunk_size=CHUNK_SIZE, **shape):
+        self.posts = posts
+        self.shape = {**default_shape(posts), **shape}
+        self.rng = random.Random(seed)
+        self.chunk_size = chunk_size
+        self.now = timezone.now()
+        self.stats = {}
+        rng = self.rng
+        self.sentences = [
+            f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}: '
+            f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}.'.capitalize()
+            for _ in range(SENTENCES)
+        ]
+
+    def text(self, sentences):
+        return ' '.join(self.rng.choices(self.sentences, k=sentences))
+
+    def create(self, model, objects, on_chunk=None):
+        """Вставляет objects пачками, каждую в отдельной транзакции."""
+        started = perf_counter()
+        rows = 0
+        chunk = []
+        for obj in objects:
+            chunk.append(obj)
+            if len(chunk) == self.chunk_size:
+                rows += self.insert(model, chunk)
+                chunk = []
+                if on_chunk is not None:
+                    on_chunk(model, rows)
+        rows += self.insert(model, chunk)
+        self.stats[model] = (rows, perf_counter() - started)
+
+    def insert(self, model, chunk):
+        with transaction.atomic():
+            model.objects.bulk_create(chunk)
+        return len(chunk)
+
+    def new_ids(self, model, first):
+        return array('Q', model.objects.filter(pk__gte=first).order_by(
+            'pk').values_list('pk', flat=True).iterator())
+
+    def run(self, on_chunk=None):
+        first = {model: next_number(model)
+                 for model in (User, Category, Location, Post)}
+        self.create(User, self.users(first[User]), on_chunk)
+        self.create(Category, self.categories(first[Category]), on_chunk)
+        self.create(Location, self.locations(first[Location]), on_chunk)
+        users = self.new_ids(User, first[User])
+        categories = dict(Category.objects.filter(
+            pk__gte=first[Category]).values_list('pk', 'is_published'))
+        locations = dict(Location.objects.filter(
+            pk__gte=first[Location]).values_list('pk', 'is_published'))
+        comment_counts = self.comment_counts()
+        self.create(Post, self.post_rows(
+            users, categories, locations, comment_counts), on_chunk)
+        posts = self.new_ids(Post, first[Post])
+        self.create(Comment, self.comment_rows(
+            users, posts, comment_counts), on_chunk)
+        invalidate(FEED_TAG)
+        return self.stats
+
+    def users(self, first):
+        password = make_password(PASSWORD)
+        for number in range(first, first + self.shape['users']):
+            name, name_latin = self.rng.choice(FIRST_NAMES)
+            surname, surname_latin = self.rng.choice(LAST_NAMES)
+            if name_latin[-1] == 'a':
+                surname += 'а'
+            yield User(
+                username=f'{name_latin}_{surname_latin}{number}',
+                first_name=name, last_name=surname,
+                email=f'{name_latin}.{surname_latin}{number}@example.com',
+                password=password,
+            )
+
+    def categories(self, first):
+        for number in range(first, first + self.shape['categories']):
+            title, slug = TOPICS[number % len(TOPICS)]
+            yield Category(
+                title=f'{title} {number}', slug=f'{slug}-{number}',
+                description=self.text(2),
+                is_published=number % UNPUBLISHED_CATEGORY_EVERY != 0,
+            )
+
+    def locations(self, first):
+        for number in range(first, first + self.shape['locations']):
+            yield Location(
+                name=f'{PLACES[number % len(PLACES)]}, место {number}',
+                is_published=number % UNPUBLISHED_LOCATION_EVERY != 0,
+            )
+
+    def comment_counts(self):
+        """Число комментариев каждого поста, пока постов ещё нет."""
+        counts = array('L', bytes(array('L').itemsize * self.posts))
+        if self.posts:
+            pick = SkewedChoice(
+                self.rng, self.posts, HOT_POSTS, HOT_POST_COMMENTS)
+            for _ in range(self.shape['comments']):
+                counts[pick()] += 1
+        return counts
+
+    def pub_date(self):
+        if self.rng.random() < FUTURE_POSTS:
+            return self.now + timedelta(
+                hours=1 + self.rng.random() * FUTURE_DAYS * 24)
+        return self.now - timedelta(
+            minutes=self.rng.random() * HISTORY_DAYS * 24 * 60)
+
+    def post_rows(self, users, categories, locations, comment_counts):
+        rng = self.rng
+        author = SkewedChoice(rng, len(users), HOT_AUTHORS, HOT_AUTHOR_POSTS)
+        category_ids = sorted(categories)
+        location_ids = sorted(locations)
+        for number in range(self.posts):
+            category_id = rng.choice(category_ids)
+            location_id = rng.choice(location_ids)
+            pub_date = self.pub_date()
+            is_published = rng.random() >= UNPUBLISHED_POSTS
+            yield Post(
+                title=f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+                      .capitalize(),
+                text=self.text(rng.randint(2, 12)),
+                pub_date=pub_date, author_id=users[author()],
+                category_id=category_id, location_id=location_id,
+                is_published=is_published,
+                is_visible=bool(
+                    is_published and categories[category_id]
+                    and locations[location_id] and pub_date <= self.now),
+                comment_count=comment_counts[number],
+            )
+
+    def comment_rows(self, users, posts, comment_counts):
+        for post_id, count in zip(posts, comment_counts):
+            for _ in range(count):
+                yield Comment(
+                    post_id=post_id, author_id=self.rng.choice(users),
+                    text=self.text(1),
+                )
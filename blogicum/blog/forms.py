@@ -1,6 +1,42 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
 
+from .metrics import upload_rejections
 from .models import Comment, Post
+from .uploads import UploadRejected, check_image
+
+
+class BoundedImageField(forms.ImageField):
+    """Поле фото, которое отсеивает опасные загрузки до декодирования."""
+
+    default_error_messages = {
+        'upload_size': 'Файл больше %(limit)s МБ.',
+        'upload_format': 'Загрузите фото в формате JPEG, PNG, GIF или WebP.',
+        'upload_pixels': ('Фото больше %(limit)s мегапикселей, '
+                          'уменьшите его перед загрузкой.'),
+        'upload_corrupt': 'Файл повреждён или не является изображением.',
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return None
+        try:
+            check_image(data)
+        except UploadRejected as error:
+            upload_rejections[error.reason].increment()
+            raise ValidationError(
+                self.error_messages[f'upload_{error.reason}'],
+                code=f'upload_{error.reason}',
+                params={'limit': self.get_limit(error.reason)},
+            )
+        return super().to_python(data)
+
+    @staticmethod
+    def get_limit(reason):
+        if reason == 'size':
+            return settings.IMAGE_UPLOAD_MAX_BYTES // (1024 * 1024)
+        return settings.IMAGE_UPLOAD_MAX_PIXELS // 1_000_000
 
 
 class CreatePostForm(forms.ModelForm):
@@ -8,6 +44,9 @@ class CreatePostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author', )
+        field_classes = {
+            'image': BoundedImageField,
+        }
         widgets = {
             'pub_date': forms.DateTimeInput(format='%Y-%m-%d %H:%M:%S',
                                             attrs={'type': 'datetime-local'})
@@ -0,0 +1,296 @@
+"""Уменьшенные копии фотографий постов.
+
+Для каждого загруженного файла рядом с оригиналом сохраняется набор
+копий фиксированной ширины в WebP и JPEG. Шаблоны отдают их через
+srcset, так что лента не грузит оригиналы, уменьшая их в браузере.
+"""
+import posixpath
+from base64 import b64encode
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from core.cache import invalidate, object_tag
+from .cache import FEED_TAG
+from .models import ImageJob, Post, StoredImage
+
+# Ширина копий в пикселях. Карточка в ленте — 40rem, копия для страницы
+# поста нужна для экранов с высокой плотностью пикселей.
+VARIANTS = {
+    'card': 640,
+    'detail': 1280,
+}
+
+# Расширение файла: формат Pillow, MIME-тип и параметры сохранения.
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg',
+            {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+# Ширина заглушки, которая показывается до загрузки фото.
+PLACEHOLDER_WIDTH = 16
+
+# Тег EXIF Orientation и значения, при которых кадр повёрнут на 90°.
+EXIF_ORIENTATION = 0x0112
+ROTATED = (5, 6, 7, 8)
+
+
+def variant_name(name, variant, extension):
+    """Имя копии рядом с оригиналом: photo.jpg -> photo.card.webp."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.{variant}.{extension}'))
+
+
+def variant_names(name):
+    return [
+        variant_name(name, variant, extension)
+        for variant in VARIANTS for extension in FORMATS
+    ]
+
+
+def make_placeholder(image):
+    """Заглушка LQIP: крошечная копия кадра в виде data: URI."""
+    image = image.copy()
+    image.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH),
+                    Image.Resampling.BILINEAR)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=40)
+    return ('data:image/jpeg;base64,'
+            + b64encode(buffer.getvalue()).decode())
+
+
+def resize_image(data):
+    """Готовит копии и заглушку по байтам оригинала.
+
+    Не обращается ни к базе, ни к хранилищу, поэтому выполняется
+    в отдельном процессе воркера. Возвращает фактическую ширину копий,
+    их содержимое по ключу (вариант, расширение) и заглушку. Копии
+    не растягиваются: если оригинал уже заданной ширины, копия сохраняет
+    его размер и лишь перекодируется без метаданных EXIF.
+    """
+    image = Image.open(BytesIO(data))
+    image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    widths, files = {}, {}
+    for variant, width in VARIANTS.items():
+        resized = image
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height),
+                                   Image.Resampling.LANCZOS)
+        for extension, (image_format, _, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            files[variant, extension] = buffer.getvalue()
+        widths[variant] = resized.width
+    return widths, files, make_placeholder(image)
+
+
+def describe_image(storage, name):
+    """Размеры и вес для записи StoredImage.
+
+    Вызывается при сохранении поста, поэтому читает только заголовок
+    файла и кадр не декодирует. Заглушку строит воркер вместе с копиями.
+    """
+    with storage.open(name) as source:
+        image = Image.open(source)
+        width, height = image.size
+        exif = Image.Exif()
+        if 'exif' in image.info:
+            exif.load(image.info['exif'])
+    if exif.get(EXIF_ORIENTATION) in ROTATED:
+        width, height = height, width
+    return {
+        'width': width,
+        'height': height,
+        'size': storage.size(name),
+    }
+
+
+def read_image(storage, name):
+    with storage.open(name) as source:
+        return source.read()
+
+
+def save_variants(storage, name, files):
+    for (variant, extension), content in files.items():
+        storage.save_derived(variant_name(name, variant, extension),
+                             ContentFile(content))
+
+
+def delete_variants(storage, name):
+    for target in variant_names(name):
+        if storage.exists(target):
+            storage.delete(target)
+
+
+def srcset(storage, stored_image, extension):
+    """Атрибут srcset для копий одного формата, по возрастанию ширины."""
+    widths = {}
+    for variant, width in stored_image.variants.items():
+        widths.setdefault(width, variant)
+    return ', '.join(
+        f'{storage.url(variant_name(stored_image.name, variant, extension))}'
+        f' {width}w'
+        for width, variant in sorted(widths.items())
+    )
+
+
+def image_storage():
+    """Хранилище фотографий постов (см. core.storage)."""
+    return Post._meta.get_field('image').storage
+
+
+def enqueue(stored):
+    """Ставит изображение в очередь воркера, если оно ещё не там."""
+    if not stored.jobs.filter(
+            status__in=(ImageJob.PENDING, ImageJob.RUNNING)).exists():
+        ImageJob.objects.create(image=stored)
+
+
+def fill_metadata(stored, storage):
+    """Сохраняет в записи размеры и вес; битый файл пропускает."""
+    try:
+        metadata = describe_image(storage, stored.name)
+    except (OSError, ValueError):
+        return False
+    for field, value in metadata.items():
+        setattr(stored, field, value)
+    stored.save(update_fields=list(metadata))
+    return True
+
+
+def sync_post_image(post):
+    """Привязывает пост к записи о его фото.
+
+    Копии и заглушку готовит воркер process_image_jobs; до этого
+    шаблоны выводят оригинал без заглушки.
+    """
+    previous_id = post.stored_image_id
+    stored = None
+    if post.image:
+        stored, created = StoredImage.objects.get_or_create(
+            name=post.image.name)
+        if created or stored.width is None:
+            fill_metadata(stored, post.image.storage)
+        if not stored.variants or not stored.placeholder:
+            enqueue(stored)
+        if stored.pk != previous_id:
+            StoredImage.objects.filter(pk=stored.pk).update(
+                refcount=F('refcount') + 1)
+    Post.objects.filter(pk=post.pk).update(stored_image=stored)
+    post.stored_image = stored
+    return stored
+
+
+def complete_job(job, storage, files, widths, placeholder):
+    """Сохраняет результат задачи и сбрасывает кэш карточек."""
+    now = timezone.now()
+    if not StoredImage.objects.filter(pk=job.image_id).exists():
+        # Фото успели заменить, пока воркер его обрабатывал.
+        return
+    save_variants(storage, job.image.name, files)
+    StoredImage.objects.filter(pk=job.image_id).update(
+        variants=widths, placeholder=placeholder)
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.DONE, error='', finished_at=now)
+    invalidate(FEED_TAG, object_tag(StoredImage, job.image_id))
+
+
+def fail_job(job, error):
+    status = (ImageJob.FAILED if job.attempts >= ImageJob.MAX_ATTEMPTS
+              else ImageJob.PENDING)
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=status, error=f'{type(error).__name__}: {error}',
+        finished_at=timezone.now())
+
+
+def release_image(name):
+    """Снимает ссылку поста на файл.
+
+    Сам файл и его копии удаляет collect_image_garbage: до этого тот же
+    снимок может быть загружен снова, и запись переиспользуется.
+    """
+    if name:
+        StoredImage.objects.filter(name=name, refcount__gt=0).update(
+            refcount=F('refcount') - 1)
+
+
+def recount_references():
+    """Пересчитывает refcount по фактическим ссылкам постов."""
+    return StoredImage.objects.update(refcount=Coalesce(Subquery(
+        Post.objects.filter(stored_image=OuterRef('pk')).order_by().values(
+            'stored_image').annotate(total=Count('pk')).values('total')
+    ), 0))
+
+
+def collect_garbage(min_age, dry_run=False):
+    """Удаляет файлы без ссылок старше min_age; возвращает (число, байты).
+
+    Запись считается мусором, если на её имя не ссылается ни один пост.
+    Порог по возрасту защищает загрузки, чей пост ещё сохраняется.
+    """
+    storage = image_storage()
+    garbage = StoredImage.objects.filter(
+        refcount=0, created_at__lt=timezone.now() - min_age,
+    ).exclude(Exists(Post.objects.filter(image=OuterRef('name'))))
+    removed = freed = 0
+    for stored in garbage.iterator():
+        removed += 1
+        freed += stored.size or 0
+        if dry_run:
+            continue
+        if storage.exists(stored.name):
+            storage.delete(stored.name)
+        delete_variants(storage, stored.name)
+        stored.delete()
+    return removed, freed
+
+
+def hashed_files(storage, directory):
+    """Файлы в раскладке <ab>/<cd>/ внутри directory."""
+    for first in storage.listdir(directory)[0]:
+        if len(first) != 2:
+            continue
+        for second in storage.listdir(posixpath.join(directory, first))[0]:
+            path = posixpath.join(directory, first, second)
+            for name in storage.listdir(path)[1]:
+                yield posixpath.join(path, name)
+
+
+def collect_orphan_files(min_age, dry_run=False):
+    """Удаляет файлы хранилища, о которых не знает ни одна запись.
+
+    Такие файлы остаются, если пост с загруженным фото так и не
+    сохранился. Старые файлы вне раскладки по хэшу не трогаются.
+    """
+    storage = image_storage()
+    directory = Post._meta.get_field('image').upload_to
+    if not storage.exists(directory):
+        return 0, 0
+    known = {
+        name.rsplit('.', 1)[0] for name in
+        StoredImage.objects.values_list('name', flat=True).iterator()
+    }
+    threshold = timezone.now() - min_age
+    removed = freed = 0
+    for name in hashed_files(storage, directory):
+        # У копий к имени оригинала добавлены .вариант.расширение.
+        stem = posixpath.join(posixpath.dirname(name),
+                              posixpath.basename(name).split('.', 1)[0])
+        if stem in known or storage.get_modified_time(name) >= threshold:
+            continue
+        removed += 1
+        freed += storage.size(name)
+        if not dry_run:
+            storage.delete(name)
+    return removed, freed
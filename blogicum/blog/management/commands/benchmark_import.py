@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from blog import transfer
+from blog.fake_data import Generator
+from core.benchmark import measure, temporary_database
+
+
+def flush():
+    call_command('flush', interactive=False, verbosity=0)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает loaddata и import_blog на одних и тех же '
+            'синтетических данных во временной базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=10_000, help='Размер набора.')
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help='Сколько раз загрузить данные каждым способом.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory, \
+                temporary_database():
+            self.run(directory, options)
+
+    def run(self, directory, options):
+        Generator(options['posts'], seed=options['seed']).run()
+        fixture = os.path.join(directory, 'blog.json')
+        lines = os.path.join(directory, 'blog.jsonl')
+        call_command('dumpdata', *transfer.MODELS, output=fixture,
+                     verbosity=0)
+        objects = transfer.export(lines)
+        self.stdout.write(
+            f'Объектов: {objects}; db.json {self.mib(fixture)} МиБ, '
+            f'JSON Lines {self.mib(lines)} МиБ')
+        self.stdout.write(
+            f'{"способ":<12} {"p50, с":>8} {"объектов/с":>11} '
+            f'{"запросов":>9} {"пик, МиБ":>9}')
+        methods = {
+            'loaddata': lambda: call_command(
+                'loaddata', fixture, verbosity=0),
+            'import_blog': lambda: transfer.import_file(lines),
+        }
+        for name, call in methods.items():
+            result = measure(call, options['repeat'], setup=flush)
+            seconds = result['p50_ms'] / 1000
+            self.stdout.write(
+                f'{name:<12} {seconds:>8.2f} '
+                f'{objects / max(seconds, 1e-9):>11,.0f} '
+                f'{result["queries"]:>9} '
+                f'{result["peak_kib"] / 1024:>9.1f}')
+
+    def mib(self, path):
+        return f'{os.path.getsize(path) / 2 ** 20:.1f}'
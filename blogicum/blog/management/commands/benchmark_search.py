@@ -0,0 +1,163 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.search_index import (
+    DatabaseIndex, MemoryIndex, Searcher, write_index,
+)
+from core.benchmark import percentile, temporary_database
+
+CONSONANTS = 'бвгдзклмнпрстфх'
+VOWELS = 'аеиоу'
+# Окончания, которыми синтетические корни склоняются в тексте.
+ENDINGS = ('', 'а', 'у', 'ом', 'е', 'ы', 'ов', 'ами', 'ах', 'ый', 'ая',
+           'ое', 'ого', 'ими')
+TITLE_WORDS = 4
+TEXT_WORDS = 40
+BATCH = 10_000
+
+
+def make_roots(rng, count):
+    roots = set()
+    while len(roots) < count:
+        syllables = rng.randint(2, 3)
+        roots.add(''.join(
+            rng.choice(CONSONANTS) + rng.choice(VOWELS)
+            for _ in range(syllables)) + rng.choice(CONSONANTS))
+    return sorted(roots)
+
+
+def make_typo(rng, word):
+    position = rng.randrange(len(word))
+    replacement = rng.choice(VOWELS if word[position] in VOWELS
+                             else CONSONANTS)
+    return word[:position] + replacement + word[position + 1:]
+
+
+class Corpus:
+    """Синтетические посты: корни по закону Ципфа, случайные окончания."""
+
+    def __init__(self, seed, roots):
+        self.rng = random.Random(seed)
+        self.roots = make_roots(self.rng, roots)
+        weights = [1 / rank for rank in range(1, len(self.roots) + 1)]
+        self.cumulative = []
+        total = 0
+        for weight in weights:
+            total += weight
+            self.cumulative.append(total)
+
+    def words(self, count):
+        return ' '.join(
+            root + self.rng.choice(ENDINGS)
+            for root in self.rng.choices(
+                self.roots, cum_weights=self.cumulative, k=count))
+
+    def posts(self, count):
+        for post_id in range(1, count + 1):
+            yield post_id, self.words(TITLE_WORDS), self.words(TEXT_WORDS)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает поиск по индексу основ с LIKE-сканированием '
+            'на синтетическом корпусе. Индекс записывается в таблицы '
+            'SearchTerm и SearchTrigram временной базы и читается '
+            'оттуда, как в бою.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1_000_000,
+            help='Размер корпуса.')
+        parser.add_argument(
+            '--queries', type=int, default=20,
+            help='Сколько запросов каждого вида выполнить.')
+        parser.add_argument(
+            '--roots', type=int, default=5000,
+            help='Размер словаря корней.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        corpus = Corpus(options['seed'], options['roots'])
+        with tempfile.TemporaryDirectory() as directory, \
+                temporary_database():
+            path = os.path.join(directory, 'corpus.sqlite3')
+            connection = sqlite3.connect(path)
+            try:
+                self.run(connection, path, corpus, options)
+            finally:
+                connection.close()
+
+    def run(self, connection, path, corpus, options):
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, title TEXT,'
+            ' text TEXT)')
+        index = MemoryIndex()
+        started = time.perf_counter()
+        batch = []
+        build_time = 0
+        for post in corpus.posts(options['posts']):
+            batch.append(post)
+            tick = time.perf_counter()
+            index.add(*post)
+            build_time += time.perf_counter() - tick
+            if len(batch) == BATCH:
+                connection.executemany(
+                    'INSERT INTO post VALUES (?, ?, ?)', batch)
+                batch = []
+        connection.executemany('INSERT INTO post VALUES (?, ?, ?)', batch)
+        connection.commit()
+        tick = time.perf_counter()
+        index.finish()
+        build_time += time.perf_counter() - tick
+        self.stdout.write(
+            f'Корпус: {options["posts"]} постов за '
+            f'{time.perf_counter() - started:.1f} с')
+
+        rng = random.Random(options['seed'] + 1)
+        queries = {
+            'слово': [], 'опечатка': [],
+        }
+        for root in rng.choices(corpus.roots, cum_weights=corpus.cumulative,
+                                k=options['queries']):
+            word = root + rng.choice(ENDINGS)
+            queries['слово'].append(word)
+            queries['опечатка'].append(make_typo(rng, word))
+
+        tick = time.perf_counter()
+        write_index(index)
+        write_time = time.perf_counter() - tick
+        table_size = os.path.getsize(path)
+        self.stdout.write(
+            f'Таблица: {table_size / 2 ** 20:.1f} МиБ, индекс: '
+            f'{index.size() / 2 ** 20:.1f} МиБ '
+            f'({index.size() / table_size:.0%} таблицы), '
+            f'основ: {len(index.names)}, построен за {build_time:.1f} с, '
+            f'записан в базу за {write_time:.1f} с')
+        self.stdout.write(
+            f'{"запросы":<10} {"способ":<8} {"p50, мс":>9} {"p95, мс":>9}'
+            f' {"найдено":>9}')
+        for kind, words in queries.items():
+            self.report(kind, 'LIKE', words, lambda word: connection.execute(
+                'SELECT id FROM post WHERE title LIKE ?1 OR text LIKE ?1',
+                (f'%{word}%',)).fetchall())
+            self.report(kind, 'индекс', words, lambda word: Searcher(
+                DatabaseIndex()).search(word, limit=None)[0])
+        # Тот же индекс без чтения из базы: нижняя граница, а не то,
+        # что получит сайт.
+        for kind, words in queries.items():
+            self.report(kind, 'в памяти', words, lambda word: Searcher(
+                index).search(word, limit=None)[0])
+
+    def report(self, kind, method, words, query):
+        timings, found = [], 0
+        for word in words:
+            started = time.perf_counter()
+            found += len(query(word))
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f'{kind:<10} {method:<8} {percentile(timings, 0.5):>9.2f} '
+            f'{percentile(timings, 0.95):>9.2f} {found / len(words):>9.0f}')
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import benchmark
+from core.benchmark import (
+    compare, load_baseline, missing_baselines, save_baseline,
+    temporary_database,
+)
+
+
+class Command(BaseCommand):
+    help = ('Меряет время, число запросов и память страниц блога '
+            'на детерминированных наборах данных во временной базе '
+            'и сравнивает с базовым файлом.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[benchmark.SIZES[0]],
+            help=('Размеры наборов в постах, например '
+                  + ' '.join(map(str, benchmark.SIZES)) + '.'))
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз выполнить каждый сценарий.')
+        parser.add_argument(
+            '--baseline',
+            default=settings.BASE_DIR.parent / 'benchmarks' / 'views.json',
+            help='JSON-файл с базовыми замерами.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.5,
+            help='Допустимый рост p95 и пика памяти, доля от базы.')
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать замеры в базовый файл вместо проверки.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        results = self.measure(options)
+        baseline = load_baseline(options['baseline'])
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results, baseline)
+            self.stdout.write(f'Базовые замеры записаны в '
+                              f'{options["baseline"]}')
+            return
+        missing = missing_baselines(results, baseline)
+        if missing:
+            raise CommandError(
+                'Нет базовых замеров, сравнивать не с чем:\n'
+                + '\n'.join(missing)
+                + '\nЗапишите их с --update-baseline.')
+        regressions = compare(results, baseline, options['threshold'])
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def measure(self, options):
+        """Замеры по всем размерам во временной базе, как у тестов."""
+        with temporary_database():
+            return {size: self.run(size, options)
+                    for size in options['sizes']}
+
+    def run(self, size, options):
+        call_command('flush', interactive=False, verbosity=0)
+        benchmark.seed(size, options['seed'])
+        results = benchmark.run(options['repeat'])
+        self.stdout.write(f'{size} постов')
+        self.stdout.write(
+            f'{"сценарий":<12} {"p50, мс":>9} {"p95, мс":>9} '
+            f'{"запросов":>9} {"пик, КиБ":>9}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<12} {result["p50_ms"]:>9.2f} '
+                f'{result["p95_ms"]:>9.2f} {result["queries"]:>9} '
+                f'{result["peak_kib"]:>9}')
+        return results
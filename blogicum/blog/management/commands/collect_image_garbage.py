@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.images import (
+    collect_garbage, collect_orphan_files, recount_references)
+
+
+class Command(BaseCommand):
+    help = ('Удаляет фотографии, на которые не ссылается ни один пост, '
+            'вместе с их уменьшенными копиями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, сколько места освободится.',
+        )
+
+    def handle(self, *args, **options):
+        min_age = timedelta(seconds=options['min_age'])
+        recount_references()
+        removed, freed = collect_garbage(min_age, options['dry_run'])
+        orphans, orphans_size = collect_orphan_files(
+            min_age, options['dry_run'])
+        removed += orphans
+        freed += orphans_size
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {removed}, {freed / 1024 / 1024:.1f} МиБ'))
@@ -0,0 +1,21 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from blog import transfer
+
+
+class Command(BaseCommand):
+    help = ('Выгружает пользователей, категории, местоположения, фото, '
+            'посты и комментарии в файл JSON Lines (.gz — со сжатием).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки.')
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        count = transfer.export(options['path'])
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгружено объектов: {count} за {elapsed:.1f} с, '
+            f'{count / max(elapsed, 1e-9):,.0f} в секунду.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import (
+    enqueue, fill_metadata, image_storage, sync_post_image)
+from blog.models import Post, StoredImage
+
+
+class Command(BaseCommand):
+    help = ('Заполняет размеры, вес и заглушки фотографий, '
+            'загруженных до появления этих полей.')
+
+    def handle(self, *args, **options):
+        linked = 0
+        for post in Post.objects.exclude(image='').filter(
+                stored_image__isnull=True).only('image').iterator():
+            sync_post_image(post)
+            linked += 1
+        filled = failed = 0
+        for stored in StoredImage.objects.filter(width__isnull=True):
+            if fill_metadata(stored, image_storage()):
+                filled += 1
+            else:
+                failed += 1
+                self.stderr.write(f'Не удалось прочитать {stored.name}')
+        # Заглушки строит process_image_jobs вместе с копиями.
+        queued = 0
+        for stored in StoredImage.objects.filter(placeholder=''):
+            enqueue(stored)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Привязано постов: {linked}, заполнено изображений: {filled}, '
+            f'ошибок: {failed}, поставлено в очередь за заглушкой: '
+            f'{queued}'))
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.fake_data import (
+    CHUNK_SIZE, default_shape, Generator, PASSWORD, User,
+)
+from blog.models import Category, Comment, Location, Post
+
+LABELS = {
+    User: 'Пользователи',
+    Category: 'Категории',
+    Location: 'Местоположения',
+    Post: 'Посты',
+    Comment: 'Комментарии',
+}
+
+
+@contextmanager
+def fast_writes():
+    """Не ждать fsync на каждый коммит, пока идёт генерация.
+
+    Пачки и так идут отдельными транзакциями; при сбое теряются лишь
+    последние из них, а данные здесь синтетические. Внутри внешней
+    транзакции коммитов нет, и настройка не нужна (SQLite её и не даст).
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        previous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {int(previous)}')
+
+
+class Command(BaseCommand):
+    help = ('Быстро создаёт синтетические посты, комментарии, '
+            'пользователей, категории и местоположения на русском языке.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=100_000, help='Сколько постов.')
+        for name in default_shape(0):
+            parser.add_argument(
+                f'--{name}', type=int,
+                help='По умолчанию — пропорционально числу постов.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Строк в одном INSERT и одной транзакции.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['posts'] < 0 or options['chunk_size'] < 1:
+            raise CommandError('Число постов и размер пачки должны быть '
+                               'положительными.')
+        self.verbosity = options['verbosity']
+        shape = {name: options[name] for name in default_shape(0)
+                 if options[name] is not None}
+        generator = Generator(options['posts'], seed=options['seed'],
+                              chunk_size=options['chunk_size'], **shape)
+        started = perf_counter()
+        with fast_writes():
+            stats = generator.run(on_chunk=self.progress)
+        elapsed = perf_counter() - started
+        total = 0
+        for model, (rows, seconds) in stats.items():
+            total += rows
+            self.stdout.write(
+                f'{LABELS[model]}: {rows} строк за '
+                f'{seconds:.1f} с, {rows / max(seconds, 1e-9):,.0f} строк/с')
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {total} строк за {elapsed:.1f} с, '
+            f'{total / max(elapsed, 1e-9):,.0f} строк/с. '
+            f'Пароль пользователей: {PASSWORD}.'))
+        self.stdout.write(
+            'Индекс поиска по основам не обновлялся: '
+            'выполните rebuild_search_index.')
+
+    def progress(self, model, rows):
+        if self.verbosity > 1:
+            self.stdout.write(f'{LABELS[model]}: {rows}')
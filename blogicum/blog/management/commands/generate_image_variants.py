@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.images import sync_post_image
+from blog.models import Post, StoredImage
+
+
+class Command(BaseCommand):
+    help = ('Ставит в очередь обработки фотографии, у которых ещё нет '
+            'уменьшенных копий.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии всех фотографий.',
+        )
+
+    def handle(self, *args, **options):
+        if options['force']:
+            StoredImage.objects.update(variants={})
+        posts = Post.objects.exclude(image='').filter(
+            Q(stored_image__isnull=True) | Q(stored_image__variants={})
+        ).only('image')
+        queued = 0
+        for post in posts.iterator():
+            sync_post_image(post)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Поставлено в очередь постов: {queued}. Копии создаст '
+            f'команда process_image_jobs.'))
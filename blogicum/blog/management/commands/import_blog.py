@@ -0,0 +1,39 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import transfer
+
+
+class Command(BaseCommand):
+    help = ('Загружает выгрузку export_blog пачками через bulk_create; '
+            'прерванную загрузку можно продолжить с --resume.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки.')
+        parser.add_argument(
+            '--batch-size', type=int, default=transfer.BATCH_SIZE,
+            help='Объектов в одной пачке и одной транзакции.')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с места, где остановилась прошлая загрузка.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        started = perf_counter()
+        try:
+            count = transfer.import_file(
+                options['path'], batch_size=options['batch_size'],
+                resume=options['resume'], on_batch=self.progress)
+        except (OSError, ValueError, transfer.TransferError) as error:
+            raise CommandError(
+                f'{error}\nУже загруженное сохранено; чтобы продолжить, '
+                f'запустите команду снова с --resume.')
+        elapsed = perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {count} за {elapsed:.1f} с, '
+            f'{count / max(elapsed, 1e-9):,.0f} в секунду.'))
+
+    def progress(self, label, imported):
+        if self.verbosity > 1:
+            self.stdout.write(f'{label}: всего загружено {imported}')
@@ -0,0 +1,96 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.images import (
+    complete_job, fail_job, image_storage, read_image, resize_image)
+from blog.models import ImageJob
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает очередь фотографий: готовит уменьшенные копии '
+            'в пуле процессов. С --loop работает как постоянный процесс.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Число процессов Pillow; 0 — обрабатывать в этом процессе.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых задач.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Сколько задач забирать из очереди за раз.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help=('Через сколько секунд задача в работе считается '
+                  'брошенной и берётся заново.'),
+        )
+
+    def process_batch(self, pool, batch_size, stale_after):
+        jobs = ImageJob.objects.claim(batch_size, stale_after)
+        pending = []
+        for job in jobs:
+            try:
+                data = read_image(image_storage(), job.image.name)
+            except OSError as error:
+                fail_job(job, error)
+                continue
+            if pool is None:
+                pending.append((job, None, data))
+            else:
+                pending.append((job, pool.submit(resize_image, data), None))
+        done = 0
+        for job, future, data in pending:
+            try:
+                widths, files, placeholder = (
+                    future.result() if future is not None
+                    else resize_image(data))
+            except Exception as error:
+                fail_job(job, error)
+                self.stderr.write(f'{job.image.name}: {error}')
+                continue
+            complete_job(job, image_storage(), files, widths, placeholder)
+            done += 1
+        return len(jobs), done
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after'])
+        pool = None
+        if options['workers'] > 0:
+            pool = ProcessPoolExecutor(max_workers=options['workers'])
+        try:
+            while True:
+                claimed, done = self.process_batch(
+                    pool, options['batch_size'], stale_after)
+                if claimed:
+                    self.stdout.write(
+                        f'Обработано изображений: {done} из {claimed}')
+                    continue
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            return
+        finally:
+            if pool is not None:
+                pool.shutdown()
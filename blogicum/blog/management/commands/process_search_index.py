@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.search_index import BATCH_SIZE, process_queue
+
+
+class Command(BaseCommand):
+    help = ('Обновляет индекс поиска по основам для постов из очереди. '
+            'С --loop работает как постоянный процесс; запускайте '
+            'не больше одного.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых задач.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько задач применять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                indexed = process_queue(options['batch_size'])
+                if indexed:
+                    self.stdout.write(f'Переиндексировано постов: {indexed}')
+                    continue
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            return
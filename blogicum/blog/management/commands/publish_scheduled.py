@@ -0,0 +1,81 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog.models import Post
+from blog.signals import post_published
+
+
+class Command(BaseCommand):
+    help = ('Публикует отложенные посты, дата публикации которых '
+            'наступила. С --loop работает как постоянный процесс.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать следующих публикаций.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60,
+            help='Максимальная пауза между проверками, секунды.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько постов публиковать в одной транзакции.',
+        )
+
+    def publish(self, ids):
+        """Показывает посты из ids, которые всё ещё пора показать.
+
+        Пост могли снять с публикации или перенести между выборкой
+        и UPDATE, поэтому условие проверяется в самом UPDATE, по посту
+        за раз, — так известно, какие именно посты изменились.
+        """
+        now = timezone.now()
+        visible = Post.objects.visible_condition()
+        published = []
+        with transaction.atomic():
+            for pk in ids:
+                if Post.objects.filter(
+                        visible, pk=pk, is_visible=False
+                ).update(is_visible=True, updated_at=now):
+                    published.append(pk)
+        return published
+
+    def publish_due_posts(self, batch_size):
+        published = 0
+        while True:
+            ids = list(Post.objects.due_for_publication().order_by(
+                'pub_date', 'pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return published
+            updated = self.publish(ids)
+            if updated:
+                post_published.send(sender=Post, post_ids=updated)
+            published += len(updated)
+
+    def get_pause(self, interval):
+        next_date = Post.objects.next_publication_date()
+        if next_date is None:
+            return interval
+        until_next = (next_date - timezone.now()).total_seconds()
+        return min(interval, max(until_next, 0.1))
+
+    def handle(self, *args, **options):
+        while True:
+            published = self.publish_due_posts(options['batch_size'])
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not options['loop']:
+                return
+            try:
+                time.sleep(self.get_pause(options['interval']))
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog import search_index
+from blog.search import optimize_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает поисковые индексы постов (FTS5 и индекс '
+            'основ слов) по текущим заголовкам и текстам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimize',
+            action='store_true',
+            help='После перестройки слить сегменты индекса в один.',
+        )
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        if options['optimize']:
+            optimize_index()
+        index = search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс поиска перестроен: постов {index.document_count()}, '
+            f'основ {len(index.names)}, {index.size() / 1024:.1f} КиБ.'))
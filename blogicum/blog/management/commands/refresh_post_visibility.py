@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.is_visible для всех постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько постов обновлять в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        changed = 0
+        last_id = 0
+        while True:
+            ids = list(Post.objects.filter(pk__gt=last_id).order_by(
+                'pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                changed += Post.objects.filter(
+                    pk__in=ids).refresh_visibility()
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Изменено постов: {changed}'))
@@ -0,0 +1,17 @@
+from core.metrics import Counter
+
+card_cache_hits = Counter(
+    'post_card.cache_hits', 'Карточки постов, взятые из кэша')
+card_cache_misses = Counter(
+    'post_card.cache_misses', 'Карточки постов, отрисованные заново')
+
+# Отклонённые загрузки фото по причине (см. blog.uploads.check_image).
+upload_rejections = {
+    reason: Counter(f'uploads.rejected.{reason}', description)
+    for reason, description in (
+        ('size', 'Загрузки больше IMAGE_UPLOAD_MAX_BYTES'),
+        ('format', 'Загрузки неразрешённого формата'),
+        ('pixels', 'Загрузки больше IMAGE_UPLOAD_MAX_PIXELS пикселей'),
+        ('corrupt', 'Загрузки с повреждённым заголовком'),
+    )
+}
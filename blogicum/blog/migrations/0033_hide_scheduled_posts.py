@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def hide_scheduled_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_visible=True, pub_date__gt=timezone.now()
+    ).update(is_visible=False)
+
+
+def show_scheduled_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True,
+        location__is_published=True,
+        pub_date__gt=timezone.now(),
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0032_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Пост, категория и местоположение опубликованы, а дата публикации наступила.', verbose_name='Виден в ленте'),
+        ),
+        migrations.RunPython(hide_scheduled_posts, show_scheduled_posts),
+    ]
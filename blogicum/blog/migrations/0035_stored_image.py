@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0034_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('variants', models.JSONField(blank=True, default=dict, help_text='Ширина готовых копий по названию варианта.', verbose_name='Уменьшенные копии')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'изображение',
+                'verbose_name_plural': 'Изображения',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='stored_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='blog.storedimage', verbose_name='Обработанное фото'),
+        ),
+    ]
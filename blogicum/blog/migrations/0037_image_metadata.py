@@ -0,0 +1,33 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0036_image_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedimage',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Высота'),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='placeholder',
+            field=models.TextField(blank=True, help_text='Крошечная размытая копия в виде data: URI.', verbose_name='Заглушка'),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='size',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Размер, байт'),
+        ),
+        migrations.AddField(
+            model_name='storedimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Ширина'),
+        ),
+    ]
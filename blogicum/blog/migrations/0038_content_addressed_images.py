@@ -0,0 +1,35 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:43
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_refcount(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    StoredImage = apps.get_model('blog', 'StoredImage')
+    counts = Post.objects.filter(stored_image=OuterRef('pk')).order_by(
+    ).values('stored_image').annotate(total=Count('pk')).values('total')
+    StoredImage.objects.update(refcount=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0037_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedimage',
+            name='refcount',
+            field=models.PositiveIntegerField(default=0, help_text='Сколько постов используют этот файл.', verbose_name='Ссылок'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='birthdays_images', verbose_name='Фото'),
+        ),
+        migrations.RunPython(fill_refcount, migrations.RunPython.noop),
+    ]
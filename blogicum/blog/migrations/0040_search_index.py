@@ -0,0 +1,63 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:58
+
+from django.db import migrations, models
+
+
+def build_search_index(apps, schema_editor):
+    from blog.search_index import build_index, write_index
+
+    Post = apps.get_model('blog', 'Post')
+    write_index(
+        build_index(Post.objects.order_by('pk').values_list(
+            'pk', 'title', 'text').iterator()),
+        apps.get_model('blog', 'SearchTerm'),
+        apps.get_model('blog', 'SearchTrigram'),
+        apps.get_model('blog', 'SearchDocument'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0039_post_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('post_id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='Пост')),
+                ('terms', models.BinaryField(default=bytes, verbose_name='Основы')),
+            ],
+            options={
+                'verbose_name': 'проиндексированный пост',
+                'verbose_name_plural': 'Проиндексированные посты',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64, unique=True, verbose_name='Основа')),
+                ('postings', models.BinaryField(default=bytes, verbose_name='Посты')),
+                ('document_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+            ],
+            options={
+                'verbose_name': 'основа слова',
+                'verbose_name_plural': 'Основы слов',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, unique=True, verbose_name='Триграмма')),
+                ('terms', models.BinaryField(default=bytes, verbose_name='Основы')),
+            ],
+            options={
+                'verbose_name': 'триграмма',
+                'verbose_name_plural': 'Триграммы',
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-18 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0040_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.BigIntegerField(verbose_name='Пост')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'переиндексация поста',
+                'verbose_name_plural': 'Очередь индекса поиска',
+                'ordering': ('pk',),
+            },
+        ),
+    ]
@@ -1,14 +1,153 @@
-from django.shortcuts import get_object_or_404, redirect
+from hashlib import md5
+
+from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
+from core.cache import get_versions
+from .cache import FEED_TAG, get_cached_page, page_cache_key, set_cached_page
 from .models import Post, Comment
 from .forms import CommentsForm, CreatePostForm
+from .uploads import BoundedTemporaryFileUploadHandler
 
 User = get_user_model()
 
 
+class AnonymousPageCacheMixin:
+    """Отдаёт анонимным читателям страницу целиком из кэша.
+
+    Запись хранит версии тегов, с которыми страница была отрисована,
+    и перестаёт считаться действительной, как только сигналы моделей
+    сбросят любую из них.
+    """
+
+    page_cache_params = ('page', 'cursor')
+
+    def get_page_cache_tags(self):
+        """Теги, известные до обращения к базе."""
+        return [FEED_TAG]
+
+    def get_extra_page_cache_tags(self, context):
+        """Теги объектов, загруженных при отрисовке страницы."""
+        return []
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, self.page_cache_params)
+        response = get_cached_page(key)
+        if response is not None:
+            return get_conditional_response(
+                request, etag=response.get('ETag'), response=response)
+        versions = get_versions(self.get_page_cache_tags())
+        response = super().dispatch(request, *args, **kwargs)
+        if (response.status_code == 200
+                and hasattr(response, 'add_post_render_callback')):
+            def store(rendered):
+                versions.update(get_versions(
+                    self.get_extra_page_cache_tags(rendered.context_data)))
+                set_cached_page(key, rendered, versions)
+            response.add_post_render_callback(store)
+        return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 Not Modified, если страница не менялась.
+
+    Условный запрос сверяется с отпечатком, который get_freshness()
+    собирает лёгким запросом, до отрисовки шаблона. Обычному ответу
+    тот же отпечаток проставляется из уже загруженного контекста,
+    поэтому лишних обращений к базе не добавляется.
+
+    Last-Modified не отдаётся: страница меняется и без изменения
+    updated_at показанных записей (пост удалён или снят с публикации,
+    пересчитан счётчик комментариев), а ETag учитывает и состав
+    страницы.
+    """
+
+    def get_freshness(self):
+        """Значения, от которых зависит страница, без её отрисовки.
+
+        None отключает проверку условного запроса.
+        """
+        return None
+
+    def get_rendered_freshness(self, context):
+        """Те же значения, что и get_freshness(), но из контекста."""
+        return None
+
+    def get_etag(self, values):
+        """Возвращает ETag страницы или None."""
+        if values is None:
+            return None
+        request = self.request
+        viewer = None
+        if request.user.is_authenticated:
+            viewer = (request.user.pk, request.user.get_username(),
+                      request.META.get('CSRF_COOKIE'))
+        digest = md5(repr([
+            type(self).__name__, request.get_full_path(), viewer, values,
+        ]).encode()).hexdigest()
+        return f'W/"{digest}"'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            etag = self.get_etag(self.get_freshness())
+            if etag is not None:
+                response = get_conditional_response(request, etag=etag)
+                if response is not None:
+                    return response
+        response = super().dispatch(request, *args, **kwargs)
+        if (response.status_code == 200
+                and hasattr(response, 'add_post_render_callback')):
+            def set_etag(rendered):
+                etag = self.get_etag(
+                    self.get_rendered_freshness(rendered.context_data))
+                if etag is not None:
+                    rendered['ETag'] = etag
+            response.add_post_render_callback(set_etag)
+        return response
+
+
+class BoundedUploadMixin:
+    """Принимает загрузки через BoundedTemporaryFileUploadHandler.
+
+    Обработчик ставится до того, как кто-либо прочитает тело запроса.
+    CsrfViewMiddleware читает request.POST ещё до представления,
+    поэтому CSRF проверяется уже здесь, после установки обработчика.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers.insert(
+            0, BoundedTemporaryFileUploadHandler(request))
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+
+class SingleFetchObjectMixin:
+    """Загружает объект один раз за запрос.
+
+    Проверка прав в dispatch(), форма и шаблон получают один и тот же
+    экземпляр вместо повторного запроса в get_object().
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
 class PostFormMixin:
     model = Post
     template_name = 'blog/create.html'
@@ -19,16 +158,18 @@ class PostFormMixin:
         return super().form_valid(form)
 
 
-class PostDispatchMixin:
+class PostDispatchMixin(SingleFetchObjectMixin):
     model = Post
     template_name = 'blog/create.html'
     form_class = CreatePostForm
     pk_url_kwarg = 'post_id'
     pk_field = 'post_id'
 
+    def get_queryset(self):
+        return Post.objects.select_related('author', 'category', 'location')
+
     def dispatch(self, request, *args, **kwargs):
-        instance = get_object_or_404(Post, pk=kwargs['post_id'])
-        if instance.author != self.request.user:
+        if self.get_object().author_id != self.request.user.pk:
             return redirect('blog:post_detail', self.kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
@@ -50,9 +191,15 @@ class CommentMixin:
                        )
 
 
-class CommentEditDeletePermission(LoginRequiredMixin):
+class CommentEditDeletePermission(SingleFetchObjectMixin,
+                                  LoginRequiredMixin):
+    pk_url_kwarg = 'comment_id'
+
+    def get_queryset(self):
+        return Comment.objects.select_related('author').filter(
+            post_id=self.kwargs['post_id'])
+
     def dispatch(self, request, **kwargs):
-        instance = get_object_or_404(Comment, id=self.kwargs['comment_id'])
-        if instance.author != self.request.user:
+        if self.get_object().author_id != self.request.user.pk:
             return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
         return super().dispatch(request, **kwargs)
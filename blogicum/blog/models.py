@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from core.models import BaseModel
+from core.storage import ContentAddressedStorage
 
 User = get_user_model()
 
@@ -41,6 +43,135 @@ class Location(BaseModel):
         return self.name
 
 
+class StoredImage(models.Model):
+    name = models.CharField('Файл', max_length=255, unique=True)
+    variants = models.JSONField(
+        'Уменьшенные копии',
+        default=dict,
+        blank=True,
+        help_text='Ширина готовых копий по названию варианта.'
+    )
+    width = models.PositiveIntegerField('Ширина', null=True, blank=True)
+    height = models.PositiveIntegerField('Высота', null=True, blank=True)
+    size = models.PositiveIntegerField('Размер, байт', null=True, blank=True)
+    placeholder = models.TextField(
+        'Заглушка',
+        blank=True,
+        help_text='Крошечная размытая копия в виде data: URI.'
+    )
+    refcount = models.PositiveIntegerField(
+        'Ссылок',
+        default=0,
+        help_text='Сколько постов используют этот файл.'
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'изображение'
+        verbose_name_plural = 'Изображения'
+
+    def __str__(self):
+        return self.name
+
+
+class ImageJobQuerySet(models.QuerySet):
+    def claim(self, limit, stale_after):
+        """Забирает до limit задач в работу и возвращает их.
+
+        Задача переводится в RUNNING условным UPDATE, поэтому несколько
+        воркеров не возьмут одну и ту же. Задачи, зависшие в RUNNING
+        дольше stale_after, считаются брошенными и берутся заново.
+        """
+        now = timezone.now()
+        available = models.Q(status=ImageJob.PENDING) | models.Q(
+            status=ImageJob.RUNNING, started_at__lt=now - stale_after)
+        ids = list(self.filter(available).order_by(
+            'created_at', 'pk').values_list('pk', flat=True)[:limit])
+        claimed = []
+        for pk in ids:
+            if self.filter(available, pk=pk).update(
+                    status=ImageJob.RUNNING, started_at=now,
+                    attempts=models.F('attempts') + 1):
+                claimed.append(pk)
+        return list(self.filter(pk__in=claimed).select_related('image'))
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+    # После стольких неудачных попыток задача больше не повторяется.
+    MAX_ATTEMPTS = 3
+
+    image = models.ForeignKey(
+        StoredImage,
+        verbose_name='Изображение',
+        on_delete=models.CASCADE,
+        related_name='jobs'
+    )
+    status = models.CharField(
+        'Статус',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    error = models.TextField('Ошибка', blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Начато', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+
+    objects = ImageJobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('-created_at',)
+        indexes = [
+            models.Index(fields=['status', 'created_at'],
+                         name='blog_imagejob_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class PostQuerySet(models.QuerySet):
+    # Пост, его категория и местоположение опубликованы.
+    PUBLISHED = models.Q(is_published=True,
+                         category__is_published=True,
+                         location__is_published=True)
+
+    def visible_condition(self):
+        """Условие попадания поста в публичные ленты на текущий момент."""
+        return self.PUBLISHED & models.Q(pub_date__lte=timezone.now())
+
+    def refresh_visibility(self):
+        """Пересчитывает is_visible и возвращает число изменённых постов."""
+        visible = self.visible_condition()
+        shown = self.filter(visible).exclude(
+            is_visible=True).update(is_visible=True)
+        hidden = self.exclude(visible).exclude(
+            is_visible=False).update(is_visible=False)
+        return shown + hidden
+
+    def due_for_publication(self):
+        """Отложенные посты, дата публикации которых уже наступила."""
+        return self.filter(self.visible_condition(), is_visible=False)
+
+    def next_publication_date(self):
+        return self.filter(
+            self.PUBLISHED, is_visible=False, pub_date__gt=timezone.now()
+        ).aggregate(next_date=models.Min('pub_date'))['next_date']
+
+
 class Post(BaseModel):
     title = models.CharField(
         verbose_name='Заголовок',
@@ -57,6 +188,7 @@ class Post(BaseModel):
     image = models.ImageField(
         'Фото',
         upload_to='birthdays_images',
+        storage=ContentAddressedStorage(),
         blank=True
     )
     author = models.ForeignKey(
@@ -77,6 +209,60 @@ class Post(BaseModel):
         null=True,
         blank=False
     )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    stored_image = models.ForeignKey(
+        StoredImage,
+        verbose_name='Обработанное фото',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='posts'
+    )
+    is_visible = models.BooleanField(
+        'Виден в ленте',
+        default=False,
+        editable=False,
+        help_text=('Пост, категория и местоположение опубликованы, '
+                   'а дата публикации наступила.')
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    # Поля, которые меняются только UPDATE из сигналов и команд,
+    # поэтому save() устаревшего экземпляра не должен их затирать.
+    MAINTAINED_FIELDS = ('comment_count', 'stored_image')
+
+    def get_visibility(self):
+        return bool(
+            self.is_published
+            and self.category_id and self.category.is_published
+            and self.location_id and self.location.is_published
+            and self.pub_date <= timezone.now()
+        )
+
+    def save(self, *args, **kwargs):
+        self.is_visible = self.get_visibility()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_visible'}
+        if (self.pk is not None and not self._state.adding
+                and kwargs.get('update_fields') is None):
+            # Как и Model.save(), отложенные поля не дозагружаются
+            # и не пишутся. С update_fields save() поста, удалённого
+            # тем временем, не вставляет его заново, а падает DatabaseError.
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.MAINTAINED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse('blog:profile', kwargs={'username': self.author})
@@ -85,6 +271,13 @@ class Post(BaseModel):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date', ]
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='blog_post_visible_feed_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -101,3 +294,75 @@ class Comment(BaseModel):
 
     class Meta:
         ordering = ('created_at',)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class SearchTerm(models.Model):
+    """Основа слова и упакованный список постов, где она встречается.
+
+    Формат postings описан в blog.search_index.
+    """
+
+    term = models.CharField('Основа', max_length=64, unique=True)
+    postings = models.BinaryField('Посты', default=bytes)
+    document_count = models.PositiveIntegerField('Постов', default=0)
+
+    class Meta:
+        verbose_name = 'основа слова'
+        verbose_name_plural = 'Основы слов'
+
+    def __str__(self):
+        return self.term
+
+
+class SearchTrigram(models.Model):
+    """Триграмма и упакованный список основ, в которых она есть."""
+
+    trigram = models.CharField('Триграмма', max_length=3, unique=True)
+    terms = models.BinaryField('Основы', default=bytes)
+
+    class Meta:
+        verbose_name = 'триграмма'
+        verbose_name_plural = 'Триграммы'
+
+    def __str__(self):
+        return self.trigram
+
+
+class SearchDocument(models.Model):
+    """Основы, под которыми проиндексирован пост.
+
+    Нужны, чтобы при изменении или удалении поста убрать его только
+    из тех списков, где он есть. Внешнего ключа нет: запись удаляет
+    воркер process_search_index, когда пост уже удалён.
+    """
+
+    post_id = models.BigIntegerField('Пост', primary_key=True)
+    terms = models.BinaryField('Основы', default=bytes)
+
+    class Meta:
+        verbose_name = 'проиндексированный пост'
+        verbose_name_plural = 'Проиндексированные посты'
+
+
+class SearchIndexJob(models.Model):
+    """Пост, который нужно переиндексировать.
+
+    Сигналы только добавляют строку, а индекс обновляет воркер
+    process_search_index. Внешнего ключа нет: задача на удалённый пост
+    убирает его из индекса.
+    """
+
+    post_id = models.BigIntegerField('Пост')
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'переиндексация поста'
+        verbose_name_plural = 'Очередь индекса поиска'
+        ordering = ('pk',)
+
+    def __str__(self):
+        return str(self.post_id)
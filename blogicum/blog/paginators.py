@@ -0,0 +1,146 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class CursorPage:
+    """Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса Page, которой пользуются шаблоны,
+    но не знает ни номера страницы, ни общего числа объектов.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по ключу сортировки вместо OFFSET.
+
+    Курсор хранит значения полей `ordering` у крайнего поста страницы,
+    поэтому следующая страница выбирается условием по индексу,
+    а не пропуском предыдущих строк. COUNT(*) не выполняется.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    @property
+    def fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        values = [
+            self.object_list.model._meta.get_field(name).value_to_string(obj)
+            for name in self.fields
+        ]
+        raw = json.dumps([direction, *values], separators=(',', ':'))
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Возвращает направление и значения полей или None."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, *values = json.loads(urlsafe_b64decode(padded))
+            if direction not in (NEXT, PREVIOUS):
+                return None
+            if len(values) != len(self.fields):
+                return None
+            opts = self.object_list.model._meta
+            values = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+            # to_python(None) возвращает None, а сравнение с NULL
+            # в условии курсора не имеет смысла.
+            if None in values:
+                return None
+            # Значение, которое прошло to_python, но не годится
+            # для поиска, отвергается здесь же, а не ошибкой 500.
+            self.object_list.filter(self._seek(values, reverse=False))
+            return direction, values
+        except (BinasciiError, ValueError, TypeError, ValidationError):
+            return None
+
+    def _seek(self, values, reverse):
+        """Условие «строго после курсора» для составного ключа."""
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            descending = name.startswith('-') != reverse
+            field = name.lstrip('-')
+            step = Q(**{f'{field}__{"lt" if descending else "gt"}':
+                        values[position]})
+            for prev_name, prev_value in zip(self.fields[:position],
+                                             values[:position]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            direction, queryset = NEXT, self.object_list.order_by(
+                *self.ordering)
+        elif decoded[0] == NEXT:
+            direction, queryset = NEXT, self.object_list.filter(
+                self._seek(decoded[1], reverse=False)
+            ).order_by(*self.ordering)
+        else:
+            direction, queryset = PREVIOUS, self.object_list.filter(
+                self._seek(decoded[1], reverse=True)
+            ).order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+        return CursorPage(
+            rows,
+            self,
+            self.encode_cursor(NEXT, rows[-1]) if rows and has_next else None,
+            (self.encode_cursor(PREVIOUS, rows[0])
+             if rows and has_previous else None),
+        )
@@ -0,0 +1,161 @@
+"""Полнотекстовый поиск по постам.
+
+SEARCH_BACKEND выбирает, кто находит посты: 'index' — собственный
+индекс по основам слов с исправлением опечаток (blog.search_index),
+'fts' — FTS5 в SQLite. Фрагменты с подсветкой в обоих случаях строит
+FTS5: индекс blog_post_search и триггеры, которые держат его
+в согласии с blog_post, создаёт миграция 0039_post_search.
+
+Запрос читателя не передаётся в FTS5 как есть: из него берутся только
+слова (или их основы), каждое ищется по префиксу, так что синтаксис
+FTS5 в запросе ничего не ломает.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from . import search_index
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+WORD_RE = re.compile(r'\w+')
+# Не больше стольких слов из запроса.
+MAX_TERMS = 8
+SNIPPET_TOKENS = 24
+
+# Метки начала и конца совпадения. Текст поста экранируется уже после
+# snippet(), и только потом метки заменяются тегами <mark>.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+
+def match_expression(query):
+    """Выражение MATCH для FTS5 или None, если в запросе нет слов."""
+    terms = WORD_RE.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def terms_expression(groups):
+    """Выражение MATCH по основам: любая основа слова, все слова сразу."""
+    return ' '.join(
+        '(' + ' OR '.join(f'"{term}"*' for term in terms) + ')'
+        for terms in groups
+    )
+
+
+class RankedPosts:
+    """Посты в порядке, заданном списком id, для Paginator.
+
+    Видимость проверяется запросом к posts пачками id, а загружаются
+    только посты выводимой страницы.
+    """
+
+    def __init__(self, posts, ids):
+        self.posts = posts
+        self.ids = ids
+        self._visible = None
+
+    def visible_ids(self):
+        if self._visible is None:
+            visible = set()
+            for start in range(0, len(self.ids), search_index.BATCH_SIZE):
+                visible.update(self.posts.filter(pk__in=self.ids[
+                    start:start + search_index.BATCH_SIZE
+                ]).values_list('pk', flat=True))
+            self._visible = [pk for pk in self.ids if pk in visible]
+        return self._visible
+
+    def count(self):
+        return len(self.visible_ids())
+
+    def __getitem__(self, index):
+        ids = self.visible_ids()[index]
+        posts = self.posts.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def find_posts(posts, query):
+    """Посты из posts по запросу и выражение MATCH для фрагментов.
+
+    Если в запросе нет ни одного слова, возвращает (None, None).
+    """
+    if settings.SEARCH_BACKEND == 'fts':
+        expression = match_expression(query)
+        if expression is None:
+            return None, None
+        return search_posts(posts, expression), expression
+    if not any(search_index.tokenize(query)):
+        return None, None
+    ids, groups = search_index.search(query)
+    return RankedPosts(posts, ids), terms_expression(groups)
+
+
+def search_posts(posts, expression):
+    """Посты из posts, подходящие под expression, по убыванию релевантности.
+
+    Видимость задаёт сам posts (см. get_post_info), индекс лишь сужает
+    выборку по rowid и даёт bm25 для сортировки.
+    """
+    table = Post._meta.db_table
+    return posts.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        (expression,),
+    )).annotate(search_rank=RawSQL(
+        f'SELECT rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s'
+        f' AND rowid = {table}.id',
+        (expression,), output_field=FloatField(),
+    )).order_by('search_rank', '-pub_date', '-id')
+
+
+def mark_matches(fragment):
+    return mark_safe(escape(fragment).replace(
+        MATCH_START, '<mark>').replace(MATCH_END, '</mark>'))
+
+
+def attach_snippets(posts, expression):
+    """Добавляет постам страницы search_title и search_snippet.
+
+    Фрагменты строятся одним запросом и только для выведенных постов.
+    """
+    posts = list(posts)
+    if not posts:
+        return posts
+    ids = [post.pk for post in posts]
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid,'
+            f' highlight({SEARCH_TABLE}, 0, %s, %s),'
+            f' snippet({SEARCH_TABLE}, 1, %s, %s, %s, %s)'
+            f' FROM {SEARCH_TABLE}'
+            f' WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({placeholders})',
+            [MATCH_START, MATCH_END, MATCH_START, MATCH_END, '…',
+             SNIPPET_TOKENS, expression, *ids],
+        )
+        fragments = {row[0]: row[1:] for row in cursor.fetchall()}
+    for post in posts:
+        title, snippet = fragments.get(post.pk, (post.title, ''))
+        post.search_title = mark_matches(title)
+        post.search_snippet = mark_matches(snippet)
+    return posts
+
+
+def rebuild_index():
+    """Перестраивает индекс по текущему содержимому blog_post."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def optimize_index():
+    """Сливает сегменты индекса в один."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
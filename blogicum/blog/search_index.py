@@ -0,0 +1,522 @@
+"""Поисковый индекс по основам слов с исправлением опечаток.
+
+Текст разбивается на слова, каждое сводится к основе стеммером
+(см. blog.stemmer), так что «молоко» находит и «молока». Для каждой
+основы хранится список постов (postings): отсортированные числа
+`id << 1 | в_заголовке`, упакованные разностями в varint — обычно
+по байту-два на пост. Опечатки исправляются по триграммам: для основы,
+которой нет в словаре, берутся похожие основы из индекса триграмм,
+тоже хранящего упакованные списки id.
+
+Сохранение и удаление поста только ставят его в очередь SearchIndexJob
+(см. signals); индекс обновляет воркер process_search_index пачками,
+так что каждый список postings перезаписывается раз на пачку, а не
+в каждом запросе. Команда rebuild_search_index строит индекс заново
+через MemoryIndex.
+"""
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from math import log
+
+from django.db import transaction
+
+from .models import (
+    Post, SearchDocument, SearchIndexJob, SearchTerm, SearchTrigram,
+)
+from .stemmer import stem
+
+WORD_RE = re.compile(r'\w+')
+MAX_WORD_LENGTH = 40
+MAX_QUERY_WORDS = 8
+
+STOP_WORDS = frozenset((
+    'а', 'без', 'бы', 'в', 'во', 'вот', 'все', 'всё', 'да', 'для', 'до',
+    'же', 'за', 'и', 'из', 'или', 'к', 'ко', 'как', 'ли', 'на', 'над',
+    'не', 'ни', 'но', 'о', 'об', 'от', 'по', 'под', 'при', 'про', 'с',
+    'со', 'так', 'то', 'у', 'уже', 'что', 'это', 'я',
+))
+
+TITLE_FLAG = 1
+# Во сколько раз совпадение в заголовке весомее совпадения в тексте.
+TITLE_WEIGHT = 2
+POSTINGS_TYPE = 'Q'
+
+# Исправление опечаток: для основы не короче FUZZY_MIN_LENGTH
+# кандидаты отбираются по общим триграммам, а принимаются те, что
+# отличаются не больше чем на одну правку (на две — с FUZZY_LONG букв).
+FUZZY_MIN_LENGTH = 4
+FUZZY_LONG = 8
+FUZZY_CANDIDATES = 200
+FUZZY_LIMIT = 3
+
+# Основа не короче PREFIX_MIN_LENGTH находит и более длинные основы,
+# которые с неё начинаются («велосипед» — «велосипедн»), но не больше
+# PREFIX_LIMIT самых частых.
+PREFIX_MIN_LENGTH = 3
+PREFIX_LIMIT = 20
+PREFIX_END = '\uffff'
+
+# Сколько лучших постов ранжируется и проверяется на видимость.
+MAX_RESULTS = 1000
+BATCH_SIZE = 500
+
+
+def tokenize(text):
+    for word in WORD_RE.findall(text.lower()):
+        if len(word) <= MAX_WORD_LENGTH and word not in STOP_WORDS:
+            yield word
+
+
+def document_terms(title, text):
+    """Основы поста и флаг «встречается в заголовке»."""
+    terms = dict.fromkeys((stem(word) for word in tokenize(text)), 0)
+    terms.update(dict.fromkeys(
+        (stem(word) for word in tokenize(title)), TITLE_FLAG))
+    return terms
+
+
+def encode(values):
+    """Упаковывает возрастающую последовательность разностями в varint."""
+    data = bytearray()
+    previous = 0
+    for value in values:
+        delta = value - previous
+        previous = value
+        while delta > 0x7f:
+            data.append(delta & 0x7f | 0x80)
+            delta >>= 7
+        data.append(delta)
+    return bytes(data)
+
+
+def decode(data):
+    values = array(POSTINGS_TYPE)
+    value = shift = delta = 0
+    for byte in data:
+        delta |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        value += delta
+        values.append(value)
+        delta = shift = 0
+    return values
+
+
+def add_posting(postings, doc_id, flag):
+    """Добавляет или обновляет пост в списке; True, если список изменён."""
+    value = doc_id << 1 | flag
+    position = bisect_left(postings, doc_id << 1)
+    if position < len(postings) and postings[position] >> 1 == doc_id:
+        if postings[position] == value:
+            return False
+        postings[position] = value
+        return True
+    postings.insert(position, value)
+    return True
+
+
+def remove_posting(postings, doc_id):
+    position = bisect_left(postings, doc_id << 1)
+    if position < len(postings) and postings[position] >> 1 == doc_id:
+        del postings[position]
+        return True
+    return False
+
+
+def trigrams(term):
+    padded = f' {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(first, second, limit):
+    """Расстояние Дамерау — Левенштейна или limit + 1, если оно больше."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        before, previous = previous, current
+        current = [i] + [0] * len(second)
+        for j, other in enumerate(second, 1):
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1,
+                previous[j - 1] + (char != other))
+            if (before is not None and j > 1 and char == second[j - 2]
+                    and first[i - 2] == other):
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def rank(groups, total):
+    """Id постов, где встретилось каждое слово запроса, по убыванию веса.
+
+    groups — для каждого слова списки postings его основ (сама основа
+    и исправления опечатки). Вес основы — её idf, совпадение
+    в заголовке весит TITLE_WEIGHT раз больше.
+    """
+    scores = None
+    groups = sorted(groups, key=lambda lists: sum(map(len, lists)))
+    for lists in groups:
+        word_scores = {}
+        for postings in lists:
+            weight = log(1 + total / max(len(postings), 1))
+            for value in postings:
+                doc_id = value >> 1
+                score = weight * (TITLE_WEIGHT if value & TITLE_FLAG else 1)
+                if score > word_scores.get(doc_id, 0):
+                    word_scores[doc_id] = score
+        if scores is None:
+            scores = word_scores
+        else:
+            scores = {
+                doc_id: score + word_scores[doc_id]
+                for doc_id, score in scores.items() if doc_id in word_scores
+            }
+        if not scores:
+            return []
+    return sorted(scores, key=lambda doc_id: (-scores[doc_id], -doc_id))
+
+
+class Searcher:
+    """Поиск поверх хранилища основ и триграмм.
+
+    Хранилище (MemoryIndex или DatabaseIndex) отдаёт postings основ,
+    списки основ для триграмм и число документов.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def expand(self, term):
+        """Основа и продолжающие её основы, а если таких нет — похожие."""
+        if len(term) < PREFIX_MIN_LENGTH:
+            return self.index.term_postings([term])
+        found = self.index.prefix_postings(term, PREFIX_LIMIT)
+        if found or len(term) < FUZZY_MIN_LENGTH:
+            return found
+        limit = 2 if len(term) >= FUZZY_LONG else 1
+        grams = trigrams(term)
+        counts = Counter()
+        for term_ids in self.index.trigram_terms(grams).values():
+            counts.update(term_ids)
+        # Одна правка меняет не больше трёх триграмм.
+        needed = len(grams) - 3 * limit
+        names = self.index.term_names([
+            term_id for term_id, count in counts.most_common(
+                FUZZY_CANDIDATES) if count >= needed
+        ])
+        distances = sorted(
+            (edit_distance(term, name, limit), name) for name in names)
+        return self.index.term_postings([
+            name for distance, name in distances[:FUZZY_LIMIT]
+            if distance <= limit
+        ])
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Возвращает (id постов по релевантности, основы по словам)."""
+        words = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_WORDS]
+        groups, matched = [], []
+        for word in words:
+            found = self.expand(stem(word))
+            if not found:
+                return [], []
+            groups.append(list(found.values()))
+            matched.append(list(found))
+        if not groups:
+            return [], []
+        ranked = rank(groups, self.index.document_count())
+        return ranked[:limit], matched
+
+
+class MemoryIndex:
+    """Индекс целиком в памяти.
+
+    Посты добавляются по возрастанию id, поэтому postings дописываются
+    в конец уже упакованными. Используется при перестройке индекса
+    в базе и в бенчмарке.
+    """
+
+    def __init__(self):
+        self.postings = defaultdict(bytearray)
+        self.last = {}
+        self.counts = Counter()
+        self.documents = 0
+        self.names = []
+        self.trigrams = {}
+
+    def add(self, doc_id, title, text):
+        self.documents += 1
+        for term, flag in document_terms(title, text).items():
+            value = doc_id << 1 | flag
+            delta = value - self.last.get(term, 0)
+            self.last[term] = value
+            self.counts[term] += 1
+            data = self.postings[term]
+            while delta > 0x7f:
+                data.append(delta & 0x7f | 0x80)
+                delta >>= 7
+            data.append(delta)
+
+    def finish(self):
+        """Нумерует основы по алфавиту и строит индекс триграмм."""
+        self.names = sorted(self.postings)
+        grams = defaultdict(list)
+        for term_id, name in enumerate(self.names, 1):
+            for gram in trigrams(name):
+                grams[gram].append(term_id)
+        self.trigrams = {
+            gram: encode(term_ids) for gram, term_ids in grams.items()}
+        return self
+
+    def size(self):
+        """Объём упакованных postings и триграмм в байтах."""
+        return (sum(map(len, self.postings.values()))
+                + sum(len(name.encode()) for name in self.names)
+                + sum(map(len, self.trigrams.values())))
+
+    def term_postings(self, names):
+        return {name: decode(self.postings[name])
+                for name in names if name in self.postings}
+
+    def prefix_postings(self, prefix, limit):
+        start = bisect_left(self.names, prefix)
+        end = bisect_left(self.names, prefix + PREFIX_END)
+        names = sorted(self.names[start:end],
+                       key=self.counts.__getitem__, reverse=True)
+        return self.term_postings(names[:limit])
+
+    def trigram_terms(self, grams):
+        return {gram: decode(self.trigrams[gram])
+                for gram in grams if gram in self.trigrams}
+
+    def term_names(self, term_ids):
+        return [self.names[term_id - 1] for term_id in term_ids]
+
+    def document_count(self):
+        return self.documents
+
+
+class DatabaseIndex:
+    """Хранилище индекса в таблицах SearchTerm и SearchTrigram."""
+
+    def term_postings(self, names):
+        return {
+            term: decode(postings)
+            for term, postings in SearchTerm.objects.filter(
+                term__in=names, document_count__gt=0,
+            ).values_list('term', 'postings')
+        }
+
+    def prefix_postings(self, prefix, limit):
+        # Диапазон по уникальному индексу, а не LIKE 'prefix%'.
+        return {
+            term: decode(postings)
+            for term, postings in SearchTerm.objects.filter(
+                term__gte=prefix, term__lt=prefix + PREFIX_END,
+                document_count__gt=0,
+            ).order_by('-document_count').values_list(
+                'term', 'postings')[:limit]
+        }
+
+    def trigram_terms(self, grams):
+        return {
+            gram: decode(terms)
+            for gram, terms in SearchTrigram.objects.filter(
+                trigram__in=grams).values_list('trigram', 'terms')
+        }
+
+    def term_names(self, term_ids):
+        return list(SearchTerm.objects.filter(
+            pk__in=term_ids, document_count__gt=0,
+        ).values_list('term', flat=True))
+
+    def document_count(self):
+        return SearchDocument.objects.count()
+
+
+def search(query):
+    return Searcher(DatabaseIndex()).search(query)
+
+
+def add_trigrams(terms):
+    """Вносит новые основы в индекс триграмм."""
+    grams = defaultdict(list)
+    for term in terms:
+        for gram in trigrams(term.term):
+            grams[gram].append(term.pk)
+    existing = {row.trigram: row for row in SearchTrigram.objects.filter(
+        trigram__in=list(grams))}
+    for gram, term_ids in grams.items():
+        row = existing.get(gram)
+        if row is None:
+            existing[gram] = SearchTrigram(trigram=gram, terms=encode(
+                sorted(term_ids)))
+            continue
+        values = decode(row.terms)
+        values.extend(term_ids)
+        row.terms = encode(sorted(set(values)))
+    SearchTrigram.objects.bulk_create(
+        [row for row in existing.values() if row.pk is None],
+        batch_size=BATCH_SIZE)
+    SearchTrigram.objects.bulk_update(
+        [row for row in existing.values() if row.pk is not None],
+        ['terms'], batch_size=BATCH_SIZE)
+
+
+def get_or_create_terms(names):
+    terms = {term.term: term for term in SearchTerm.objects.filter(
+        term__in=names)}
+    missing = [name for name in names if name not in terms]
+    if missing:
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=name) for name in missing],
+            batch_size=BATCH_SIZE, ignore_conflicts=True)
+        created = list(SearchTerm.objects.filter(term__in=missing))
+        add_trigrams(created)
+        terms.update((term.term, term) for term in created)
+    return terms
+
+
+def queue_post(post_id):
+    """Ставит пост в очередь на переиндексацию.
+
+    Вызывается из сигналов при сохранении и удалении поста: запрос
+    только добавляет строку, а postings обновляет process_queue()
+    в воркере process_search_index.
+    """
+    SearchIndexJob.objects.create(post_id=post_id)
+
+
+def change_postings(current, documents, new_terms):
+    """Применяет изменения постов к postings основ из current.
+
+    Каждый список распаковывается один раз на пачку, сколько бы постов
+    в нём ни поменялось. Возвращает изменённые основы.
+    """
+    names = {term.pk: name for name, term in current.items()}
+    lists = {}
+
+    def postings(name):
+        if name not in lists:
+            lists[name] = decode(current[name].postings)
+        return lists[name]
+
+    changed = set()
+    for post_id, terms in new_terms.items():
+        document = documents.get(post_id)
+        old_ids = decode(document.terms) if document else ()
+        for name in {names[term_id] for term_id in old_ids} - set(terms):
+            if remove_posting(postings(name), post_id):
+                changed.add(name)
+        for name, flag in terms.items():
+            if add_posting(postings(name), post_id, flag):
+                changed.add(name)
+    for name in changed:
+        current[name].postings = encode(lists[name])
+        current[name].document_count = len(lists[name])
+    return [current[name] for name in changed]
+
+
+@transaction.atomic
+def update_posts(sources):
+    """Переиндексирует пачку постов.
+
+    sources — {id поста: (заголовок, текст)}, None вместо текста
+    означает, что пост удалён и его нужно убрать из индекса.
+    """
+    new_terms = {
+        post_id: document_terms(*source) if source is not None else {}
+        for post_id, source in sources.items()
+    }
+    documents = SearchDocument.objects.in_bulk(list(sources))
+    old_ids = set()
+    for document in documents.values():
+        old_ids.update(decode(document.terms))
+    # На PostgreSQL строки основ блокируются до конца транзакции;
+    # SQLite и так пропускает одного писателя.
+    current = {term.term: term for term in SearchTerm.objects.filter(
+        pk__in=old_ids).order_by('pk').select_for_update()}
+    current.update(get_or_create_terms(sorted(
+        {name for terms in new_terms.values() for name in terms}
+        - set(current))))
+    SearchTerm.objects.bulk_update(
+        change_postings(current, documents, new_terms),
+        ['postings', 'document_count'], batch_size=BATCH_SIZE)
+    SearchDocument.objects.filter(pk__in=list(sources)).delete()
+    SearchDocument.objects.bulk_create([
+        SearchDocument(post_id=post_id, terms=encode(
+            sorted(current[name].pk for name in terms)))
+        for post_id, terms in new_terms.items() if terms
+    ], batch_size=BATCH_SIZE)
+
+
+def process_queue(limit=BATCH_SIZE):
+    """Применяет до limit задач очереди; возвращает число постов.
+
+    Задачи удаляются в той же транзакции, что и обновление индекса:
+    если она не удалась, они останутся в очереди до следующего раза.
+    """
+    with transaction.atomic():
+        jobs = list(SearchIndexJob.objects.order_by('pk').values_list(
+            'pk', 'post_id')[:limit])
+        if not jobs:
+            return 0
+        sources = dict.fromkeys(post_id for _, post_id in jobs)
+        sources.update(
+            (pk, (title, text)) for pk, title, text in Post.objects.filter(
+                pk__in=list(sources)).values_list('pk', 'title', 'text'))
+        update_posts(sources)
+        SearchIndexJob.objects.filter(
+            pk__in=[pk for pk, _ in jobs]).delete()
+    return len(sources)
+
+
+def build_index(posts):
+    """Строит MemoryIndex по (id, заголовок, текст) по возрастанию id."""
+    index = MemoryIndex()
+    for post_id, title, text in posts:
+        index.add(post_id, title, text)
+    return index.finish()
+
+
+def write_index(index, term_model=SearchTerm, trigram_model=SearchTrigram,
+                document_model=SearchDocument):
+    """Заменяет содержимое таблиц индекса построенным MemoryIndex.
+
+    Модели передаются параметрами, чтобы индекс можно было записать
+    и из миграции.
+    """
+    document_model.objects.all().delete()
+    trigram_model.objects.all().delete()
+    term_model.objects.all().delete()
+    documents = defaultdict(list)
+    terms = []
+    for term_id, name in enumerate(index.names, 1):
+        data = bytes(index.postings[name])
+        terms.append(term_model(
+            pk=term_id, term=name, postings=data,
+            document_count=index.counts[name]))
+        for value in decode(data):
+            documents[value >> 1].append(term_id)
+    term_model.objects.bulk_create(terms, batch_size=BATCH_SIZE)
+    trigram_model.objects.bulk_create(
+        [trigram_model(trigram=gram, terms=data)
+         for gram, data in index.trigrams.items()],
+        batch_size=BATCH_SIZE)
+    document_model.objects.bulk_create(
+        [document_model(post_id=post_id, terms=encode(term_ids))
+         for post_id, term_ids in documents.items()],
+        batch_size=BATCH_SIZE)
+
+
+@transaction.atomic
+def rebuild():
+    """Строит индекс заново по всем постам; возвращает MemoryIndex."""
+    index = build_index(Post.objects.order_by('pk').values_list(
+        'pk', 'title', 'text').iterator())
+    write_index(index)
+    return index
@@ -0,0 +1,172 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from core.cache import invalidate, object_tag
+from .cache import FEED_TAG
+from .images import release_image, sync_post_image
+from .search_index import queue_post
+from .models import Category, Comment, Location, Post, StoredImage
+
+User = get_user_model()
+
+# Отправляется с sender=Post и post_ids, когда отложенные посты
+# попадают в ленты (см. команду publish_scheduled).
+post_published = Signal()
+
+
+def change_comment_count(post_id, delta):
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(
+        comment_count=F('comment_count') + delta)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._initial_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        change_comment_count(instance.post_id, 1)
+        invalidate(FEED_TAG)
+    elif instance._initial_post_id not in (None, instance.post_id):
+        change_comment_count(instance._initial_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+        invalidate(FEED_TAG, object_tag(Post, instance._initial_post_id))
+    invalidate(object_tag(Post, instance.post_id))
+    instance._initial_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+    invalidate(FEED_TAG, object_tag(Post, instance.post_id))
+
+
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Location)
+def remember_publication(sender, instance, **kwargs):
+    instance._initial_is_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def refresh_related_visibility(sender, instance, created, raw=False,
+                               **kwargs):
+    if created and not raw:
+        return
+    # loaddata сохраняет объекты мимо save(): посты из фикстуры могли
+    # загрузиться раньше своей категории или местоположения.
+    if raw or instance._initial_is_published != instance.is_published:
+        lookup = 'category' if sender is Category else 'location'
+        Post.objects.filter(**{lookup: instance}).refresh_visibility()
+    instance._initial_is_published = instance.is_published
+
+
+@receiver(post_save, sender=Post)
+def refresh_loaded_visibility(sender, instance, raw=False, **kwargs):
+    # Post.save() при загрузке фикстуры не вызывается, и is_visible
+    # остался бы тем, что записан в файле.
+    if raw:
+        Post.objects.filter(pk=instance.pk).refresh_visibility()
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def hide_orphaned_posts(sender, instance, **kwargs):
+    lookup = 'category' if sender is Category else 'location'
+    Post.objects.filter(
+        **{f'{lookup}__isnull': True}, is_visible=True
+    ).update(is_visible=False)
+
+
+def image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._initial_image = instance.__dict__.get('image')
+
+
+@receiver(post_save, sender=Post)
+def replace_image_variants(sender, instance, created, raw=False, **kwargs):
+    if raw or (not created and instance._initial_image is None):
+        return
+    old_name = image_name(instance._initial_image)
+    new_name = image_name(instance.image)
+    if created or old_name != new_name:
+        sync_post_image(instance)
+        release_image(old_name)
+    instance._initial_image = new_name
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    release_image(image_name(instance.image))
+    instance.stored_image = None
+
+
+@receiver(post_init, sender=Post)
+def remember_search_source(sender, instance, **kwargs):
+    instance._initial_search_source = (
+        instance.__dict__.get('title'), instance.__dict__.get('text'))
+
+
+@receiver(post_save, sender=Post)
+def queue_saved_post(sender, instance, created, raw=False, **kwargs):
+    # Отложенные поля при сохранении не меняются, индексировать нечего.
+    # Фикстуры грузятся без индекса: после loaddata нужен
+    # rebuild_search_index, import_blog перестраивает индекс сам.
+    source = (instance.__dict__.get('title'), instance.__dict__.get('text'))
+    if raw or None in source or (
+            not created and source == instance._initial_search_source):
+        return
+    queue_post(instance.pk)
+    instance._initial_search_source = source
+
+
+@receiver(post_delete, sender=Post)
+def queue_deleted_post(sender, instance, **kwargs):
+    queue_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=StoredImage)
+@receiver(post_delete, sender=StoredImage)
+def invalidate_object(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate(FEED_TAG, object_tag(sender, instance.pk))
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._initial_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(sender, instance, created, raw=False,
+                    update_fields=None, **kwargs):
+    if created or raw or update_fields == frozenset({'last_login'}):
+        return
+    invalidate(object_tag(User, instance.pk))
+    if instance._initial_username != instance.username:
+        invalidate(FEED_TAG)
+    instance._initial_username = instance.username
+
+
+@receiver(post_published, sender=Post)
+def invalidate_published(sender, post_ids, **kwargs):
+    invalidate(FEED_TAG, *(object_tag(Post, pk) for pk in post_ids))
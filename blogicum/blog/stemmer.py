@@ -0,0 +1,128 @@
+"""Стеммер русского языка по алгоритму Snowball (Портера).
+
+Отбрасывает окончания и суффиксы, так что «молоко», «молока»
+и «молоком» дают одну основу «молок». Основа всегда является началом
+слова (с заменой «ё» на «е»), поэтому её можно искать и префиксом
+в индексе FTS5. Описание алгоритма:
+https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+from functools import lru_cache
+
+VOWELS = frozenset('аеиоуыэюя')
+
+
+def _longest_first(*endings):
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+# Окончания первой группы допускаются только после «а» или «я».
+PERFECTIVE_GERUND_1 = frozenset(('в', 'вши', 'вшись'))
+PERFECTIVE_GERUND = _longest_first(
+    *PERFECTIVE_GERUND_1, 'ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись')
+
+ADJECTIVE = _longest_first(
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею')
+
+PARTICIPLE_1 = frozenset(('ем', 'нн', 'вш', 'ющ', 'щ'))
+PARTICIPLE = _longest_first(*PARTICIPLE_1, 'ивш', 'ывш', 'ующ')
+
+REFLEXIVE = _longest_first('ся', 'сь')
+
+VERB_1 = frozenset((
+    'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+    'ют', 'ны', 'ть', 'ешь', 'нно'))
+VERB = _longest_first(
+    *VERB_1, 'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей',
+    'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует',
+    'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю')
+
+NOUN = _longest_first(
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я')
+
+SUPERLATIVE = _longest_first('ейш', 'ейше')
+DERIVATIONAL = _longest_first('ост', 'ость')
+
+
+def regions(word):
+    """Начала областей RV и R2.
+
+    RV — после первой гласной. R1 — после первой согласной, идущей
+    за гласной; R2 — так же внутри R1.
+    """
+    length = len(word)
+
+    def go_past(position, vowel):
+        while position < length:
+            if (word[position] in VOWELS) == vowel:
+                return position + 1
+            position += 1
+        return length
+
+    rv = go_past(0, True)
+    r2 = rv
+    for vowel in (False, True, False):
+        r2 = go_past(r2, vowel)
+    return rv, r2
+
+
+def find_ending(word, start, endings, after_a=frozenset()):
+    """Самое длинное окончание из endings, целиком лежащее после start.
+
+    Для окончаний из after_a перед ними должна стоять «а» или «я»
+    (тоже в пределах области); иначе окончание не найдено.
+    """
+    for ending in endings:
+        cut = len(word) - len(ending)
+        if cut >= start and word.endswith(ending):
+            if ending in after_a and (
+                    cut - 1 < start or word[cut - 1] not in 'ая'):
+                return None
+            return ending
+    return None
+
+
+def _remove(word, start, endings, after_a=frozenset()):
+    ending = find_ending(word, start, endings, after_a)
+    if ending is None:
+        return word, False
+    return word[:len(word) - len(ending)], True
+
+
+def _step_1(word, rv):
+    word, removed = _remove(word, rv, PERFECTIVE_GERUND, PERFECTIVE_GERUND_1)
+    if removed:
+        return word
+    word, _ = _remove(word, rv, REFLEXIVE)
+    word, removed = _remove(word, rv, ADJECTIVE)
+    if removed:
+        word, _ = _remove(word, rv, PARTICIPLE, PARTICIPLE_1)
+        return word
+    word, removed = _remove(word, rv, VERB, VERB_1)
+    if removed:
+        return word
+    return _remove(word, rv, NOUN)[0]
+
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    """Основа слова в нижнем регистре."""
+    word = word.lower().replace('ё', 'е')
+    rv, r2 = regions(word)
+    word = _step_1(word, rv)
+    # Шаг 2: «и» на конце.
+    word = _remove(word, rv, ('и',))[0]
+    # Шаг 3: словообразовательный суффикс в R2.
+    word = _remove(word, r2, DERIVATIONAL)[0]
+    # Шаг 4: «нн», превосходная степень или мягкий знак.
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    word, removed = _remove(word, rv, SUPERLATIVE)
+    if removed:
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+        return word
+    return _remove(word, rv, ('ь',))[0]
@@ -0,0 +1,45 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import card_tags
+from blog.metrics import card_cache_hits, card_cache_misses
+from core.cache import get_versions
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Возвращает HTML карточек постов, по возможности из кэша.
+
+    Ключ карточки складывается из версий поста, автора, категории
+    и местоположения; их изменение даёт новый ключ, а прежняя
+    карточка просто вытесняется по таймауту.
+    """
+    posts = list(posts)
+    post_tags = [card_tags(post) for post in posts]
+    versions = get_versions({tag for tags in post_tags for tag in tags})
+    keys = [
+        f'post_card:{post.pk}:' + ':'.join(
+            str(versions[tag]) for tag in tags)
+        for post, tags in zip(posts, post_tags)
+    ]
+    cached = cache.get_many(keys)
+    rendered = {}
+    cards = []
+    for post, key in zip(posts, keys):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post})
+        cards.append(mark_safe(html))
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+    card_cache_hits.increment(len(cached))
+    card_cache_misses.increment(len(rendered))
+    return cards
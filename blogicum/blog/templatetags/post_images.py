@@ -0,0 +1,30 @@
+from django import template
+
+from blog.images import srcset
+
+register = template.Library()
+
+# Карточка и страница поста занимают 40rem, на узких экранах — всю ширину.
+DEFAULT_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, css_class='', lazy=True, sizes=DEFAULT_SIZES):
+    """Фото поста с уменьшенными копиями в WebP и JPEG.
+
+    Пока копии не готовы, выводится оригинал. Сохранённые размеры
+    резервируют место под фото, а заглушка видна до его загрузки.
+    """
+    context = {
+        'post': post,
+        'stored': post.stored_image,
+        'css_class': css_class,
+        'lazy': lazy,
+        'sizes': sizes,
+    }
+    stored = post.stored_image
+    if stored is not None and stored.variants:
+        storage = post.image.storage
+        context['webp_srcset'] = srcset(storage, stored, 'webp')
+        context['jpeg_srcset'] = srcset(storage, stored, 'jpg')
+    return context
@@ -0,0 +1,241 @@
+"""Потоковая выгрузка и загрузка данных блога в формате JSON Lines.
+
+Первая строка файла — заголовок с форматом и версией, дальше по строке
+на объект в том же виде, что у сериализатора Django «python»:
+{"model": ..., "pk": ..., "fields": {...}}. Модели идут в порядке
+MODELS, так что к моменту вставки объекта всё, на что он ссылается,
+уже загружено, а внутри модели — по возрастанию pk.
+
+Загрузка читает файл построчно и вставляет объекты пачками через
+bulk_create, каждую пачку в своей транзакции. После каждой пачки номер
+последней загруженной строки записывается в файл прогресса; прерванную
+загрузку можно продолжить с этого места.
+"""
+import gzip
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from core.cache import invalidate
+from . import search, search_index
+from .cache import FEED_TAG
+from .models import Post
+
+FORMAT = 'blogicum-jsonl'
+VERSION = 1
+BATCH_SIZE = 2000
+
+# Модели в порядке, безопасном для внешних ключей. Производные таблицы
+# (индекс поиска, очередь обработки фото) не выгружаются — их строят
+# заново после загрузки.
+MODELS = (
+    'auth.user',
+    'blog.category',
+    'blog.location',
+    'blog.storedimage',
+    'blog.post',
+    'blog.comment',
+)
+
+
+class TransferError(Exception):
+    """Файл выгрузки не того формата или повреждён."""
+
+
+class Encoder(DjangoJSONEncoder):
+    """Даты со всеми микросекундами.
+
+    DjangoJSONEncoder оставляет миллисекунды, и после загрузки время
+    не совпало бы с исходным.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+@contextmanager
+def keep_timestamps(model):
+    """Не даёт bulk_create заменить даты auto_now текущим временем.
+
+    Как и loaddata, загрузка сохраняет created_at и updated_at из
+    выгрузки.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def open_text(path, mode):
+    """Открывает файл выгрузки; .gz сжимается и распаковывается на лету."""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def progress_path(path):
+    return Path(f'{path}.progress')
+
+
+def export_rows():
+    """Строки файла выгрузки: заголовок и объекты всех MODELS."""
+    yield {'format': FORMAT, 'version': VERSION, 'models': list(MODELS)}
+    for label in MODELS:
+        objects = apps.get_model(label).objects.order_by('pk').iterator(
+            chunk_size=BATCH_SIZE)
+        # Сериализатор копит результат в списке, поэтому кормим его
+        # пачками, а не всем запросом сразу.
+        while True:
+            chunk = list(islice(objects, BATCH_SIZE))
+            if not chunk:
+                break
+            yield from serializers.serialize('python', chunk)
+
+
+def export(path):
+    """Записывает данные блога в path и возвращает число объектов."""
+    count = -1
+    with open_text(path, 'w') as output:
+        for row in export_rows():
+            output.write(json.dumps(
+                row, cls=Encoder, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def read_header(lines):
+    try:
+        header = json.loads(next(lines))
+    except (StopIteration, ValueError):
+        raise TransferError('Нет заголовка выгрузки.')
+    if not isinstance(header, dict):
+        raise TransferError('Неизвестный формат выгрузки.')
+    if header.get('format') != FORMAT or header.get('version') != VERSION:
+        raise TransferError(
+            f'Неизвестный формат выгрузки: {header.get("format")} '
+            f'версии {header.get("version")}.')
+
+
+def batches(lines, batch_size, start):
+    """Пачки (номер последней строки, модель, объекты) одной модели.
+
+    start — номер первой строки lines в файле.
+    """
+    batch, label, number = [], None, start - 1
+    for number, line in enumerate(lines, start=start):
+        row = json.loads(line)
+        if batch and (row['model'] != label or len(batch) == batch_size):
+            yield number - 1, label, batch
+            batch = []
+        label = row['model']
+        batch.append(row)
+    if batch:
+        yield number, label, batch
+
+
+def insert(rows, ignore_conflicts=False):
+    """Вставляет объекты одной модели и их связи многие-ко-многим."""
+    objects, relations = [], {}
+    for item in serializers.deserialize(
+            'python', rows, ignorenonexistent=True):
+        objects.append(item.object)
+        for name, values in item.m2m_data.items():
+            relations.setdefault(name, []).extend(
+                (item.object.pk, value) for value in values)
+    model = type(objects[0])
+    with keep_timestamps(model):
+        model.objects.bulk_create(
+            objects, ignore_conflicts=ignore_conflicts)
+    for name, pairs in relations.items():
+        field = model._meta.get_field(name)
+        through = field.remote_field.through
+        source = field.m2m_field_name() + '_id'
+        target = field.m2m_reverse_field_name() + '_id'
+        through.objects.bulk_create(
+            [through(**{source: pk, target: value}) for pk, value in pairs],
+            ignore_conflicts=ignore_conflicts)
+    return len(objects)
+
+
+def save_progress(path, line, batch_size):
+    progress = progress_path(path)
+    temporary = progress.with_suffix('.tmp')
+    temporary.write_text(json.dumps(
+        {'line': line, 'batch_size': batch_size}), encoding='utf-8')
+    os.replace(temporary, progress)
+
+
+def load_progress(path):
+    """Последняя загруженная строка и размер пачки прошлого запуска."""
+    progress = progress_path(path)
+    if not progress.exists():
+        return 1, 0
+    state = json.loads(progress.read_text(encoding='utf-8'))
+    return state['line'], state['batch_size']
+
+
+def import_file(path, batch_size=BATCH_SIZE, resume=False, on_batch=None):
+    """Загружает выгрузку из path; возвращает число вставленных объектов.
+
+    С resume=True пропускает строки, уже загруженные прерванным
+    запуском. Следующая за ними пачка прошлого запуска могла быть
+    закоммичена до записи прогресса, поэтому её строки вставляются
+    с ignore_conflicts.
+    """
+    done, previous_batch = load_progress(path) if resume else (1, 0)
+    overlap_until = done + previous_batch
+    imported = 0
+    with open_text(path, 'r') as lines:
+        read_header(lines)
+        # Первая строка — заголовок, строки 2..done уже загружены.
+        rest = islice(lines, done - 1, None)
+        for line, label, rows in batches(rest, batch_size, done + 1):
+            first_line = line - len(rows) + 1
+            with transaction.atomic():
+                imported += insert(
+                    rows, ignore_conflicts=first_line <= overlap_until)
+            save_progress(path, line, batch_size)
+            if on_batch is not None:
+                on_batch(label, imported)
+    finish()
+    progress_path(path).unlink(missing_ok=True)
+    return imported
+
+
+def reset_sequences():
+    """Счётчики id после вставки с явными pk, как делает loaddata."""
+    models = [apps.get_model(label) for label in MODELS]
+    with connection.cursor() as cursor:
+        for statement in connection.ops.sequence_reset_sql(
+                no_style(), models):
+            cursor.execute(statement)
+
+
+def finish():
+    """Приводит производные данные в соответствие с загруженными."""
+    reset_sequences()
+    Post.objects.refresh_visibility()
+    if connection.vendor == 'sqlite':
+        search.rebuild_index()
+    search_index.rebuild()
+    invalidate(FEED_TAG)
@@ -0,0 +1,90 @@
+"""Потоковая проверка загружаемых фотографий.
+
+В представлениях создания и правки поста (BoundedUploadMixin) файл
+пишется во временный файл по частям и перестаёт сохраняться, как
+только превышен IMAGE_UPLOAD_MAX_BYTES. Формат определяется по первым
+байтам, а размеры в пикселях — по заголовку, до полного декодирования.
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+
+# Сигнатуры в начале файла для разрешённых форматов.
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+HEADER_SIZE = 16
+
+
+class UploadRejected(Exception):
+    """Файл отклонён; reason — код причины для метрик и сообщений."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class BoundedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл, но не больше лимита.
+
+    Остаток слишком большого файла дочитывается из запроса
+    и отбрасывается, а сам файл помечается атрибутом `oversized`.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.oversized:
+            return None
+        if start + len(raw_data) > settings.IMAGE_UPLOAD_MAX_BYTES:
+            self.oversized = True
+            self.file.truncate(0)
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.oversized = self.oversized
+        return file
+
+
+def sniff_format(header):
+    for signature, image_format in SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def check_image(file):
+    """Проверяет загрузку до того, как Pillow декодирует её целиком.
+
+    Возвращает формат; при нарушении лимитов бросает UploadRejected.
+    """
+    if (getattr(file, 'oversized', False)
+            or file.size > settings.IMAGE_UPLOAD_MAX_BYTES):
+        raise UploadRejected('size')
+    file.seek(0)
+    image_format = sniff_format(file.read(HEADER_SIZE))
+    if image_format is None:
+        raise UploadRejected('format')
+    file.seek(0)
+    try:
+        # Image.open читает только заголовок; пиксели не декодируются.
+        with Image.open(file, formats=(image_format,)) as image:
+            width, height = image.size
+    except Image.DecompressionBombError:
+        raise UploadRejected('pixels')
+    except (OSError, SyntaxError, ValueError):
+        raise UploadRejected('corrupt')
+    finally:
+        file.seek(0)
+    if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+        raise UploadRejected('pixels')
+    return image_format
@@ -1,5 +1,3 @@
-from django.conf.urls.static import static
-from django.conf import settings
 from django.urls import path, include
 
 from . import views
@@ -37,6 +35,10 @@ url_post = [
          views.EditPostView.as_view(),
          name='edit_post'
          ),
+    path('<int:post_id>/comments/',
+         views.PostCommentsView.as_view(),
+         name='post_comments'
+         ),
     path('<int:post_id>/comment/',
          views.CommentAddCreateView.as_view(),
          name='add_comment'
@@ -53,13 +55,17 @@ url_post = [
          views.DeleteCommentView.as_view(),
          name='delete_comment'
          ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
 urlpatterns = [
     path('',
          views.IndexView.as_view(),
          name='index'
          ),
+    path('search/',
+         views.SearchView.as_view(),
+         name='search'
+         ),
     path('posts/',
          include(url_post)
          ),
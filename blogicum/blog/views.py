@@ -1,21 +1,27 @@
-import datetime as dt
-
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.mixins import LoginRequiredMixin
 
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, TemplateView, UpdateView
 )
-from django.utils.timezone import make_aware
 from django.core.paginator import Paginator
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from django.db.models import Count
 from django.http import Http404
+from django.utils.http import urlencode
 
-from .models import Post, Category, Comment
+from core.cache import object_tag
+from .cache import card_tags
+from .models import Post, Category
 from .forms import CommentsForm
+from .paginators import CursorPaginator
+from .search import attach_snippets, find_posts
+from .templatetags.post_cards import post_cards
 from .mixins import (
+    AnonymousPageCacheMixin,
+    BoundedUploadMixin,
+    ConditionalGetMixin,
     PostFormMixin,
     PostDispatchMixin,
     ProfileMixin,
@@ -24,20 +30,101 @@ from .mixins import (
 
 User = get_user_model()
 PAGINATE_NUM = 10
+COMMENTS_PAGINATE_NUM = 10
+
+
+FEED_FIELDS = (
+    'title', 'text', 'pub_date', 'image', 'is_published', 'comment_count',
+    'updated_at', 'author', 'author__username',
+    'category', 'category__title', 'category__slug', 'category__is_published',
+    'category__updated_at',
+    'location', 'location__name', 'location__is_published',
+    'location__updated_at',
+    'stored_image', 'stored_image__name', 'stored_image__variants',
+    'stored_image__width', 'stored_image__height',
+    'stored_image__placeholder',
+)
+
+# Поля, по которым считается отпечаток страницы для условных запросов.
+FRESHNESS_FIELDS = (
+    'pub_date', 'updated_at', 'comment_count', 'author', 'author__username',
+    'category', 'category__updated_at', 'location', 'location__updated_at',
+    'stored_image', 'stored_image__variants', 'stored_image__width',
+    'stored_image__height', 'stored_image__placeholder',
+)
 
 
 def get_post_info():
-    return Post.objects.filter(is_published=True,
-                               pub_date__lte=make_aware(dt.datetime.now()),
-                               category__is_published=True,
-                               location__is_published=True,)
+    return Post.objects.filter(is_visible=True)
+
+
+def get_post_feed(posts):
+    """Готовит посты к выводу карточками в ленте.
+
+    Автор, категория и местоположение подтягиваются одним JOIN,
+    из базы читаются только поля, которые выводит карточка.
+    """
+    return posts.select_related(
+        'author', 'category', 'location', 'stored_image'
+    ).only(*FEED_FIELDS).order_by('-pub_date', '-id')
+
+
+def post_freshness(post):
+    # Копии, размеры и заглушку фото воркер записывает UPDATE-ом
+    # без изменения updated_at поста.
+    image = post.stored_image
+    return (
+        post.pk, post.updated_at, post.comment_count, post.author.username,
+        post.category and post.category.updated_at,
+        post.location and post.location.updated_at,
+        image and (image.pk, image.variants, image.width, image.height,
+                   image.placeholder),
+    )
+
+
+def page_freshness(page_obj):
+    """Отпечаток карточек страницы и ссылок пагинатора."""
+    return [
+        [post_freshness(post) for post in page_obj],
+        page_obj.has_next(),
+        page_obj.has_previous(),
+        getattr(page_obj.paginator, 'count', None),
+    ]
+
+
+def get_page_freshness(posts, request):
+    """Отпечаток страницы ленты без загрузки текстов постов."""
+    return page_freshness(get_paginated_data(
+        posts.select_related(
+            'author', 'category', 'location', 'stored_image'
+        ).only(
+            *FRESHNESS_FIELDS).order_by('-pub_date', '-id'),
+        request,
+    ))
+
+
+def get_comment_page(post, cursor=None, fields=None):
+    """Страница комментариев к посту в порядке добавления.
+
+    Ключ (created_at, id) не меняется при добавлении новых комментариев,
+    поэтому подгружаемые страницы не пропускают и не повторяют записи.
+    """
+    comments = post.comments.select_related('author')
+    if fields:
+        comments = comments.only(*fields)
+    return CursorPaginator(
+        comments, COMMENTS_PAGINATE_NUM, ordering=('created_at', 'id')
+    ).get_page(cursor)
 
 
 def get_paginated_data(data, request):
+    if settings.FEED_PAGINATION == 'cursor':
+        return CursorPaginator(data, PAGINATE_NUM).get_page(
+            request.GET.get('cursor'))
     return Paginator(data, PAGINATE_NUM).get_page(request.GET.get('page'))
 
 
-class IndexView(ListView):
+class IndexView(AnonymousPageCacheMixin, ConditionalGetMixin, ListView):
     """Отображает главную страницу."""
 
     model = Post
@@ -45,35 +132,86 @@ class IndexView(ListView):
 
     def get_context_data(self, **kwargs):
         context = {
-            'page_obj': get_paginated_data(get_post_info().order_by(
-                '-pub_date').annotate(
-                comment_count=Count('comments')), self.request)
+            'page_obj': get_paginated_data(
+                get_post_feed(get_post_info()), self.request)
         }
         return context
 
+    def get_freshness(self):
+        return get_page_freshness(get_post_info(), self.request)
+
+    def get_rendered_freshness(self, context):
+        return page_freshness(context['page_obj'])
 
-class CategoryPostsView(ListView):
+
+class CategoryPostsView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                        ListView):
     """Отображает страницу категорий."""
 
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
-    paginate_by = PAGINATE_NUM
 
     def get_queryset(self):
-        return get_post_info().filter(
+        return get_post_feed(get_post_info().filter(
             category__slug=self.kwargs['slug']
-        ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        ))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['page_obj'] = get_paginated_data(self.object_list,
+                                                 self.request)
         context['category'] = get_object_or_404(Category,
                                                 slug=self.kwargs['slug'],
                                                 is_published=True)
         return context
 
+    def get_freshness(self):
+        category = Category.objects.filter(
+            slug=self.kwargs['slug'], is_published=True
+        ).values_list('updated_at', flat=True).first()
+        if category is None:
+            return None
+        return [category, get_page_freshness(
+            get_post_info().filter(category__slug=self.kwargs['slug']),
+            self.request,
+        )]
+
+    def get_rendered_freshness(self, context):
+        return [context['category'].updated_at,
+                page_freshness(context['page_obj'])]
+
+
+class SearchView(TemplateView):
+    """Ищет посты по заголовку и тексту.
+
+    Результаты упорядочены по релевантности, поэтому листаются
+    номерами страниц, а не курсором ленты.
+    """
+
+    template_name = 'blog/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        results, expression = find_posts(
+            get_post_feed(get_post_info()), query)
+        if results is None:
+            return context
+        page_obj = Paginator(results, PAGINATE_NUM).get_page(
+            self.request.GET.get('page'))
+        posts = attach_snippets(page_obj, expression)
+        context.update(
+            page_obj=page_obj,
+            results=list(zip(posts, post_cards(posts))),
+            page_query=urlencode({'q': query}) + '&',
+        )
+        return context
+
 
-class PostCreateView(LoginRequiredMixin, PostFormMixin, CreateView):
+class PostCreateView(BoundedUploadMixin, LoginRequiredMixin, PostFormMixin,
+                     CreateView):
     """Страница создания поста."""
 
     def get_success_url(self):
@@ -81,7 +219,8 @@ class PostCreateView(LoginRequiredMixin, PostFormMixin, CreateView):
                        kwargs={'username': self.request.user})
 
 
-class EditPostView(LoginRequiredMixin, PostDispatchMixin, UpdateView):
+class EditPostView(BoundedUploadMixin, LoginRequiredMixin, PostDispatchMixin,
+                   UpdateView):
     """Страница изменнеия поста."""
 
     def get_success_url(self) -> str:
@@ -91,25 +230,86 @@ class EditPostView(LoginRequiredMixin, PostDispatchMixin, UpdateView):
         )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                     DetailView):
     """Страница детализации поста."""
 
     model = Post
     template_name = 'blog/detail.html'
 
     def get_object(self):
-        post = get_object_or_404(Post,
-                                 pk=self.kwargs['post_id'])
-        if post.author != self.request.user and post.is_published is False:
+        post = get_object_or_404(
+            Post.objects.select_related(
+                'author', 'category', 'location', 'stored_image'),
+            pk=self.kwargs['post_id'])
+        if (post.author_id != self.request.user.pk
+                and post.is_published is False):
             raise Http404('Этот пост ещё не опубликован!')
         return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentsForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = get_comment_page(self.object)
         return context
 
+    def get_freshness(self):
+        post = Post.objects.select_related(
+            'author', 'category', 'location', 'stored_image'
+        ).only('is_published', *FRESHNESS_FIELDS).filter(
+            pk=self.kwargs['post_id']
+        ).first()
+        if post is None or (post.author != self.request.user
+                            and not post.is_published):
+            return None
+        comments = get_comment_page(post, fields=(
+            'created_at', 'updated_at', 'author', 'author__username'))
+        return self.comments_freshness(post, comments)
+
+    def get_rendered_freshness(self, context):
+        return self.comments_freshness(self.object, context['comments'])
+
+    @staticmethod
+    def comments_freshness(post, comments):
+        return [post_freshness(post), comments.has_next(), [
+            (comment.pk, comment.updated_at, comment.author.username)
+            for comment in comments
+        ]]
+
+    def get_page_cache_tags(self):
+        return [object_tag(Post, self.kwargs['post_id'])]
+
+    def get_extra_page_cache_tags(self, context):
+        return card_tags(self.object) + [
+            object_tag(User, comment.author_id)
+            for comment in context['comments']
+        ]
+
+
+class PostCommentsView(AnonymousPageCacheMixin, TemplateView):
+    """Следующая страница комментариев к посту фрагментом HTML."""
+
+    template_name = 'includes/comment_list.html'
+    page_cache_params = ('cursor',)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        post = get_object_or_404(Post.objects.only('author', 'is_published'),
+                                 pk=self.kwargs['post_id'])
+        if post.author_id != self.request.user.pk and not post.is_published:
+            raise Http404('Этот пост ещё не опубликован!')
+        context['post'] = post
+        context['comments'] = get_comment_page(
+            post, self.request.GET.get('cursor'))
+        return context
+
+    def get_page_cache_tags(self):
+        return [object_tag(Post, self.kwargs['post_id'])]
+
+    def get_extra_page_cache_tags(self, context):
+        return [object_tag(User, comment.author_id)
+                for comment in context['comments']]
+
 
 class PostDeleteView(LoginRequiredMixin, PostDispatchMixin, DeleteView):
     """Страница удаления поста."""
@@ -118,27 +318,49 @@ class PostDeleteView(LoginRequiredMixin, PostDispatchMixin, DeleteView):
         return reverse('blog:index')
 
 
-class ProfileDetailView(ProfileMixin, DetailView):
+class ProfileDetailView(AnonymousPageCacheMixin, ConditionalGetMixin,
+                        ProfileMixin, DetailView):
     """Страница профиля пользователя."""
 
     template_name = 'blog/profile.html'
+    profile_fields = (
+        'username', 'first_name', 'last_name', 'is_staff', 'date_joined',
+    )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object()
-        posts = user.post_set.all().annotate(
-            comment_count=Count('comments'))
-        if self.request.user != user:
-            posts = get_post_info().filter(
-                author__username=self.kwargs['username']).annotate(
-                    comment_count=Count('comments'))
+        posts = self.object.post_set.all()
+        if self.request.user != self.object:
+            posts = get_post_info().filter(author=self.object)
         context['page_obj'] = get_paginated_data(
-            posts.order_by('-pub_date'), self.request
+            get_post_feed(posts), self.request
         )
         context['user'] = self.request.user
         context['profile'] = self.object
         return context
 
+    def get_extra_page_cache_tags(self, context):
+        return [object_tag(User, self.object.pk)]
+
+    def get_freshness(self):
+        profile = User.objects.only(*self.profile_fields).filter(
+            username=self.kwargs['username']
+        ).first()
+        if profile is None:
+            return None
+        posts = Post.objects.filter(author=profile)
+        if self.request.user != profile:
+            posts = get_post_info().filter(author=profile)
+        return [self.profile_freshness(profile),
+                get_page_freshness(posts, self.request)]
+
+    def get_rendered_freshness(self, context):
+        return [self.profile_freshness(context['profile']),
+                page_freshness(context['page_obj'])]
+
+    def profile_freshness(self, profile):
+        return [getattr(profile, name) for name in self.profile_fields]
+
 
 class ProfileUpdateView(LoginRequiredMixin, ProfileMixin, UpdateView):
     """Страница обновления информации в профиле у пользователя."""
@@ -157,26 +379,19 @@ class EditCommentView(CommentEditDeletePermission,
                       UpdateView):
     """Страница изменения коммента."""
 
-    def get_object(self):
-        return get_object_or_404(Comment, id=self.kwargs['comment_id'])
-
 
 class DeleteCommentView(CommentEditDeletePermission,
                         CommentMixin,
                         DeleteView):
     """Страница удаления комментарция."""
 
-    def get_object(self):
-        post_id = self.kwargs['post_id']
-        comment_id = self.kwargs['comment_id']
-        return get_object_or_404(Comment, id=comment_id, post_id=post_id)
-
 
 class CommentAddCreateView(LoginRequiredMixin, CommentMixin, CreateView):
     """Страница добавления комментария."""
 
     def dispatch(self, request, **kwargs):
-        self.post_id = get_object_or_404(Post, pk=kwargs['post_id'])
+        if not Post.objects.filter(pk=kwargs['post_id']).exists():
+            raise Http404('Пост не найден.')
         return super().dispatch(request, **kwargs)
 
     def form_valid(self, form):
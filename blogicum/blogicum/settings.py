@@ -44,6 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so the time spent in the other middleware is measured.
+    # Requests that show the debug toolbar are not timed.
+    'core.timing.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,7 +63,7 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -88,6 +91,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# Any backend works; with FileBasedCache the cached fragments and
+# counters are shared between worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -130,6 +147,25 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+# collectstatic fingerprints file names through a manifest and writes
+# precompressed .gz (and .br when brotli is installed) siblings, which
+# core.views.serve_static picks by Accept-Encoding.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Cache lifetime for static files without a hash in their name, seconds.
+STATIC_CACHE_MAX_AGE = 60 * 60
+
+# Class patterns (fnmatch) that prune_css keeps even though no template
+# mentions them: state classes toggled by Bootstrap's JavaScript and
+# validation classes added by django-bootstrap5 at render time.
+CSS_PRUNE_ALLOWLIST = [
+    'active', 'disabled', 'show', 'showing', 'hiding', 'collapsing',
+    'fade', 'is-valid', 'is-invalid', 'was-validated', 'valid-*',
+    'invalid-*', 'visually-hidden*',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -141,6 +177,26 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Media is served by core.views.serve_media. Set MEDIA_SENDFILE to
+# 'x-accel' (nginx, internal location MEDIA_ACCEL_PREFIX) or 'x-sendfile'
+# (Apache/lighttpd) to hand the file body off to the front server.
+MEDIA_SENDFILE = None
+
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Cache lifetime for media that is not content-addressed, seconds.
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+# The post create and edit views stream uploads to a temporary file;
+# anything past IMAGE_UPLOAD_MAX_BYTES is discarded and the form rejects
+# the file. Other views keep Django's default upload handlers.
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+# Checked against the image header before Pillow decodes any pixels.
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
@@ -150,3 +206,33 @@ CSRF_FAILURE_VIEW = 'pages.views.csrferror'
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+
+# Feed pagination mode: 'page' numbers pages with COUNT(*) and OFFSET,
+# 'cursor' walks the feed by opaque (pub_date, id) cursors.
+FEED_PAGINATION = 'page'
+
+# Search backend: 'index' matches Russian word stems and corrects typos
+# through the pure-Python index in blog.search_index, 'fts' uses SQLite
+# FTS5 prefix matching. Snippets come from FTS5 either way.
+SEARCH_BACKEND = 'index'
+
+# Share of requests that get a Server-Timing header (SQL time and query
+# count, template and view time) and a JSON line in the core.timing log.
+# 0 removes core.timing.ServerTimingMiddleware from the stack entirely.
+REQUEST_TIMING_SAMPLE_RATE = 1.0 if DEBUG else 0.01
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -6,7 +6,8 @@ from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import serve_media, serve_static
 
 app_name = 'blogicum'
 handler404 = 'pages.views.pagenotfound'
@@ -36,10 +37,16 @@ urlpatterns = [
     ),
     path('pages/', include('pages.urls', namespace='pages')),
     path('admin/', admin.site.urls),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>',
+         serve_media,
+         name='media'
+         ),
+    path(settings.STATIC_URL.lstrip('/') + '<path:path>',
+         serve_static,
+         name='static'
+         ),
 ]
 
 if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,169 @@
+"""Замеры для бенчмарков: время, число SQL-запросов и пик памяти.
+
+Результаты сравниваются с базовым JSON-файлом: рост p95 или пика
+памяти больше чем на threshold, а также любой рост числа запросов
+считаются регрессией.
+"""
+import json
+import os
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment,
+)
+
+PLAIN_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+
+def percentile(values, share):
+    """Значение, ниже которого лежит доля share замеров."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+@contextmanager
+def sqlite_file_test_database():
+    """Тестовая база SQLite в файле во временном каталоге.
+
+    По умолчанию Django создаёт её в памяти, а миллион постов
+    с комментариями и таблицей FTS5 может туда не поместиться.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    test_settings = connection.settings_dict['TEST']
+    old_name = test_settings['NAME']
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+        try:
+            yield
+        finally:
+            test_settings['NAME'] = old_name
+
+
+@contextmanager
+def temporary_database():
+    """Отдельная база, как у тестов, и настройки, как в бою.
+
+    Манифест статики есть только после collectstatic, а время его
+    чтения к замерам не относится, поэтому хранилище статики обычное.
+    Разбивка времени запросов (core.timing) тоже выключена.
+    """
+    setup_test_environment()
+    creation = connection.creation
+    with sqlite_file_test_database():
+        old_name = creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                    DEBUG=False, STATICFILES_STORAGE=PLAIN_STORAGE,
+                    REQUEST_TIMING_SAMPLE_RATE=0):
+                yield
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+class QueryCounter:
+    """Считает SQL-запросы, не сохраняя их.
+
+    CaptureQueriesContext хранит не больше 9000 последних запросов
+    и на массовой загрузке считал бы неверно.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(call, repeat, setup=None):
+    """Вызывает call repeat раз и возвращает сводку замеров.
+
+    setup выполняется перед каждым вызовом и в замер не входит.
+    Пик памяти снимается отдельным прогоном: tracemalloc заметно
+    замедляет код и исказил бы время.
+    """
+    timings, queries = [], []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = perf_counter()
+            call()
+            timings.append((perf_counter() - started) * 1000)
+        queries.append(counter.count)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'queries': int(median(queries)),
+        'peak_kib': round(peak / 1024),
+    }
+
+
+def missing_baselines(results, baseline):
+    """Размеры и сценарии из results, которых нет в baseline."""
+    return [
+        f'{size} {name}' for size, scenarios in results.items()
+        for name in scenarios if name not in baseline.get(str(size), {})
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Список регрессий results относительно baseline.
+
+    Оба словаря устроены как {размер: {сценарий: сводка measure()}};
+    сценарии, которых нет в baseline, не проверяются — их находит
+    missing_baselines().
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, current in scenarios.items():
+            base = baseline.get(str(size), {}).get(name)
+            if base is None:
+                continue
+            for metric in ('p95_ms', 'peak_kib'):
+                if current[metric] > base[metric] * (1 + threshold):
+                    regressions.append(
+                        f'{size} {name}: {metric} {base[metric]} -> '
+                        f'{current[metric]}')
+            if current['queries'] > base['queries']:
+                regressions.append(
+                    f'{size} {name}: queries {base["queries"]} -> '
+                    f'{current["queries"]}')
+    return regressions
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def save_baseline(path, results, baseline=None):
+    """Записывает results поверх baseline, сохраняя прочие размеры."""
+    merged = dict(baseline or {})
+    merged.update((str(size), value) for size, value in results.items())
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(merged, ensure_ascii=False, indent=2, sort_keys=True)
+        + '\n', encoding='utf-8')
@@ -0,0 +1,45 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY_PREFIX = 'version:'
+
+
+def get_versions(tags):
+    """Возвращает словарь {тег: версия} одним запросом к кэшу.
+
+    Отсутствующей (новой или вытесненной) версии присваивается текущее
+    время в наносекундах: так она не совпадёт ни с одной из прежних,
+    и устаревшие записи не оживут.
+    """
+    keys = {VERSION_KEY_PREFIX + tag: tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {tag: found[key] for key, tag in keys.items()}
+
+
+def bump_versions(*tags):
+    """Делает устаревшими все записи кэша, собранные с этими тегами."""
+    for tag in tags:
+        try:
+            cache.incr(VERSION_KEY_PREFIX + tag)
+        except ValueError:
+            pass
+
+
+def invalidate(*tags):
+    """Сбрасывает версии сразу и ещё раз после фиксации транзакции.
+
+    Второй сброс закрывает окно, в котором параллельный запрос успел
+    бы закэшировать данные, прочитанные до коммита.
+    """
+    bump_versions(*tags)
+    transaction.on_commit(lambda: bump_versions(*tags))
+
+
+def object_tag(model, pk):
+    return f'{model._meta.model_name}:{pk}'
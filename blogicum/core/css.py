@@ -0,0 +1,210 @@
+"""Удаление неиспользуемых правил из таблицы стилей.
+
+Имена классов собираются из шаблонов проекта, шаблонов виджетов форм
+и кода, который подставляет классы сам: модулей форм проекта
+и django_bootstrap5. Остальной Python-код не просматривается, чтобы
+тексты и данные в нём не меняли собранную таблицу стилей. Берутся все
+похожие на класс слова, а не только атрибуты class: так учитываются
+классы, переданные в теги строкой. Правило остаётся, если
+все классы хотя бы одного его селектора встречаются в источниках или
+подходят под шаблоны из CSS_PRUNE_ALLOWLIST.
+"""
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+import django.forms
+from django.apps import apps
+from django.conf import settings
+from django.template.utils import get_app_template_dirs
+
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+CLASS_RE = re.compile(r'\.(-?[A-Za-z_][\w-]*)')
+# Скобки атрибутов и строки могут содержать точки, не означающие класс.
+ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]|"[^"]*"|\'[^\']*\'')
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+CODE_SUFFIXES = TEMPLATE_SUFFIXES + ('.py',)
+
+# Модули приложений проекта, где виджетам форм задаются классы.
+FORM_MODULES = ('forms.py', 'widgets.py')
+
+# Сторонние пакеты, которые добавляют классы Bootstrap из Python-кода.
+CLASS_PACKAGES = ('django_bootstrap5',)
+
+
+def files(directory, suffixes):
+    return (path for path in sorted(directory.rglob('*'))
+            if path.suffix in suffixes and path.is_file())
+
+
+def source_files():
+    """Шаблоны и модули, в которых могут встретиться имена классов."""
+    directories = [Path(directory) for engine in settings.TEMPLATES
+                   for directory in engine.get('DIRS', ())]
+    directories += [Path(path) for path in get_app_template_dirs('templates')]
+    directories.append(Path(django.forms.__file__).parent / 'templates')
+    paths = [path for directory in directories
+             for path in files(directory, TEMPLATE_SUFFIXES)]
+    base_dir = Path(settings.BASE_DIR).resolve()
+    for config in apps.get_app_configs():
+        directory = Path(config.path).resolve()
+        if config.name in CLASS_PACKAGES:
+            paths.extend(files(directory, CODE_SUFFIXES))
+        elif base_dir in directory.parents:
+            paths.extend(directory / name for name in FORM_MODULES
+                         if (directory / name).is_file())
+    seen = set()
+    for path in paths:
+        path = path.resolve()
+        if path not in seen:
+            seen.add(path)
+            yield path
+
+
+def used_classes(paths):
+    tokens = set()
+    for path in paths:
+        tokens.update(TOKEN_RE.findall(
+            path.read_text(encoding='utf-8', errors='ignore')))
+    return tokens
+
+
+class Block:
+    """Правило или at-правило: заголовок и тело (None — без тела)."""
+
+    def __init__(self, prelude, body=None):
+        self.prelude = prelude
+        self.body = body
+
+    def __str__(self):
+        if self.body is None:
+            return f'{self.prelude};'
+        return f'{self.prelude}{{{self.body}}}'
+
+
+def skip_string(css, position):
+    """Позиция сразу за строкой в кавычках, начатой в position."""
+    quote, end = css[position], position + 1
+    while end < len(css) and css[end] != quote:
+        end += 2 if css[end] == '\\' else 1
+    return end + 1
+
+
+def strip_comments(css):
+    """Убирает комментарии; лицензионные `/*! ... */` возвращает отдельно."""
+    kept, licenses = [], []
+    start = position = 0
+    while position < len(css):
+        if css[position] in '"\'':
+            position = skip_string(css, position)
+        elif css.startswith('/*', position):
+            end = css.find('*/', position + 2)
+            end = len(css) if end == -1 else end + 2
+            kept.append(css[start:position])
+            if css.startswith('/*!', position):
+                licenses.append(css[position:end])
+            start = position = end
+        else:
+            position += 1
+    kept.append(css[start:])
+    return licenses, ''.join(kept)
+
+
+def parse(css):
+    """Делит текст без комментариев на правила верхнего уровня."""
+    blocks = []
+    start = position = depth = body_start = 0
+    while position < len(css):
+        char = css[position]
+        if char in '"\'':
+            position = skip_string(css, position)
+            continue
+        if char == '{':
+            if depth == 0:
+                body_start = position
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append(Block(css[start:body_start].strip(),
+                                    css[body_start + 1:position]))
+                start = position + 1
+        elif char == ';' and depth == 0:
+            blocks.append(Block(css[start:position].strip()))
+            start = position + 1
+        position += 1
+    return blocks
+
+
+def split_selectors(prelude):
+    """Делит список селекторов по запятым вне скобок."""
+    selectors, depth, start = [], 0, 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position].strip())
+            start = position + 1
+    selectors.append(prelude[start:].strip())
+    return selectors
+
+
+class Pruner:
+
+    def __init__(self, used, allowlist=()):
+        self.used = set(used)
+        self.allowlist = tuple(allowlist)
+
+    def is_used(self, name):
+        return name in self.used or any(
+            fnmatchcase(name, pattern) for pattern in self.allowlist)
+
+    def keep_selector(self, selector):
+        names = CLASS_RE.findall(ATTRIBUTE_RE.sub('', selector))
+        return all(self.is_used(name) for name in names)
+
+    def prune_blocks(self, blocks):
+        kept = []
+        for block in blocks:
+            if block.body is None:
+                kept.append(block)
+            elif block.prelude.startswith(('@media', '@supports')):
+                body = ''.join(
+                    str(inner)
+                    for inner in self.prune_blocks(parse(block.body)))
+                if body:
+                    kept.append(Block(block.prelude, body))
+            elif block.prelude.startswith('@'):
+                # @keyframes, @font-face, @page оставляются как есть.
+                kept.append(block)
+            else:
+                selectors = [
+                    selector for selector in split_selectors(block.prelude)
+                    if self.keep_selector(selector)
+                ]
+                if selectors:
+                    kept.append(Block(','.join(selectors), block.body))
+        return kept
+
+    def prune(self, css):
+        comments, css = strip_comments(css)
+        blocks = parse(css)
+        charset = [block for block in blocks
+                   if block.prelude.startswith('@charset')]
+        rest = [block for block in blocks if block not in charset]
+        return ''.join(
+            [str(block) for block in charset] + comments
+            + [str(block) for block in self.prune_blocks(rest)]
+        ) + '\n'
+
+
+def prune_stylesheet(css, used=None, allowlist=None):
+    """Возвращает таблицу стилей без правил для неиспользуемых классов."""
+    if used is None:
+        used = used_classes(source_files())
+    if allowlist is None:
+        allowlist = settings.CSS_PRUNE_ALLOWLIST
+    return Pruner(used, allowlist).prune(css)
@@ -0,0 +1,51 @@
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.css import prune_stylesheet, source_files, used_classes
+
+SOURCE = 'css/bootstrap.min.css'
+OUTPUT = 'css/bootstrap.pruned.min.css'
+
+
+def report_size(size):
+    return f'{size / 1024:.1f} КиБ'
+
+
+class Command(BaseCommand):
+    help = ('Собирает таблицу стилей без правил для классов, которые '
+            'не встречаются в шаблонах и коде проекта.')
+
+    def add_arguments(self, parser):
+        static_dir = settings.STATICFILES_DIRS[0]
+        parser.add_argument(
+            '--source',
+            default=str(static_dir / SOURCE),
+            help='Исходная таблица стилей.',
+        )
+        parser.add_argument(
+            '--output',
+            default=str(static_dir / OUTPUT),
+            help='Куда записать результат.',
+        )
+
+    def handle(self, *args, **options):
+        with open(options['source'], encoding='utf-8') as source:
+            css = source.read()
+        paths = list(source_files())
+        pruned = prune_stylesheet(css, used_classes(paths))
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.write(pruned)
+
+        before, after = css.encode(), pruned.encode()
+        saved = 1 - len(after) / len(before)
+        self.stdout.write(f'Просмотрено файлов: {len(paths)}')
+        self.stdout.write(
+            f'Размер: {report_size(len(before))} -> '
+            f'{report_size(len(after))} (-{saved:.0%})')
+        self.stdout.write(
+            f'gzip: {report_size(len(gzip.compress(before)))} -> '
+            f'{report_size(len(gzip.compress(after)))}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано в {options["output"]}'))
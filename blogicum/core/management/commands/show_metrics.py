@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+
+from core.metrics import registry
+
+
+class Command(BaseCommand):
+    help = 'Показывает счётчики из модулей metrics.py приложений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('metrics')
+        for name, counter in sorted(registry.items()):
+            self.stdout.write(
+                f'{name:<32} {counter.value:>10}  {counter.description}')
+            if options['reset']:
+                counter.reset()
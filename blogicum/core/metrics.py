@@ -0,0 +1,38 @@
+from django.core.cache import cache
+
+KEY_PREFIX = 'metrics:'
+
+registry = {}
+
+
+class Counter:
+    """Счётчик событий в кэше по умолчанию.
+
+    С файловым кэшем (или memcached/redis) значения общие для всех
+    процессов, с локальным — у каждого процесса свои.
+    """
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        registry[name] = self
+
+    @property
+    def key(self):
+        return KEY_PREFIX + self.name
+
+    def increment(self, delta=1):
+        if not delta:
+            return
+        cache.add(self.key, 0, timeout=None)
+        try:
+            cache.incr(self.key, delta)
+        except ValueError:
+            cache.set(self.key, delta, timeout=None)
+
+    @property
+    def value(self):
+        return cache.get(self.key, 0)
+
+    def reset(self):
+        cache.delete(self.key)
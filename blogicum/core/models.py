@@ -8,6 +8,7 @@ class BaseModel(models.Model):
                                                  'чтобы скрыть публикацию.')
     created_at = models.DateTimeField('Добавлено',
                                       auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Разные написания одного расширения дают один и тот же файл.
+EXTENSION_ALIASES = {
+    '.jpeg': '.jpg',
+    '.jpe': '.jpg',
+}
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файлы под SHA-256 их содержимого.
+
+    Имя, предложенное полем (upload_to/исходное_имя), даёт только
+    каталог и расширение; сам файл ложится в
+    `<каталог>/<ab>/<cd>/<sha256><.расширение>`. Повторная загрузка того же
+    содержимого возвращает уже сохранённое имя, ничего не записывая.
+    Содержимое по имени никогда не меняется, поэтому такие файлы можно
+    отдавать с Cache-Control: immutable.
+    """
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if content.seekable():
+            content.seek(0)
+        value = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        extension = EXTENSION_ALIASES.get(extension, extension)
+        return posixpath.join(
+            posixpath.dirname(name), value[:2], value[2:4],
+            value + extension,
+        )
+
+    def get_available_name(self, name, max_length=None):
+        """Занятое имя не заменяется другим, а считается уже сохранённым.
+
+        Под именем из хэша лежит то же содержимое, так что файл
+        с суффиксом был бы копией. FileSystemStorage вызывает этот метод
+        и когда файл уже есть, и когда параллельная загрузка создала его
+        между проверкой и записью (открытие с O_EXCL не удалось);
+        FileExistsError прерывает сохранение, и save() возвращает имя.
+        """
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        try:
+            return super().save(name, content, max_length=max_length)
+        except FileExistsError:
+            return name
+
+    def save_derived(self, name, content):
+        """Сохраняет файл ровно под именем name, заменяя прежний.
+
+        Для производных файлов (уменьшенных копий), имя которых уже
+        выведено из хэша оригинала: если параллельный воркер успел
+        записать файл заново, там те же копии.
+        """
+        if self.exists(name):
+            self.delete(name)
+        try:
+            return super().save(name, content)
+        except FileExistsError:
+            return name
+
+
+def gzip_compress(data):
+    # mtime=0: одинаковое содержимое даёт одинаковый .gz при каждой сборке.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+
+# Content-Encoding, суффикс файла и функция сжатия. Brotli — только если
+# установлен пакет brotli; клиенты без него получают gzip.
+PRECOMPRESSED = [('gzip', '.gz', gzip_compress)]
+if brotli is not None:
+    PRECOMPRESSED.insert(0, ('br', '.br', brotli_compress))
+
+# Текстовые форматы, которые имеет смысл сжимать. PNG/JPEG/WebP уже сжаты.
+COMPRESSIBLE_EXTENSIONS = frozenset((
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml',
+    '.html',
+))
+
+# Сжатая копия сохраняется, только если она меньше этой доли оригинала.
+MIN_COMPRESSION_RATIO = 0.95
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем в имени и заранее сжатыми копиями.
+
+    После того как collectstatic раздал файлам имена вида
+    `bootstrap.min.<md5>.css`, рядом с каждым текстовым файлом
+    сохраняются `.gz` (и `.br`, если установлен brotli). Отдавая файл,
+    core.views.serve_static выбирает копию по Accept-Encoding.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            for compressed in self.compress(name):
+                yield name, compressed, True
+
+    def compress(self, name):
+        extension = posixpath.splitext(name)[1].lower()
+        if extension not in COMPRESSIBLE_EXTENSIONS or not self.exists(name):
+            return
+        with self.open(name) as source:
+            data = source.read()
+        for _, suffix, compress in PRECOMPRESSED:
+            content = compress(data)
+            if len(content) > len(data) * MIN_COMPRESSION_RATIO:
+                continue
+            target = name + suffix
+            if self.exists(target):
+                self.delete(target)
+            yield self._save(target, ContentFile(content))
@@ -0,0 +1,178 @@
+"""Разбивка времени ответа: SQL, шаблоны, представление, middleware.
+
+Для доли запросов REQUEST_TIMING_SAMPLE_RATE ServerTimingMiddleware
+считает время и число SQL-запросов через execute_wrapper всех
+подключений, время отрисовки шаблонов (через бэкенд TimedDjangoTemplates)
+и время самого представления. Части не пересекаются: SQL из шаблонов
+и представления входит только в db, а всё, что осталось от total, —
+время остальных middleware (mw). Поэтому ServerTimingMiddleware стоит
+в MIDDLEWARE первым. Итог уходит в заголовок Server-Timing,
+который показывают инструменты разработчика браузера, и строкой JSON
+в лог core.timing.
+
+При нулевой доле middleware отключается целиком, а бэкенд шаблонов
+тратит на отрисовку одну проверку ContextVar. Запросы, на которых
+показывается django-debug-toolbar, не замеряются: его панели сами
+оборачивают SQL и шаблоны и исказили бы разбивку.
+"""
+import json
+import logging
+import random
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+
+current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Замеры одного запроса; время в секундах."""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.templates = 0.0
+        # SQL, выполненный при отрисовке шаблонов: он уже учтён в db.
+        self.templates_db = 0.0
+        self.depth = 0
+        self.view_started = None
+        self.view_db_started = 0.0
+        self.view = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.db += elapsed
+            self.queries += 1
+            if self.depth:
+                self.templates_db += elapsed
+
+    def start_view(self):
+        self.view_started = perf_counter()
+        self.view_db_started = self.db - self.templates_db
+
+    def finish_view(self):
+        """Отмечает конец представления, если оно начиналось."""
+        if self.view_started is not None and self.view is None:
+            view_db = self.db - self.templates_db - self.view_db_started
+            self.view = (perf_counter() - self.view_started
+                         - self.templates - view_db)
+
+    def metrics(self):
+        """{имя: (миллисекунды, описание)} для заголовка и лога."""
+        total = perf_counter() - self.started
+        templates = self.templates - self.templates_db
+        metrics = {
+            'db': (self.db, f'{self.queries} queries'),
+            'tpl': (templates, 'templates without SQL'),
+        }
+        if self.view is not None:
+            metrics['view'] = (self.view, 'view without templates and SQL')
+        metrics['mw'] = (
+            total - self.db - templates - (self.view or 0.0),
+            'middleware without SQL')
+        metrics['total'] = (total, 'total')
+        return {name: (round(seconds * 1000, 2), description)
+                for name, (seconds, description) in metrics.items()}
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = current.get()
+        if timing is None:
+            return super().render(context, request)
+        # Шаблон, отрисованный внутри другого (render_to_string в теге),
+        # уже учтён во внешнем.
+        timing.depth += 1
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.depth -= 1
+            if not timing.depth:
+                timing.templates += perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, чьи шаблоны сообщают время отрисовки."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def server_timing(metrics):
+    return ', '.join(
+        f'{name};dur={duration};desc="{description}"'
+        for name, (duration, description) in metrics.items())
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.sample_rate = settings.REQUEST_TIMING_SAMPLE_RATE
+        if not self.sample_rate:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.show_toolbar = None
+        if apps.is_installed('debug_toolbar'):
+            from debug_toolbar.middleware import get_show_toolbar
+            self.show_toolbar = get_show_toolbar()
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate or (
+                self.show_toolbar is not None and self.show_toolbar(request)):
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = current.set(timing)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing))
+                response = self.get_response(request)
+            timing.finish_view()
+        finally:
+            current.reset(token)
+        metrics = timing.metrics()
+        response['Server-Timing'] = server_timing(metrics)
+        self.log(request, response, timing, metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = current.get()
+        if timing is not None:
+            timing.start_view()
+
+    def process_template_response(self, request, response):
+        # TemplateResponse отрисуется после этого вызова: представление
+        # уже закончило работу.
+        timing = current.get()
+        if timing is not None:
+            timing.finish_view()
+        return response
+
+    def log(self, request, response, timing, metrics):
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{f'{name}_ms': duration
+               for name, (duration, _) in metrics.items()},
+        }, ensure_ascii=False))
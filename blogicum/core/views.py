@@ -0,0 +1,213 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed,
+    StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .storage import PRECOMPRESSED
+
+# Оригиналы из ContentAddressedStorage: <ab>/<cd>/<sha256>.<расширение>.
+# Содержимое по такому имени никогда не меняется.
+CONTENT_ADDRESSED_RE = re.compile(
+    r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.\w+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Статика после ManifestStaticFilesStorage: <имя>.<md5[:12]>.<расширение>.
+HASHED_STATIC_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """Возвращает (начало, конец включительно) для одного диапазона.
+
+    None — заголовка нет или он не поддерживается (несколько диапазонов),
+    тогда отдаётся весь файл. ValueError — диапазон вне файла.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def iter_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def cache_control(path):
+    if CONTENT_ADDRESSED_RE.search(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def sendfile_response(path, full_path):
+    """Передаёт отдачу файла фронт-серверу, тело ответа пустое."""
+    response = HttpResponse()
+    if settings.MEDIA_SENDFILE == 'x-accel':
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_PREFIX + path)
+    else:
+        response['X-Sendfile'] = full_path
+    return response
+
+
+def find_file(root, path):
+    """Путь внутри root и его stat; 404, если файла нет."""
+    try:
+        full_path = safe_join(root, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+    return full_path, stat
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if encoding:
+            encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def serve_file(request, full_path, stat, cache_control, sendfile_path=None,
+               content_type=None, encoding=None):
+    # Сильный ETag из метаданных: файл не читается ради хэша.
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control,
+        'Accept-Ranges': 'bytes',
+    }
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if content_type is None:
+            content_type, encoding = mimetypes.guess_type(full_path)
+        response = build_response(
+            request, full_path, stat.st_size, etag,
+            content_type or 'application/octet-stream', encoding,
+            sendfile_path)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def serve_media(request, path):
+    """Отдаёт файл из MEDIA_ROOT.
+
+    Поддерживает ETag и If-None-Match/If-Modified-Since, один диапазон
+    Range (с If-Range) и, если задан MEDIA_SENDFILE, передаёт отдачу
+    nginx (X-Accel-Redirect) или Apache/lighttpd (X-Sendfile).
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    full_path, stat = find_file(settings.MEDIA_ROOT, path)
+    return serve_file(
+        request, full_path, stat, cache_control(path),
+        sendfile_path=path if settings.MEDIA_SENDFILE else None)
+
+
+def serve_static(request, path):
+    """Отдаёт собранную collectstatic статику из STATIC_ROOT.
+
+    Если клиент принимает br или gzip и рядом лежит сжатая копия
+    (см. core.storage.CompressedManifestStaticFilesStorage), отдаётся
+    она с Content-Encoding. Файлы с хэшем в имени кэшируются навсегда.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    full_path, stat = find_file(settings.STATIC_ROOT, path)
+    content_type = (mimetypes.guess_type(full_path)[0]
+                    or 'application/octet-stream')
+    encoding = None
+    accepted = accepted_encodings(request)
+    for name, suffix, _ in PRECOMPRESSED:
+        if name not in accepted:
+            continue
+        try:
+            full_path, stat = find_file(settings.STATIC_ROOT, path + suffix)
+        except Http404:
+            continue
+        encoding = name
+        break
+    if HASHED_STATIC_RE.search(path):
+        control = IMMUTABLE_CACHE_CONTROL
+    else:
+        control = f'public, max-age={settings.STATIC_CACHE_MAX_AGE}'
+    response = serve_file(request, full_path, stat, control,
+                          content_type=content_type, encoding=encoding)
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def build_response(request, full_path, size, etag, content_type, encoding,
+                   sendfile_path=None):
+    if sendfile_path is not None:
+        # Диапазоны и сжатие фронт-сервер обработает сам.
+        response = sendfile_response(sendfile_path, full_path)
+        response['Content-Type'] = content_type
+        return response
+
+    byte_range = None
+    if request.META.get('HTTP_IF_RANGE', etag) == etag:
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'),
+                                content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_range(full_path, start, length), status=206,
+            content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
@@ -31,7 +31,9 @@ def CommentModelAdapter(CommentModel: type) -> CommentModelAdapterT:
 
         @property
         def _access_by_name_fields(self):
-            return ["id", "refresh_from_db"]
+            # updated_at из BaseModel — второе поле DateTimeField рядом
+            # с created_at, поэтому его нельзя искать по типу.
+            return ["id", "updated_at", "refresh_from_db"]
 
         @property
         def AdapterFields(self) -> type:
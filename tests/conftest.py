@@ -41,6 +41,35 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path):
+    # Загрузки и их уменьшенные копии не должны оставаться в media/.
+    with override_settings(MEDIA_ROOT=str(tmp_path / "media")):
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def collected_static(tmp_path_factory):
+    # Страницы отрисовываются с хранилищем статики из настроек, как
+    # в продакшене: {% static %} без записи в манифесте падает
+    # с ValueError и в тестах. Манифест собирается один раз на сессию.
+    from django.core.management import call_command
+
+    with override_settings(
+        STATIC_ROOT=str(tmp_path_factory.mktemp("static"))
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,33 @@
+import os
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+EXIF_ORIENTATION = 0x0112
+
+
+def image_file(
+        size=(40, 30), color=None, format="JPEG", name=None, mode="RGB",
+        orientation=None, noise=False
+) -> SimpleUploadedFile:
+    """Картинка, собранная PIL, как загруженный файл.
+
+    noise заполняет кадр случайными байтами: такой PNG почти не
+    сжимается. orientation записывается в EXIF.
+    """
+    if noise:
+        image = Image.frombytes(
+            mode, size, os.urandom(len(mode) * size[0] * size[1]))
+    else:
+        image = Image.new(mode, size, color=color)
+    options = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        options["exif"] = exif.tobytes()
+    buffer = BytesIO()
+    image.save(buffer, format, **options)
+    if name is None:
+        name = "photo.jpg" if format == "JPEG" else f"photo.{format.lower()}"
+    return SimpleUploadedFile(name, buffer.getvalue(), Image.MIME[format])
@@ -79,6 +79,31 @@ def post_of_another_author(
     )
 
 
+@pytest.fixture
+def published_post(
+    mixer: Mixer, user, published_location, published_category
+):
+    """Фабрика постов user, которые видны в лентах, без фото.
+
+    Без count возвращает один пост, с count — список из count постов.
+    """
+
+    def blend(count=None, **fields):
+        fields = {
+            "author": user,
+            "is_published": True,
+            "category": published_category,
+            "location": published_location,
+            "image": None,
+            **fields,
+        }
+        if count is None:
+            return mixer.blend("blog.Post", **fields)
+        return mixer.cycle(count).blend("blog.Post", **fields)
+
+    return blend
+
+
 @pytest.fixture
 def post_with_published_location(
         mixer: Mixer, user, published_location, published_category):
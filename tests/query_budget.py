@@ -0,0 +1,85 @@
+"""Проверка числа SQL-запросов страницы с отчётом по местам вызова.
+
+Каждый запрос записывается вместе с местом, откуда он ушёл: ближайшей
+строкой кода проекта или, если запрос сделала отрисовка шаблона
+(ленивая загрузка связанного объекта), строкой шаблона. Так N+1
+в шаблоне видно сразу — одна строка и много одинаковых запросов.
+"""
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.template.base import Node
+
+RENDER_ANNOTATED = Node.render_annotated.__code__
+
+
+def template_site(node: Node) -> str:
+    origin = getattr(node, "origin", None)
+    token = getattr(node, "token", None)
+    name = origin and (origin.template_name or origin.name)
+    return f"{name}:{token.lineno if token else '?'}"
+
+
+def call_site() -> str:
+    """Ближайшая к запросу строка кода проекта или шаблона."""
+    project = str(Path(settings.BASE_DIR)) + "/"
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code is RENDER_ANNOTATED:
+            return template_site(frame.f_locals["self"])
+        if code.co_filename.startswith(project):
+            path = code.co_filename[len(project):]
+            return f"{path}:{frame.f_lineno} ({code.co_name})"
+        frame = frame.f_back
+    return "django"
+
+
+class QueryLog:
+    """Обёртка execute, запоминающая SQL и место вызова."""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, str]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((call_site(), sql))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    def report(self) -> str:
+        """Запросы, сгруппированные по месту вызова, самые частые первыми."""
+        sites = Counter(site for site, _ in self.queries)
+        lines = []
+        for site, count in sites.most_common():
+            lines.append(f"{site} — {count}:")
+            statements = Counter(
+                sql for query_site, sql in self.queries if query_site == site)
+            for sql, repeats in statements.most_common():
+                prefix = f"×{repeats} " if repeats > 1 else ""
+                lines.append(f"    {prefix}{sql}")
+        return "\n".join(lines)
+
+
+def assert_query_budget(client, url: str, budget: int, who: str):
+    """Запрашивает url и проверяет, что запросов не больше budget."""
+    with QueryLog() as log:
+        response = client.get(url)
+    assert len(log) <= budget, (
+        f"Убедитесь, что страница `{url}` для {who} делает не больше "
+        f"{budget} SQL-запросов, сейчас их {len(log)}:\n{log.report()}"
+    )
+    return response
@@ -0,0 +1,122 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+
+from blog import benchmark
+from blog.models import Category, Comment, Post
+from core.benchmark import compare, load_baseline, save_baseline
+
+pytestmark = [pytest.mark.django_db]
+
+SIZE = 200
+
+
+def test_seed_is_consistent():
+    benchmark.seed(SIZE)
+    shape = benchmark.dataset_shape(SIZE)
+    assert Post.objects.count() == SIZE
+    assert Comment.objects.count() == shape["comments"]
+    assert Category.objects.count() == shape["categories"]
+    mismatched = Post.objects.annotate(
+        counted=Count("comments")
+    ).exclude(comment_count=F("counted"))
+    assert not mismatched.exists(), (
+        "Убедитесь, что comment_count постов в наборе для бенчмарка "
+        "совпадает с числом их комментариев."
+    )
+    for post in Post.objects.select_related("category", "location"):
+        assert post.is_visible == post.get_visibility(), (
+            "Убедитесь, что is_visible постов в наборе для бенчмарка "
+            "посчитан так же, как в Post.save()."
+        )
+
+
+def test_seed_is_deterministic():
+    benchmark.seed(SIZE)
+    first = list(Post.objects.order_by("pk").values_list(
+        "title", "author__username", "category__slug", "comment_count"))
+    call_command("flush", interactive=False, verbosity=0)
+    benchmark.seed(SIZE)
+    second = list(Post.objects.order_by("pk").values_list(
+        "title", "author__username", "category__slug", "comment_count"))
+    assert first == second, (
+        "Убедитесь, что набор для бенчмарка одинаков при одном seed."
+    )
+
+
+def test_run_measures_every_scenario():
+    benchmark.seed(SIZE)
+    results = benchmark.run(repeat=2)
+    assert set(results) == {
+        "index", "category", "profile", "post_detail",
+        "create_post", "edit_post", "add_comment",
+    }
+    for name, result in results.items():
+        assert set(result) == {"p50_ms", "p95_ms", "queries", "peak_kib"}
+        assert result["queries"] > 0, (
+            f"Убедитесь, что сценарий «{name}» обращается к базе."
+        )
+
+
+def test_compare_detects_regressions():
+    baseline = {"10000": {
+        "index": {"p50_ms": 5, "p95_ms": 10, "queries": 2, "peak_kib": 100},
+    }}
+    same = {10000: {
+        "index": {"p50_ms": 6, "p95_ms": 14, "queries": 2, "peak_kib": 120},
+        "new": {"p50_ms": 1, "p95_ms": 1, "queries": 9, "peak_kib": 1},
+    }}
+    assert compare(same, baseline, threshold=0.5) == []
+    slower = {10000: {
+        "index": {"p50_ms": 9, "p95_ms": 20, "queries": 3, "peak_kib": 100},
+    }}
+    regressions = compare(slower, baseline, threshold=0.5)
+    assert len(regressions) == 2, (
+        "Убедитесь, что рост p95 сверх порога и рост числа запросов "
+        "считаются регрессиями."
+    )
+
+
+def test_baseline_keeps_other_sizes(tmp_path):
+    path = tmp_path / "views.json"
+    save_baseline(path, {10000: {"index": {"p95_ms": 1}}})
+    save_baseline(path, {100000: {"index": {"p95_ms": 2}}},
+                  load_baseline(path))
+    assert set(load_baseline(path)) == {"10000", "100000"}
+
+
+def test_command_fails_on_regression(tmp_path, monkeypatch):
+    path = tmp_path / "views.json"
+    result = {"p50_ms": 1, "p95_ms": 2, "queries": 3, "peak_kib": 4}
+    save_baseline(path, {SIZE: {"index": result}})
+    monkeypatch.setattr(
+        "blog.management.commands.benchmark_views.Command.measure",
+        lambda self, options: {SIZE: {"index": {**result, "queries": 4}}},
+    )
+    with pytest.raises(CommandError, match="queries 3 -> 4"):
+        call_command("benchmark_views", sizes=[SIZE], baseline=path)
+
+
+def test_command_fails_without_baseline(tmp_path, monkeypatch):
+    path = tmp_path / "views.json"
+    result = {"p50_ms": 1, "p95_ms": 2, "queries": 3, "peak_kib": 4}
+    save_baseline(path, {SIZE: {"index": result}})
+    monkeypatch.setattr(
+        "blog.management.commands.benchmark_views.Command.measure",
+        lambda self, options: {
+            SIZE: {"index": result, "category": result},
+            SIZE * 10: {"index": result},
+        },
+    )
+    with pytest.raises(CommandError, match="--update-baseline") as error:
+        call_command("benchmark_views", sizes=[SIZE, SIZE * 10],
+                     baseline=path)
+    assert f"{SIZE} category" in str(error.value)
+    assert f"{SIZE * 10} index" in str(error.value), (
+        "Убедитесь, что benchmark_views не сообщает об отсутствии"
+        " регрессий для размеров без базовых замеров."
+    )
+    call_command("benchmark_views", sizes=[SIZE, SIZE * 10],
+                 baseline=path, update_baseline=True)
+    assert set(load_baseline(path)) == {str(SIZE), str(SIZE * 10)}
@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stored_count(post: Model) -> int:
+    return type(post).objects.values_list(
+        "comment_count", flat=True).get(pk=post.pk)
+
+
+def test_comment_count_follows_views(
+        post_with_published_location: Model, user_client: Client
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": text})
+    assert stored_count(post) == 2, (
+        "Убедитесь, что при добавлении комментария счётчик комментариев"
+        " поста увеличивается."
+    )
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    assert stored_count(post) == 1, (
+        "Убедитесь, что при удалении комментария счётчик комментариев"
+        " поста уменьшается."
+    )
+
+
+def test_comment_count_follows_cascade(
+        mixer: Mixer, post_with_published_location: Model,
+        another_user: Model
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post)
+    another_user.delete()
+    assert stored_count(post) == 1
+
+
+def test_stale_post_save_keeps_comment_count(
+        mixer: Mixer, post_with_published_location: Model
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    assert stored_count(post) == 2
+
+
+def test_save_keeps_deferred_fields_deferred(
+        post_with_published_location: Model, django_assert_num_queries
+):
+    post = type(post_with_published_location).objects.select_related(
+        "category", "location").only(
+        "title", "is_published", "pub_date", "category__is_published",
+        "location__is_published").get(pk=post_with_published_location.pk)
+    post.title = "Новый заголовок"
+    with django_assert_num_queries(1):
+        post.save()
+    assert "text" in post.get_deferred_fields(), (
+        "Убедитесь, что save() поста с отложенными полями не загружает"
+        " их по одному запросу на поле."
+    )
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.title == "Новый заголовок"
+    assert post_with_published_location.text == post.text
+
+
+def test_recount_comments_repairs_drift(
+        mixer: Mixer, post_with_published_location: Model
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+    call_command("recount_comments", verbosity=0)
+    assert stored_count(post) == 2
@@ -0,0 +1,75 @@
+import re
+
+import pytest
+from django.db.models import Model
+from django.test.client import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+COMMENT_ID_RE = re.compile(r'name="comment_(\d+)"')
+MORE_RE = re.compile(r'href="([^"]+)" data-comments-more')
+
+N_COMMENTS = 25
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, post_with_published_location: Model, user):
+    comments = mixer.cycle(N_COMMENTS).blend(
+        "blog.Comment", post=post_with_published_location, author=user)
+    # Половина комментариев с одинаковым временем: порядок держится на id.
+    type(comments[0]).objects.filter(
+        pk__in=[comment.pk for comment in comments[::2]]
+    ).update(created_at=timezone.now())
+    return comments
+
+
+def collect_comments(client: Client, url: str):
+    ids, pages = [], 0
+    while url:
+        content = client.get(url).content.decode("utf-8")
+        ids.extend(int(pk) for pk in COMMENT_ID_RE.findall(content))
+        more = MORE_RE.search(content)
+        url = more and more.group(1).replace("&amp;", "&")
+        pages += 1
+    return ids, pages
+
+
+def test_comments_are_paginated(
+        many_comments, post_with_published_location: Model,
+        user_client: Client
+):
+    post = post_with_published_location
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert len(COMMENT_ID_RE.findall(content)) == 10, (
+        "Убедитесь, что на странице поста выводится только первая"
+        " страница комментариев."
+    )
+    ids, pages = collect_comments(user_client, f"/posts/{post.id}/")
+    expected = type(many_comments[0]).objects.filter(
+        post=post).order_by("created_at", "id").values_list("id", flat=True)
+    assert ids == list(expected), (
+        "Убедитесь, что подгружаемые страницы комментариев выводят все"
+        " комментарии по одному разу в порядке добавления."
+    )
+    assert pages == 3
+    fragment = user_client.get(MORE_RE.search(content).group(1))
+    assert "<html" not in fragment.content.decode("utf-8")
+    assert f"/posts/{post.id}/edit_comment/" in fragment.content.decode(
+        "utf-8"), (
+        "Убедитесь, что у подгруженных комментариев есть ссылки"
+        " на редактирование и удаление."
+    )
+
+
+def test_comment_pages_of_unpublished_post(
+        post_with_published_location: Model, many_comments,
+        user_client: Client, another_user_client: Client
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/comments/"
+    assert another_user_client.get(url).status_code == 404
+    assert user_client.get(url).status_code == 200
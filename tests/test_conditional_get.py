@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+from django.test.client import Client
+from django.utils.http import http_date
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_urls(post: Model) -> list:
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+
+
+@pytest.mark.parametrize(
+    "client_name, max_queries",
+    # Сессия и пользователь + запросы отпечатка; анонимному читателю
+    # отвечает кэш страниц.
+    [("user_client", 5), ("unlogged_client", 0)],
+)
+def test_unchanged_pages_answer_not_modified(
+        request, client_name: str, max_queries: int,
+        post_with_published_location: Model,
+        django_assert_max_num_queries
+):
+    client = request.getfixturevalue(client_name)
+    for url in get_urls(post_with_published_location):
+        response = client.get(url)
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаётся с заголовком ETag."
+        )
+        assert not response.has_header("Last-Modified"), (
+            "Убедитесь, что страницы проверяются только по ETag:"
+            " updated_at не меняется при удалении постов и комментариев."
+        )
+        with django_assert_max_num_queries(max_queries):
+            repeated = client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeated.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает"
+            " статусом 304 на запрос с If-None-Match."
+        )
+        assert not repeated.content
+
+
+def test_changes_refresh_etag(
+        mixer: Mixer, post_with_published_location: Model,
+        user_client: Client
+):
+    post = post_with_published_location
+    urls = get_urls(post)
+    etags = {url: user_client.get(url)["ETag"] for url in urls}
+
+    post.title = "Исправленный заголовок"
+    post.save()
+    for url in urls:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после изменения поста страница `{url}`"
+            " не отвечает статусом 304."
+        )
+        etags[url] = response["ETag"]
+
+    mixer.blend("blog.Comment", post=post)
+    for url in urls:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после добавления комментария страница `{url}`"
+            " не отвечает статусом 304."
+        )
+
+
+@pytest.mark.parametrize("client_name", ["user_client", "unlogged_client"])
+def test_processed_image_refreshes_etag(
+        request, client_name: str, post_with_published_location: Model
+):
+    client = request.getfixturevalue(client_name)
+    urls = get_urls(post_with_published_location)
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    call_command("process_image_jobs", workers=1, verbosity=0)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, (
+            f"Убедитесь, что после обработки фото страница `{url}` не"
+            " отвечает статусом 304: в ней появились уменьшенные копии."
+        )
+        assert "srcset" in response.content.decode()
+
+
+def test_if_modified_since_alone_never_answers_not_modified(
+        mixer: Mixer, post_with_published_location: Model,
+        unlogged_client: Client
+):
+    post = post_with_published_location
+    urls = ["/", f"/posts/{post.id}/"]
+    for url in urls:
+        unlogged_client.get(url)
+    comment = mixer.blend("blog.Comment", post=post, text="Новый комментарий")
+    since = http_date(time.time() + 60)
+    for url in urls:
+        response = unlogged_client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после добавления комментария страница `{url}`"
+            " не отвечает статусом 304 на запрос с If-Modified-Since."
+        )
+    comment.delete()
+    response = unlogged_client.get(urls[-1], HTTP_IF_MODIFIED_SINCE=since)
+    assert response.status_code == 200
+    assert "Новый комментарий" not in response.content.decode()
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+
+from core.css import prune_stylesheet, source_files
+
+CSS = (
+    '@charset "UTF-8";/*! license */'
+    ':root{--x:1}body{margin:0}'
+    '.card{display:flex}.modal{display:none}'
+    '.btn:hover,.carousel .item{color:red}'
+    '.quote::before{content:"{.modal}"}'
+    '@media (min-width:768px){.modal-lg{width:1px}.card-body{padding:0}}'
+    '@media print{.carousel{display:none}}'
+    '@keyframes spin{to{transform:rotate(360deg)}}'
+    '/*# sourceMappingURL=bootstrap.min.css.map */'
+)
+
+
+def test_prune_keeps_only_used_rules():
+    pruned = prune_stylesheet(
+        CSS, used={"card", "card-body", "btn", "quote"}, allowlist=["is-*"])
+    assert pruned.startswith('@charset "UTF-8";/*! license */')
+    for kept in (":root{--x:1}", "body{margin:0}", ".card{display:flex}",
+                 ".btn:hover{color:red}", '.quote::before{content:"{.modal}"}',
+                 "@media (min-width:768px){.card-body{padding:0}}",
+                 "@keyframes spin"):
+        assert kept in pruned, (
+            f"Убедитесь, что правило `{kept}` сохраняется после очистки."
+        )
+    for removed in (".modal{", ".carousel", "@media print", "sourceMapping"):
+        assert removed not in pruned, (
+            f"Убедитесь, что `{removed}` удаляется из таблицы стилей."
+        )
+
+
+def test_allowlist_keeps_dynamic_classes():
+    pruned = prune_stylesheet(
+        ".is-invalid{color:red}.show{display:block}",
+        used=set(), allowlist=["is-*", "show"])
+    assert pruned.strip() == ".is-invalid{color:red}.show{display:block}"
+
+
+def test_sources_are_templates_and_form_code():
+    base_dir = Path(settings.BASE_DIR).resolve()
+    project = {
+        str(path.relative_to(base_dir)) for path in source_files()
+        if base_dir in path.parents
+    }
+    assert "templates/base.html" in project
+    assert "blog/forms.py" in project
+    code = {name for name in project if name.endswith(".py")}
+    assert code == {"blog/forms.py"}, (
+        "Убедитесь, что prune_css не собирает классы из Python-кода"
+        " проекта, кроме модулей форм: иначе любые правки меняют"
+        " собранную таблицу стилей."
+    )
+
+
+def test_command_reports_savings(tmp_path, capsys):
+    output = tmp_path / "pruned.css"
+    call_command("prune_css", output=str(output))
+    report = capsys.readouterr().out
+    assert "->" in report and "%" in report, (
+        "Убедитесь, что команда prune_css сообщает, сколько байт сэкономлено."
+    )
+    source = Path(settings.STATICFILES_DIRS[0]) / "css/bootstrap.min.css"
+    assert 0 < output.stat().st_size < source.stat().st_size
+
+
+def test_bundled_stylesheet_is_up_to_date():
+    static_dir = Path(settings.STATICFILES_DIRS[0])
+    css = (static_dir / "css/bootstrap.min.css").read_text(encoding="utf-8")
+    bundled = static_dir / "css/bootstrap.pruned.min.css"
+    assert bundled.read_text(encoding="utf-8") == prune_stylesheet(css), (
+        "Таблица стилей bootstrap.pruned.min.css не соответствует шаблонам."
+        " Пересоберите её командой prune_css."
+    )
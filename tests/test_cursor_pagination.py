@@ -0,0 +1,99 @@
+import json
+import re
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+import pytest
+from django.db.models import Model
+from django.test import override_settings
+from django.test.client import Client
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+CURSOR_RE = re.compile(r'href="\?cursor=([\w-]+)"')
+
+
+@pytest.fixture
+def feed_posts(
+        mixer: Mixer, user: Model, published_category: Model,
+        published_location: Model
+):
+    same_date = timezone.now() - timedelta(days=1)
+    pub_dates = (
+        same_date if i % 3 == 0 else same_date - timedelta(hours=i)
+        for i in range(N_PER_PAGE * 3 + 1)
+    )
+    return mixer.cycle(N_PER_PAGE * 3 + 1).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        pub_date=pub_dates,
+        category=published_category,
+        location=published_location,
+    )
+
+
+def get_page(client: Client, cursor=None):
+    response = client.get("/", {"cursor": cursor} if cursor else {})
+    assert response.status_code == 200, (
+        "Убедитесь, что главная страница с курсорной пагинацией"
+        " загружается без ошибок."
+    )
+    page_obj = response.context["page_obj"]
+    cursors = CURSOR_RE.findall(response.content.decode("utf-8"))
+    return page_obj, cursors
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_walks_whole_feed(
+        feed_posts, unlogged_client: Client, django_assert_num_queries
+):
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    seen = []
+    cursor = None
+    pages = []
+    while True:
+        with django_assert_num_queries(1):
+            page_obj, _ = get_page(unlogged_client, cursor)
+        pages.append([post.id for post in page_obj])
+        seen.extend(page_obj)
+        if not page_obj.has_next():
+            break
+        cursor = page_obj.next_cursor
+    assert [post.id for post in seen] == [post.id for post in expected], (
+        "Убедитесь, что курсорная пагинация выводит все посты ленты"
+        " по одному разу в порядке убывания даты публикации."
+    )
+    assert all(len(page) == N_PER_PAGE for page in pages[:-1])
+
+    # page_obj — уже последняя страница; повторный запрос к ней
+    # отдался бы из кэша страниц, без контекста шаблона.
+    back = get_page(unlogged_client, page_obj.previous_cursor)[0]
+    assert [post.id for post in back] == pages[-2], (
+        "Убедитесь, что ссылка на предыдущую страницу возвращает"
+        " к предыдущей странице ленты."
+    )
+
+
+@override_settings(FEED_PAGINATION="cursor")
+def test_cursor_pagination_ignores_broken_cursor(
+        feed_posts, unlogged_client: Client
+):
+    first_page, cursors = get_page(unlogged_client)
+    assert cursors and not first_page.has_previous()
+    broken_page, _ = get_page(unlogged_client, "not-a-cursor")
+    assert list(broken_page) == list(first_page)
+    for values in (["n", None, None], ["n", "2023-01-01", "x"],
+                   ["n", "2023-01-01", [1]]):
+        raw = json.dumps(values).encode()
+        cursor = urlsafe_b64encode(raw).decode().rstrip("=")
+        broken_page, _ = get_page(unlogged_client, cursor)
+        assert list(broken_page) == list(first_page), (
+            "Убедитесь, что курсор с пустыми или неподходящими значениями "
+            "открывает первую страницу, а не приводит к ошибке."
+        )
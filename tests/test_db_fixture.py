@@ -0,0 +1,34 @@
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+FIXTURE = settings.BASE_DIR / ".." / "db.json"
+
+
+def test_shipped_fixture_loads():
+    expected = len(json.loads(FIXTURE.read_text(encoding="utf-8")))
+    output = StringIO()
+    call_command("loaddata", str(FIXTURE), stdout=output)
+    assert f"Installed {expected} object(s)" in output.getvalue(), (
+        "Убедитесь, что `db.json` в корне проекта загружается командой "
+        "loaddata в базу с текущими миграциями."
+    )
+
+
+def test_shipped_fixture_posts_reach_feeds(client):
+    call_command("loaddata", str(FIXTURE), verbosity=0)
+    visible = Post.objects.filter(Post.objects.visible_condition())
+    assert visible.exists()
+    assert set(Post.objects.filter(is_visible=True)) == set(visible), (
+        "Убедитесь, что после loaddata у постов из фикстуры пересчитан "
+        "признак is_visible."
+    )
+    assert client.get("/").context["page_obj"].paginator.count == (
+        visible.count())
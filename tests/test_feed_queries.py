@@ -0,0 +1,48 @@
+import pytest
+from django.test.client import Client
+from django.db.models import Model
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+FEED_QUERY_COUNTS = {
+    "index": 2,
+    "category": 3,
+    "profile": 3,
+}
+
+
+def get_feed_urls(user: Model, category: Model) -> dict:
+    return {
+        "index": "/",
+        "category": f"/category/{category.slug}/",
+        "profile": f"/profile/{user.username}/",
+    }
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE * 2])
+@pytest.mark.parametrize("feed", list(FEED_QUERY_COUNTS))
+def test_feed_query_count(
+        mixer: Mixer, user: Model, published_category: Model,
+        published_location: Model, unlogged_client: Client,
+        django_assert_num_queries, feed: str, n_posts: int
+):
+    posts = mixer.cycle(n_posts).blend(
+        "blog.Post",
+        author=user,
+        is_published=True,
+        category=published_category,
+        location=published_location,
+    )
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post)
+    url = get_feed_urls(user, published_category)[feed]
+    n_pages = (n_posts - 1) // N_PER_PAGE + 1
+    for page in range(1, n_pages + 1):
+        with django_assert_num_queries(FEED_QUERY_COUNTS[feed]):
+            response = unlogged_client.get(url, {"page": page})
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` загружается без ошибок."
+        )
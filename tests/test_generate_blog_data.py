@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = 500
+
+
+def generate(**options):
+    call_command("generate_blog_data", posts=N_POSTS, chunk_size=64,
+                 users=50, **options)
+
+
+def test_generates_requested_rows(capsys):
+    generate(comments=800)
+    assert Post.objects.count() == N_POSTS
+    assert Comment.objects.count() == 800
+    assert get_user_model().objects.count() == 50
+    assert Category.objects.exists() and Location.objects.exists()
+    assert "строк/с" in capsys.readouterr().out, (
+        "Убедитесь, что команда generate_blog_data сообщает скорость "
+        "вставки в строках в секунду."
+    )
+
+
+def test_generated_rows_are_consistent():
+    generate()
+    drifted = Post.objects.annotate(
+        counted=Count("comments")
+    ).exclude(comment_count=F("counted"))
+    assert not drifted.exists(), (
+        "Убедитесь, что comment_count сгенерированных постов совпадает "
+        "с числом их комментариев."
+    )
+    for post in Post.objects.select_related("category", "location"):
+        assert post.is_visible == post.get_visibility(), (
+            "Убедитесь, что is_visible сгенерированных постов посчитан "
+            "так же, как в Post.save()."
+        )
+
+
+def test_generated_data_is_skewed():
+    generate()
+    authors = Counter(Post.objects.values_list("author_id", flat=True))
+    top_author = authors.most_common(1)[0][1]
+    assert top_author > 5 * N_POSTS / 50, (
+        "Убедитесь, что несколько активных авторов пишут заметно больше "
+        "постов, чем остальные."
+    )
+    busiest = Post.objects.order_by("-comment_count").first()
+    assert busiest.comment_count > 10, (
+        "Убедитесь, что несколько постов собирают много комментариев."
+    )
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    assert Category.objects.filter(is_published=False).exists()
+
+
+def test_can_run_twice():
+    generate()
+    generate()
+    assert Post.objects.count() == 2 * N_POSTS, (
+        "Убедитесь, что повторный запуск generate_blog_data добавляет "
+        "данные, не нарушая уникальность имён."
+    )
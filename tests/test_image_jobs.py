@@ -0,0 +1,62 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db.models import Model
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_job(post: Model):
+    from blog.models import ImageJob
+
+    return ImageJob.objects.get(image__name=post.image.name)
+
+
+def test_upload_is_processed_by_worker_pool(
+        post_with_published_location: Model, user_client: Client
+):
+    from blog.models import ImageJob
+
+    post = post_with_published_location
+    assert get_job(post).status == ImageJob.PENDING, (
+        "Убедитесь, что загруженное фото ставится в очередь обработки."
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.image.url in content and "srcset" not in content, (
+        "Убедитесь, что до обработки в карточке выводится оригинал."
+    )
+
+    call_command("process_image_jobs", workers=1, verbosity=0)
+    assert get_job(post).status == ImageJob.DONE
+    content = user_client.get("/").content.decode("utf-8")
+    assert ".card.webp" in content, (
+        "Убедитесь, что после обработки карточка выводит уменьшенные копии."
+    )
+
+
+def test_broken_upload_fails_after_retries(
+        post_with_published_location: Model
+):
+    from blog.models import ImageJob
+
+    post = post_with_published_location
+    post.image.storage.delete(post.image.name)
+    post.image.storage.save(post.image.name, ContentFile(b"not an image"))
+    call_command("process_image_jobs", workers=0, verbosity=0)
+    job = get_job(post)
+    assert job.status == ImageJob.FAILED
+    assert job.attempts == ImageJob.MAX_ATTEMPTS
+    assert job.error
+
+
+def test_image_jobs_in_admin(
+        post_with_published_location: Model, admin_client: Client
+):
+    job = get_job(post_with_published_location)
+    response = admin_client.get("/admin/blog/imagejob/")
+    assert response.status_code == 200
+    assert "В очереди" in response.content.decode("utf-8")
+    response = admin_client.get(
+        f"/admin/blog/storedimage/{job.image_id}/change/")
+    assert response.status_code == 200
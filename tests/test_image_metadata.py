@@ -0,0 +1,73 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+from django.test.client import Client
+from PIL import ImageFile
+
+from fixtures.images import image_file
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_metadata_stored_on_upload(
+        post_with_published_location: Model, user_client: Client
+):
+    post = post_with_published_location
+    post.image = image_file((300, 150))
+    post.save()
+    stored = post.stored_image
+    assert (stored.width, stored.height) == (300, 150), (
+        "Убедитесь, что размеры фото сохраняются при загрузке, до обработки"
+        " воркером."
+    )
+    assert stored.size == post.image.size
+    assert not stored.placeholder, (
+        "Убедитесь, что заглушка строится воркером, а не при сохранении"
+        " поста."
+    )
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert 'width="300" height="150"' in content, (
+        "Убедитесь, что у фото в карточке указаны размеры."
+    )
+
+    call_command("process_image_jobs", workers=0, verbosity=0)
+    stored.refresh_from_db()
+    assert stored.placeholder.startswith("data:image/jpeg;base64,")
+    assert stored.placeholder in user_client.get("/").content.decode("utf-8")
+
+
+def test_upload_reads_only_image_header(
+        post_with_published_location: Model, monkeypatch
+):
+    upload = image_file((320, 200), format="PNG", mode="RGBA")
+
+    def load(self):
+        raise AssertionError("Кадр декодируется при сохранении поста.")
+
+    monkeypatch.setattr(ImageFile.ImageFile, "load", load)
+    post = post_with_published_location
+    post.image = upload
+    post.save()
+    assert (post.stored_image.width, post.stored_image.height) == (320, 200)
+
+
+def test_rotated_photo_dimensions(post_with_published_location: Model):
+    post = post_with_published_location
+    post.image = image_file((300, 150), orientation=6)
+    post.save()
+    assert (post.stored_image.width, post.stored_image.height) == (150, 300)
+
+
+def test_fill_image_metadata_backfills(post_with_published_location: Model):
+    from blog.models import StoredImage
+
+    post = post_with_published_location
+    StoredImage.objects.update(width=None, height=None, placeholder="")
+    type(post).objects.filter(pk=post.pk).update(stored_image=None)
+    call_command("fill_image_metadata", verbosity=0)
+    post.refresh_from_db()
+    assert (post.stored_image.width, post.stored_image.height) == (100, 100)
+    call_command("process_image_jobs", workers=0, verbosity=0)
+    post.stored_image.refresh_from_db()
+    assert post.stored_image.placeholder
@@ -0,0 +1,106 @@
+import re
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+from mixer.backend.django import Mixer
+
+from fixtures.images import image_file
+
+pytestmark = [pytest.mark.django_db]
+
+HASHED_NAME_RE = re.compile(
+    r"^birthdays_images/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg$")
+
+
+def get_stored(name):
+    from blog.models import StoredImage
+
+    return StoredImage.objects.get(name=name)
+
+
+def test_same_content_is_stored_once(
+        mixer: Mixer, post_with_published_location: Model
+):
+    first = post_with_published_location
+    first.image = image_file(color="red", name="photo.JPEG")
+    first.save()
+    second = mixer.blend(
+        "blog.Post", author=first.author, category=first.category,
+        image=image_file(color="red", name="copy_of_photo.jpg"))
+    assert HASHED_NAME_RE.match(first.image.name), (
+        "Убедитесь, что фото хранятся под хэшем содержимого."
+    )
+    assert second.image.name == first.image.name, (
+        "Убедитесь, что повторная загрузка того же снимка не создаёт"
+        " новый файл."
+    )
+    storage = first.image.storage
+    directory = first.image.name.rsplit("/", 1)[0]
+    originals = [
+        name for name in storage.listdir(directory)[1]
+        if name.endswith(".jpg") and name.count(".") == 1
+    ]
+    assert len(originals) == 1
+    assert get_stored(first.image.name).refcount == 2
+
+
+def test_unreferenced_images_are_collected(
+        mixer: Mixer, post_with_published_location: Model
+):
+    post = post_with_published_location
+    old_name = post.image.name
+    storage = post.image.storage
+    post.image = image_file(color="blue", name="new.jpg")
+    post.save()
+    assert get_stored(old_name).refcount == 0
+
+    call_command("collect_image_garbage", verbosity=0)
+    assert storage.exists(old_name), (
+        "Убедитесь, что сборщик не трогает недавно освободившиеся файлы."
+    )
+    call_command("collect_image_garbage", min_age=0, dry_run=True,
+                 verbosity=0)
+    assert storage.exists(old_name)
+    call_command("collect_image_garbage", min_age=0, verbosity=0)
+    assert not storage.exists(old_name)
+    assert storage.exists(post.image.name)
+    assert get_stored(post.image.name).refcount == 1
+
+
+def test_orphan_uploads_are_collected(post_with_published_location: Model):
+    storage = post_with_published_location.image.storage
+    orphan = storage.save(
+        "birthdays_images/orphan.jpg",
+        image_file(color="green", name="orphan.jpg"))
+    call_command("collect_image_garbage", min_age=0, verbosity=0)
+    assert not storage.exists(orphan), (
+        "Убедитесь, что файлы без записи об изображении удаляются."
+    )
+    assert storage.exists(post_with_published_location.image.name)
+
+
+def test_concurrent_save_keeps_hash_name(
+        post_with_published_location: Model, monkeypatch
+):
+    storage = post_with_published_location.image.storage
+    name = storage.save("birthdays_images/photo.jpg",
+                        image_file(color="green", name="photo.jpg"))
+    checks = []
+    exists = type(storage).exists
+
+    def racing_exists(self, path):
+        # Первая проверка не видит файл: параллельная загрузка того же
+        # снимка создаёт его между проверкой и записью.
+        checks.append(path)
+        return len(checks) > 1 and exists(self, path)
+
+    monkeypatch.setattr(type(storage), "exists", racing_exists)
+    again = storage.save("birthdays_images/copy.jpg",
+                         image_file(color="green", name="copy.jpg"))
+    assert again == name, (
+        "Убедитесь, что одновременная загрузка того же содержимого"
+        " возвращает имя по хэшу, а не создаёт файл с суффиксом."
+    )
+    directory = name.rsplit("/", 1)[0]
+    assert storage.listdir(directory)[1] == [name.rsplit("/", 1)[1]]
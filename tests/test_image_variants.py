@@ -0,0 +1,76 @@
+import pytest
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models import Model
+from django.test.client import Client
+from PIL import Image
+
+from fixtures.images import image_file
+
+pytestmark = [pytest.mark.django_db]
+
+
+def process_jobs(**options):
+    call_command("process_image_jobs", workers=0, verbosity=0, **options)
+
+
+def test_variants_generated_and_rendered(
+        post_with_published_location: Model, user_client: Client
+):
+    from blog.images import variant_names
+
+    post = post_with_published_location
+    post.image = image_file((1600, 800))
+    post.save()
+    process_jobs()
+    post.refresh_from_db()
+    assert post.stored_image.variants == {"card": 640, "detail": 1280}
+    for name in variant_names(post.image.name):
+        assert default_storage.exists(name), (
+            f"Убедитесь, что копия `{name}` сохраняется рядом с оригиналом."
+        )
+    with default_storage.open(
+            variant_names(post.image.name)[0]) as variant:
+        assert Image.open(variant).size == (640, 320)
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert 'type="image/webp"' in content
+    assert ".card.webp 640w" in content and ".detail.jpg 1280w" in content
+    assert 'loading="lazy"' in content, (
+        "Убедитесь, что фото в ленте загружаются лениво."
+    )
+
+
+def test_variants_replaced_with_image(post_with_published_location: Model):
+    from blog.images import variant_names
+
+    post = post_with_published_location
+    process_jobs()
+    post.refresh_from_db()
+    old_names = variant_names(post.image.name)
+    assert all(default_storage.exists(name) for name in old_names)
+    assert post.stored_image.variants == {"card": 100, "detail": 100}, (
+        "Убедитесь, что маленькие фото не растягиваются."
+    )
+
+    post.image = image_file((800, 600), name="new.jpg")
+    post.save()
+    process_jobs()
+    post.refresh_from_db()
+    call_command("collect_image_garbage", min_age=0, verbosity=0)
+    assert not any(default_storage.exists(name) for name in old_names), (
+        "Убедитесь, что копии заменённого фото удаляются сборщиком мусора."
+    )
+    assert post.stored_image.name == post.image.name
+    assert post.stored_image.variants == {"card": 640, "detail": 800}
+
+
+def test_generate_image_variants_backfills(
+        post_with_published_location: Model
+):
+    post = post_with_published_location
+    type(post).objects.filter(pk=post.pk).update(stored_image=None)
+    call_command("generate_image_variants", verbosity=0)
+    process_jobs()
+    post.refresh_from_db()
+    assert post.stored_image.variants
@@ -0,0 +1,101 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import override_settings
+from django.test.client import Client
+
+from core.storage import ContentAddressedStorage
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file():
+    return FileSystemStorage().save("docs/file.bin", ContentFile(CONTENT))
+
+
+def get(client: Client, name: str, **headers):
+    return client.get(f"/media/{name}", **headers)
+
+
+def body(response) -> bytes:
+    return b"".join(response.streaming_content)
+
+
+def test_media_served_with_validators(client: Client, media_file: str):
+    response = get(client, media_file)
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert response["ETag"].startswith('"'), (
+        "Убедитесь, что media отдаются с сильным ETag."
+    )
+    assert "immutable" not in response["Cache-Control"]
+
+    repeated = get(client, media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeated.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "header, status, expected",
+    [
+        ("bytes=0-9", 206, CONTENT[:10]),
+        ("bytes=1000-", 206, CONTENT[1000:]),
+        ("bytes=-5", 206, CONTENT[-5:]),
+        ("bytes=5000-6000", 416, b""),
+        ("bytes=0-1,5-6", 200, CONTENT),
+    ],
+    ids=["closed", "open", "suffix", "unsatisfiable", "multiple"],
+)
+def test_media_byte_ranges(
+        client: Client, media_file: str, header: str, status: int,
+        expected: bytes
+):
+    response = get(client, media_file, HTTP_RANGE=header)
+    assert response.status_code == status, (
+        f"Убедитесь, что запрос с Range: {header} отвечает статусом {status}."
+    )
+    content = (body(response) if response.streaming
+               else response.content)
+    assert content == expected
+    if status == 206:
+        assert response["Content-Range"].endswith(f"/{len(CONTENT)}")
+        assert int(response["Content-Length"]) == len(expected)
+
+
+def test_media_if_range_mismatch_returns_whole_file(
+        client: Client, media_file: str
+):
+    response = get(client, media_file, HTTP_RANGE="bytes=0-9",
+                   HTTP_IF_RANGE='"outdated"')
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+
+
+def test_content_addressed_media_is_immutable(client: Client):
+    name = ContentAddressedStorage().save(
+        "birthdays_images/photo.jpg", ContentFile(b"jpeg bytes"))
+    response = get(client, name)
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с адресом по хэшу содержимого кэшируются"
+        " как неизменяемые."
+    )
+
+
+def test_media_outside_root_is_not_served(client: Client):
+    assert get(client, "../blogicum/settings.py").status_code == 404
+    assert get(client, "missing.jpg").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "mode, header", [("x-accel", "X-Accel-Redirect"),
+                     ("x-sendfile", "X-Sendfile")])
+def test_media_sendfile_handoff(
+        client: Client, media_file: str, mode: str, header: str
+):
+    with override_settings(MEDIA_SENDFILE=mode):
+        response = get(client, media_file)
+    assert response.status_code == 200
+    assert response.has_header(header)
+    assert response.content == b""
+    assert response.has_header("ETag")
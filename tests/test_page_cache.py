@@ -0,0 +1,93 @@
+import pytest
+from django.core.cache import cache
+from django.db.models import Model
+from django.test import override_settings
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "page-cache-tests",
+    },
+    "filebased": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    },
+}
+
+
+@pytest.fixture(params=list(CACHE_BACKENDS))
+def cache_backend(request, tmp_path):
+    config = dict(CACHE_BACKENDS[request.param])
+    if request.param == "filebased":
+        config["LOCATION"] = str(tmp_path)
+    with override_settings(CACHES={"default": config}):
+        cache.clear()
+        yield request.param
+
+
+def get_urls(post: Model) -> list:
+    return [
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    ]
+
+
+def test_anonymous_pages_are_cached(
+        cache_backend, post_with_published_location: Model,
+        unlogged_client: Client, django_assert_num_queries
+):
+    for url in get_urls(post_with_published_location):
+        first = unlogged_client.get(url)
+        assert first.status_code == 200
+        with django_assert_num_queries(0):
+            second = unlogged_client.get(url)
+        assert second["X-Page-Cache"] == "hit", (
+            f"Убедитесь, что страница `{url}` для анонимного читателя"
+            " отдаётся из кэша."
+        )
+        assert second.content == first.content
+
+
+def test_authenticated_pages_bypass_cache(
+        cache_backend, post_with_published_location: Model,
+        user_client: Client
+):
+    for url in get_urls(post_with_published_location):
+        user_client.get(url)
+        assert "X-Page-Cache" not in user_client.get(url)
+
+
+def test_page_cache_invalidated_by_signals(
+        cache_backend, mixer: Mixer, post_with_published_location: Model,
+        unlogged_client: Client
+):
+    post = post_with_published_location
+    urls = get_urls(post)
+    for url in urls:
+        unlogged_client.get(url)
+
+    post.title = "Исправленный заголовок"
+    post.save()
+    for url in urls:
+        content = unlogged_client.get(url).content.decode("utf-8")
+        assert "Исправленный заголовок" in content, (
+            f"Убедитесь, что после изменения поста страница `{url}`"
+            " не отдаётся из кэша в устаревшем виде."
+        )
+
+    comment = mixer.blend("blog.Comment", post=post, text="Новый комментарий")
+    assert comment.text in unlogged_client.get(urls[-1]).content.decode()
+
+    post.location.name = "Новое место"
+    post.location.save()
+    for url in urls:
+        assert "Новое место" in unlogged_client.get(url).content.decode()
+
+    post.category.is_published = False
+    post.category.save()
+    assert post.title not in unlogged_client.get("/").content.decode()
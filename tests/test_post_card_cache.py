@@ -0,0 +1,49 @@
+import pytest
+from django.db.models import Model
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def get_card_counters():
+    from blog.metrics import card_cache_hits, card_cache_misses
+
+    return card_cache_hits.value, card_cache_misses.value
+
+
+def test_post_card_cache_hits_and_invalidation(
+        mixer: Mixer, post_with_published_location: Model,
+        user_client: Client
+):
+    # Анонимному читателю повторная лента отдаётся целиком из кэша
+    # страниц, не доходя до карточек, поэтому кэш карточек проверяется
+    # на авторизованном пользователе.
+    post = post_with_published_location
+    user_client.get("/")
+    assert get_card_counters() == (0, 1)
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert get_card_counters() == (1, 1), (
+        "Убедитесь, что при повторном открытии ленты карточка поста"
+        " берётся из кэша."
+    )
+    assert "Комментарии (0)" in content
+
+    mixer.blend("blog.Comment", post=post)
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что после добавления комментария карточка поста"
+        " отрисовывается заново."
+    )
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Новое название категории" in content
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert "@renamed_author" in content
+    assert get_card_counters() == (1, 4)
@@ -0,0 +1,47 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+
+pytestmark = [pytest.mark.django_db]
+
+
+def is_visible(post: Model) -> bool:
+    return type(post).objects.values_list(
+        "is_visible", flat=True).get(pk=post.pk)
+
+
+def test_post_visibility_follows_publication(
+        post_with_published_location: Model
+):
+    post = post_with_published_location
+    assert is_visible(post)
+    post.is_published = False
+    post.save()
+    assert not is_visible(post), (
+        "Убедитесь, что снятый с публикации пост убирается из лент."
+    )
+
+
+@pytest.mark.parametrize("related", ["category", "location"])
+def test_post_visibility_follows_related(
+        post_with_published_location: Model, related: str
+):
+    post = post_with_published_location
+    related_obj = getattr(post, related)
+    related_obj.is_published = False
+    related_obj.save()
+    assert not is_visible(post)
+    related_obj.is_published = True
+    related_obj.save()
+    assert is_visible(post)
+    related_obj.delete()
+    assert not is_visible(post)
+
+
+def test_refresh_post_visibility_backfills(
+        post_with_published_location: Model
+):
+    post = post_with_published_location
+    type(post).objects.filter(pk=post.pk).update(is_visible=False)
+    call_command("refresh_post_visibility", verbosity=0)
+    assert is_visible(post)
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Model
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_publish_scheduled_flips_due_posts(
+        post_with_published_location: Model, unlogged_client
+):
+    from blog.signals import post_published
+
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(hours=1)
+    post.save()
+    assert post.title not in unlogged_client.get("/").content.decode()
+
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+    received = []
+
+    def on_published(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    post_published.connect(on_published)
+    try:
+        call_command("publish_scheduled", verbosity=0)
+    finally:
+        post_published.disconnect(on_published)
+
+    assert received == [post.pk], (
+        "Убедитесь, что команда publish_scheduled отправляет сигнал"
+        " post_published с опубликованными постами."
+    )
+    assert post.title in unlogged_client.get("/").content.decode(), (
+        "Убедитесь, что после публикации отложенный пост появляется"
+        " в ленте."
+    )
+
+
+def test_publish_rechecks_condition_in_update(
+        post_with_published_location: Model
+):
+    from blog.management.commands.publish_scheduled import Command
+
+    post = post_with_published_location
+    post.pub_date = timezone.now() - timedelta(seconds=1)
+    post.save()
+    Post = type(post)
+    Post.objects.filter(pk=post.pk).update(is_visible=False)
+    # Пост сняли с публикации уже после того, как команда его выбрала.
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    assert Command().publish([post.pk]) == [], (
+        "Убедитесь, что publish_scheduled не показывает пост, снятый"
+        " с публикации между выборкой и обновлением."
+    )
+    assert not Post.objects.get(pk=post.pk).is_visible
+
+    Post.objects.filter(pk=post.pk).update(is_published=True)
+    updated_at = Post.objects.get(pk=post.pk).updated_at
+    assert Command().publish([post.pk]) == [post.pk]
+    post.refresh_from_db()
+    assert post.is_visible and post.updated_at > updated_at, (
+        "Убедитесь, что publish_scheduled обновляет updated_at"
+        " опубликованных постов."
+    )
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.template import Context, Template
+from django.urls import URLPattern, URLResolver
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import urls as blog_urls
+from blog.models import Post
+from conftest import N_PER_PAGE
+from pages import urls as pages_urls
+from query_budget import QueryLog, assert_query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+ROLES = ("anonymous", "author", "reader")
+
+# Наибольшее число SQL-запросов на GET каждой страницы: для анонима,
+# для автора поста и комментария и для другого вошедшего читателя.
+# Вошедшему всегда нужны ещё два запроса — сессия и пользователь.
+QUERY_BUDGETS = {
+    "blog:index": {"anonymous": 2, "author": 4, "reader": 4},
+    "blog:search": {"anonymous": 5, "author": 7, "reader": 7},
+    "blog:category_posts": {"anonymous": 3, "author": 5, "reader": 5},
+    "blog:profile": {"anonymous": 3, "author": 5, "reader": 5},
+    "blog:edit_profile": {"anonymous": 0, "author": 3, "reader": 3},
+    "blog:post_detail": {"anonymous": 2, "author": 4, "reader": 4},
+    "blog:post_comments": {"anonymous": 2, "author": 4, "reader": 4},
+    "blog:create_post": {"anonymous": 0, "author": 4, "reader": 4},
+    "blog:edit_post": {"anonymous": 0, "author": 5, "reader": 3},
+    "blog:delete_post": {"anonymous": 0, "author": 3, "reader": 3},
+    "blog:add_comment": {"anonymous": 1, "author": 3, "reader": 3},
+    "blog:edit_comment": {"anonymous": 1, "author": 3, "reader": 3},
+    "blog:delete_comment": {"anonymous": 1, "author": 3, "reader": 3},
+    "pages:about": {"anonymous": 0, "author": 2, "reader": 2},
+    "pages:rules": {"anonymous": 0, "author": 2, "reader": 2},
+}
+
+
+def url_names(module):
+    for pattern in module.urlpatterns:
+        if isinstance(pattern, URLResolver):
+            for child in pattern.url_patterns:
+                yield f"{module.app_name}:{child.name}"
+        elif isinstance(pattern, URLPattern):
+            yield f"{module.app_name}:{pattern.name}"
+
+
+@pytest.fixture
+def site(mixer: Mixer, published_post, user, another_user,
+         published_category):
+    """Посты автора user с комментариями обоих пользователей."""
+
+    def fill(n_posts: int) -> dict:
+        posts = published_post(
+            n_posts, pub_date=timezone.now() - timedelta(days=1),
+            title="Поход", text="Маршрут вдоль реки.",
+        )
+        for post in posts:
+            mixer.blend("blog.Comment", post=post, author=another_user)
+        post = posts[0]
+        comment = mixer.blend("blog.Comment", post=post, author=user)
+        return {
+            "blog:index": "/",
+            "blog:search": "/search/?q=поход",
+            "blog:category_posts": f"/category/{published_category.slug}/",
+            "blog:profile": f"/profile/{user.username}/",
+            "blog:edit_profile": f"/profile/{user.username}/edit/",
+            "blog:post_detail": f"/posts/{post.id}/",
+            "blog:post_comments": f"/posts/{post.id}/comments/",
+            "blog:create_post": "/posts/create/",
+            "blog:edit_post": f"/posts/{post.id}/edit/",
+            "blog:delete_post": f"/posts/{post.id}/delete/",
+            "blog:add_comment": f"/posts/{post.id}/comment/",
+            "blog:edit_comment":
+                f"/posts/{post.id}/edit_comment/{comment.id}/",
+            "blog:delete_comment":
+                f"/posts/{post.id}/delete_comment/{comment.id}/",
+            "pages:about": "/pages/about/",
+            "pages:rules": "/pages/rules/",
+        }
+
+    return fill
+
+
+def test_every_url_has_a_budget():
+    names = {*url_names(blog_urls), *url_names(pages_urls)}
+    assert names == set(QUERY_BUDGETS), (
+        "Убедитесь, что для каждой страницы из blog/urls.py и "
+        "pages/urls.py задан бюджет SQL-запросов."
+    )
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE * 2 + 1])
+@pytest.mark.parametrize("role", ROLES)
+@pytest.mark.parametrize("name", list(QUERY_BUDGETS))
+def test_query_budget(
+        site, name: str, role: str, n_posts: int, unlogged_client,
+        user_client, another_user_client
+):
+    urls = site(n_posts)
+    client = {
+        "anonymous": unlogged_client,
+        "author": user_client,
+        "reader": another_user_client,
+    }[role]
+    response = assert_query_budget(
+        client, urls[name], QUERY_BUDGETS[name][role], role)
+    assert response.status_code < 500, (
+        f"Убедитесь, что страница `{urls[name]}` загружается без ошибок."
+    )
+
+
+def test_report_points_at_template_line(mixer: Mixer, user):
+    mixer.cycle(3).blend("blog.Post", author=user)
+    template = Template(
+        "{% for post in posts %}\n{{ post.author.username }}\n{% endfor %}")
+    with QueryLog() as log:
+        template.render(Context({"posts": Post.objects.all()}))
+    report = log.report()
+    assert "<unknown source>:2 — 3:" in report and "×3 SELECT" in report, (
+        "Убедитесь, что запросы из шаблона группируются по его строке:\n"
+        + report
+    )
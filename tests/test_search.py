@@ -0,0 +1,101 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True, params=["index", "fts"])
+def search_backend(request):
+    with override_settings(SEARCH_BACKEND=request.param):
+        yield request.param
+
+
+@pytest.fixture
+def search_posts(published_post):
+    posts = {
+        "title": published_post(
+            title="Велосипедный поход", text="Маршрут вдоль реки."),
+        "text": published_post(
+            title="Выходные", text="Взяли велосипед и поехали за город."),
+        "other": published_post(
+            title="Рецепт пирога", text="Мука, яйца, сахар."),
+    }
+    call_command("process_search_index", verbosity=0)
+    return posts
+
+
+def search(client: Client, query: str, **params):
+    return client.get("/search/", {"q": query, **params})
+
+
+def test_search_ranks_and_highlights(
+        search_posts: dict, unlogged_client: Client
+):
+    response = search(unlogged_client, "велосипед")
+    assert response.status_code == 200
+    posts = [post for post, _ in response.context["results"]]
+    assert posts == [search_posts["title"], search_posts["text"]], (
+        "Убедитесь, что поиск находит посты по заголовку и тексту"
+        " и ставит совпадения в заголовке выше."
+    )
+    content = response.content.decode("utf-8")
+    assert "<mark>Велосипедный</mark> поход" in content, (
+        "Убедитесь, что найденные слова подсвечиваются тегом <mark>."
+    )
+    assert search_posts["other"].title not in content
+
+
+def test_search_respects_visibility(
+        search_posts: dict, unlogged_client: Client
+):
+    hidden = search_posts["title"]
+    hidden.is_published = False
+    hidden.save()
+    posts = [post for post, _ in search(
+        unlogged_client, "велосипед").context["results"]]
+    assert hidden not in posts, (
+        "Убедитесь, что поиск не показывает снятые с публикации посты."
+    )
+
+
+def test_search_index_follows_updates(
+        search_posts: dict, unlogged_client: Client
+):
+    post = search_posts["other"]
+    post.text = "Пирог с вишней и самокатом."
+    post.save()
+    call_command("process_search_index", verbosity=0)
+    assert [p for p, _ in search(
+        unlogged_client, "самокат").context["results"]] == [post]
+    post.delete()
+    call_command("process_search_index", verbosity=0)
+    assert not search(unlogged_client, "самокат").context["results"]
+
+
+def test_search_query_is_escaped(
+        search_posts: dict, unlogged_client: Client
+):
+    for query in ['"', "NEAR(", "title:*", "<script>", "AND OR"]:
+        response = search(unlogged_client, query)
+        assert response.status_code == 200, (
+            f"Убедитесь, что запрос `{query}` не ломает поиск."
+        )
+    assert "<script>" not in search(
+        unlogged_client, "<script>").content.decode("utf-8")
+
+
+def test_rebuild_search_index(
+        search_posts: dict, unlogged_client: Client, django_user_model
+):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO blog_post_search(blog_post_search)"
+            " VALUES ('delete-all')")
+        for table in ("searchterm", "searchtrigram", "searchdocument"):
+            cursor.execute(f"DELETE FROM blog_{table}")
+    assert not search(unlogged_client, "велосипед").context["results"]
+    call_command("rebuild_search_index", optimize=True)
+    assert len(search(unlogged_client, "велосипед").context["results"]) == 2
@@ -0,0 +1,140 @@
+from contextlib import nullcontext
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.test.client import Client
+
+from blog.models import SearchDocument, SearchIndexJob, SearchTerm
+from blog.search_index import (
+    build_index, decode, encode, rebuild, search, Searcher)
+from blog.stemmer import stem
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("молоко", "молок"),
+        ("молока", "молок"),
+        ("молоком", "молок"),
+        ("важнейшими", "важн"),
+        ("вдохновенность", "вдохновен"),
+        ("взяться", "взят"),
+        ("видевшими", "видевш"),
+        ("Ёлки", "елк"),
+    ],
+)
+def test_russian_stemmer(word: str, expected: str):
+    assert stem(word) == expected, (
+        f"Убедитесь, что основа слова «{word}» — «{expected}»."
+    )
+
+
+def test_postings_are_compact():
+    values = [2, 5, 130, 131, 20000, 2 ** 40]
+    data = encode(values)
+    assert list(decode(data)) == values
+    assert len(encode(range(0, 2000, 2))) == 1000, (
+        "Убедитесь, что близкие id упаковываются в один байт."
+    )
+
+
+def test_memory_index_matches_forms_and_typos():
+    index = build_index([
+        (1, "Молоко", "Свежее молоко с фермы."),
+        (2, "Сыр", "Сделан из молока и соли."),
+        (3, "Хлеб", "Мука, вода, дрожжи."),
+    ])
+    searcher = Searcher(index)
+    assert searcher.search("молоком")[0] == [1, 2], (
+        "Убедитесь, что поиск находит другие формы слова"
+        " и ставит совпадение в заголовке выше."
+    )
+    assert searcher.search("малоко")[0] == [1, 2], (
+        "Убедитесь, что поиск исправляет опечатки по триграммам."
+    )
+    assert searcher.search("дрожжи молоко")[0] == []
+
+
+def process_queue():
+    call_command("process_search_index", verbosity=0)
+
+
+def test_index_follows_post_changes(published_post):
+    post = published_post(title="Прогулка", text="Гуляли по набережной.")
+    assert search("набережная")[0] == [], (
+        "Убедитесь, что сохранение поста только ставит его в очередь,"
+        " а индекс обновляет воркер."
+    )
+    assert SearchIndexJob.objects.filter(post_id=post.pk).exists()
+    process_queue()
+    assert search("набережная")[0] == [post.pk]
+    assert not SearchIndexJob.objects.exists()
+
+    post.text = "Катались на велосипедах."
+    post.save()
+    process_queue()
+    assert search("набережная")[0] == []
+    assert search("велосипед")[0] == [post.pk]
+    assert SearchTerm.objects.get(term="набережн").document_count == 0
+
+    post.delete()
+    process_queue()
+    assert search("велосипед")[0] == []
+    assert not SearchDocument.objects.filter(pk=post.pk).exists()
+
+
+def test_queue_applies_batches(published_post):
+    posts = [published_post(title=f"Поход {number}", text="Шли вдоль реки.")
+             for number in range(5)]
+    posts[0].text = "Плыли по озеру."
+    posts[0].save()
+    posts[1].delete()
+    process_queue()
+    incremental = (search("река"), search("озеро"))
+    assert incremental[0][0] == sorted(
+        (post.pk for post in posts[2:]), reverse=True)
+    assert incremental[1][0] == [posts[0].pk]
+    rebuild()
+    assert (search("река"), search("озеро")) == incremental, (
+        "Убедитесь, что пачка из очереди даёт тот же индекс,"
+        " что и полная перестройка."
+    )
+
+
+def test_rebuild_matches_incremental_index(published_post):
+    published_post(title="Молоко", text="Свежее молоко.")
+    published_post(title="Сыр", text="Из молока.")
+    process_queue()
+    incremental = search("молоко")
+    rebuild()
+    assert search("молоко") == incremental
+
+
+@override_settings(SEARCH_BACKEND="index")
+def test_search_page_corrects_typos(published_post, unlogged_client: Client):
+    post = published_post(title="Рецепт", text="Блины на молоке.")
+    process_queue()
+    response = unlogged_client.get("/search/", {"q": "малоко"})
+    assert [p for p, _ in response.context["results"]] == [post]
+    assert "<mark>молоке</mark>" in response.content.decode("utf-8"), (
+        "Убедитесь, что исправленное слово подсвечивается во фрагменте."
+    )
+
+
+def test_benchmark_command(capsys, monkeypatch):
+    # Тест уже работает в отдельной базе.
+    monkeypatch.setattr(
+        "blog.management.commands.benchmark_search.temporary_database",
+        nullcontext)
+    call_command("benchmark_search", posts=300, queries=3, roots=200)
+    report = capsys.readouterr().out
+    assert "LIKE" in report and "индекс" in report, (
+        "Убедитесь, что benchmark_search сравнивает индекс с LIKE."
+    )
+    assert SearchTerm.objects.exists(), (
+        "Убедитесь, что benchmark_search меряет индекс, записанный"
+        " в таблицы SearchTerm и SearchTrigram, как на сайте."
+    )
@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import override_settings
+from django.test.client import Client
+
+from core.timing import ServerTimingMiddleware
+from query_budget import QueryLog
+
+pytestmark = [pytest.mark.django_db]
+
+METRIC_RE = re.compile(r'(\w+);dur=([\d.]+);desc="([^"]*)"')
+
+
+def parse(header: str) -> dict:
+    return {
+        name: (float(duration), description)
+        for name, duration, description in METRIC_RE.findall(header)
+    }
+
+
+@pytest.fixture
+def feed(published_post):
+    return published_post(3)
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+def test_server_timing_breakdown(feed, caplog):
+    client = Client()
+    with QueryLog() as log, caplog.at_level(logging.INFO, "core.timing"):
+        response = client.get("/")
+    metrics = parse(response["Server-Timing"])
+    assert set(metrics) == {"db", "tpl", "view", "mw", "total"}, (
+        "Убедитесь, что заголовок Server-Timing содержит время SQL, "
+        "шаблонов, представления, middleware и всего запроса."
+    )
+    assert metrics["db"][1] == f"{len(log)} queries"
+    assert metrics["tpl"][0] > 0
+    parts = sum(metrics[name][0] for name in ("db", "tpl", "view", "mw"))
+    assert abs(metrics["total"][0] - parts) < 0.1, (
+        "Убедитесь, что части разбивки не пересекаются и вместе дают"
+        " время всего запроса."
+    )
+    assert all(duration >= 0 for duration, _ in metrics.values())
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:index"
+    assert record["status"] == 200
+    assert record["queries"] == len(log)
+    assert record["total_ms"] == metrics["total"][0]
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1)
+def test_cached_page_skips_database_and_templates(feed):
+    client = Client()
+    client.get("/")
+    metrics = parse(client.get("/")["Server-Timing"])
+    assert metrics["db"] == (0.0, "0 queries")
+    assert metrics["tpl"][0] == 0.0, (
+        "Убедитесь, что страница из кэша не отрисовывает шаблоны."
+    )
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+def test_timing_is_off_without_sampling(feed, caplog):
+    with caplog.at_level(logging.INFO, "core.timing"):
+        response = Client().get("/")
+    assert "Server-Timing" not in response
+    assert not caplog.records
+
+
+def test_timing_covers_other_middleware():
+    assert settings.MIDDLEWARE[0] == "core.timing.ServerTimingMiddleware", (
+        "Убедитесь, что ServerTimingMiddleware стоит в MIDDLEWARE первым"
+        " и замеряет время остальных middleware."
+    )
+
+
+@override_settings(REQUEST_TIMING_SAMPLE_RATE=1, DEBUG=True)
+def test_timing_skipped_while_toolbar_is_shown(rf):
+    middleware = ServerTimingMiddleware(lambda request: HttpResponse())
+    shown = middleware(rf.get("/", REMOTE_ADDR="127.0.0.1"))
+    hidden = middleware(rf.get("/", REMOTE_ADDR="10.0.0.1"))
+    assert "Server-Timing" not in shown, (
+        "Убедитесь, что запросы с панелью django-debug-toolbar "
+        "не замеряются: её SQL и шаблоны исказили бы разбивку."
+    )
+    assert "Server-Timing" in hidden
@@ -0,0 +1,108 @@
+import gzip
+import re
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.test.client import Client
+
+STORAGE = "core.storage.CompressedManifestStaticFilesStorage"
+
+
+@pytest.fixture
+def collected(tmp_path):
+    with override_settings(
+        STATIC_ROOT=str(tmp_path / "static"), STATICFILES_STORAGE=STORAGE
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        yield tmp_path / "static"
+
+
+def bootstrap_url(client: Client) -> str:
+    content = client.get("/").content.decode("utf-8")
+    match = re.search(
+        r'href="(/static/css/bootstrap\.pruned\.min\.\w+\.css)"', content)
+    assert match, (
+        "Убедитесь, что Bootstrap подключается из локальной статики"
+        " по имени с хэшем содержимого."
+    )
+    return match.group(1)
+
+
+@pytest.mark.django_db
+def test_collectstatic_writes_compressed_siblings(
+        collected, client: Client
+):
+    url = bootstrap_url(client)
+    hashed = collected / url[len("/static/"):]
+    original = hashed.read_bytes()
+    compressed = hashed.with_name(hashed.name + ".gz")
+    assert compressed.exists(), (
+        "Убедитесь, что collectstatic сохраняет рядом с CSS копию .gz."
+    )
+    assert gzip.decompress(compressed.read_bytes()) == original
+    assert not (collected / "img" / "logo.png.gz").exists(), (
+        "Убедитесь, что уже сжатые изображения не сжимаются повторно."
+    )
+
+
+@pytest.mark.django_db
+def test_static_served_by_accept_encoding(collected, client: Client):
+    url = bootstrap_url(client)
+    original = (collected / url[len("/static/"):]).read_bytes()
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что клиенту, принимающему gzip, отдаётся сжатая копия."
+    )
+    assert response["Content-Type"].startswith("text/css")
+    assert "Accept-Encoding" in response["Vary"]
+    assert "immutable" in response["Cache-Control"]
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body) == original
+
+    plain = client.get(url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+    assert "Content-Encoding" not in plain
+    assert b"".join(plain.streaming_content) == original
+
+    unhashed = client.get("/static/css/bootstrap.pruned.min.css")
+    assert "immutable" not in unhashed["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_pages_render_with_manifest_storage(
+        collected, post_with_published_location, user_client: Client
+):
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    from core.storage import CompressedManifestStaticFilesStorage
+
+    assert isinstance(
+        staticfiles_storage._wrapped, CompressedManifestStaticFilesStorage)
+    post = post_with_published_location
+    urls = [
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        "/posts/create/",
+        "/search/?q=пост",
+        "/pages/about/",
+        "/pages/rules/",
+    ]
+    for url in urls:
+        response = user_client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` отрисовывается после"
+            " collectstatic с хранилищем из настроек."
+        )
+        links = re.findall(
+            r'(?:href|src)="/static/([^"]+)"', response.content.decode())
+        assert links
+        for link in links:
+            assert re.search(r"\.[0-9a-f]{12}\.\w+$", link), (
+                f"Убедитесь, что `{link}` на странице `{url}` подключается"
+                " по имени с хэшем содержимого."
+            )
+            assert (collected / link).exists()
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from mixer.backend.django import Mixer
+
+from blog import transfer
+from blog.models import Comment, Post
+from blog.search_index import search
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blog_data(mixer: Mixer, published_post, another_user):
+    posts = published_post(7, title=mixer.sequence("Поход {0}"))
+    for post in posts:
+        mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    return posts
+
+
+def snapshot():
+    return [
+        serializers.serialize("python", model.objects.order_by("pk"))
+        for model in map(transfer.apps.get_model, transfer.MODELS)
+    ]
+
+
+def flush():
+    call_command("flush", interactive=False, verbosity=0)
+
+
+def test_round_trip(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl.gz"
+    before = snapshot()
+    call_command("export_blog", str(path))
+    flush()
+    call_command("import_blog", str(path), batch_size=4)
+    assert snapshot() == before, (
+        "Убедитесь, что import_blog восстанавливает ровно то, что "
+        "выгрузил export_blog."
+    )
+    ids, _ = search("поход")
+    assert len(ids) == len(blog_data), (
+        "Убедитесь, что после import_blog индекс поиска перестроен."
+    )
+    assert not transfer.progress_path(path).exists()
+    new_post = Post.objects.create(
+        title="Новый", text="Текст", author=blog_data[0].author,
+        pub_date=blog_data[0].pub_date)
+    assert new_post.pk > max(post.pk for post in blog_data)
+
+
+def test_file_is_ordered_for_foreign_keys(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    transfer.export(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    header = json.loads(lines[0])
+    assert header["format"] == transfer.FORMAT
+    models = [json.loads(line)["model"] for line in lines[1:]]
+    order = [transfer.MODELS.index(model) for model in models]
+    assert order == sorted(order), (
+        "Убедитесь, что объекты в выгрузке идут так, что ссылки "
+        "указывают только на уже загруженные."
+    )
+
+
+@pytest.mark.parametrize("failing", ["insert", "save_progress"])
+def test_resume_after_interruption(
+        blog_data, tmp_path, monkeypatch, failing: str
+):
+    path = tmp_path / "blog.jsonl"
+    transfer.export(path)
+    expected = (Post.objects.count(), Comment.objects.count())
+    flush()
+    original = getattr(transfer, failing)
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 4:
+            raise OSError("Соединение потеряно")
+        return original(*args, **kwargs)
+
+    # Сбой до коммита пачки или сразу после него, до записи прогресса.
+    monkeypatch.setattr(transfer, failing, interrupted)
+    with pytest.raises(CommandError, match="--resume"):
+        call_command("import_blog", str(path), batch_size=3)
+    assert transfer.progress_path(path).exists()
+    monkeypatch.setattr(transfer, failing, original)
+    call_command("import_blog", str(path), batch_size=3, resume=True)
+    assert (Post.objects.count(), Comment.objects.count()) == expected, (
+        "Убедитесь, что import_blog --resume догружает прерванную "
+        "загрузку без повторов."
+    )
+    assert get_user_model().objects.count() == 2
+
+
+def test_rejects_unknown_format(tmp_path):
+    path = tmp_path / "db.json"
+    path.write_text('[{"model": "blog.post"}]\n', encoding="utf-8")
+    with pytest.raises(CommandError, match="формат"):
+        call_command("import_blog", str(path))
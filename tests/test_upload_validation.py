@@ -0,0 +1,130 @@
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import Model
+from django.test import override_settings
+from django.test.client import Client
+from django.utils import timezone
+
+from fixtures.images import image_file
+
+pytestmark = [pytest.mark.django_db]
+
+
+def create_post(client: Client, category: Model, location: Model, image):
+    return client.post("/posts/create/", {
+        "title": "Пост с фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "category": category.pk,
+        "location": location.pk,
+        "is_published": True,
+        "image": image,
+    })
+
+
+@pytest.mark.parametrize(
+    "reason, image",
+    [
+        # 10 000 пикселей шума не сжимаются в 1000 байт.
+        ("size", image_file(
+            (100, 100), format="PNG", mode="L", noise=True)),
+        ("format", SimpleUploadedFile(
+            "photo.jpg", b"<svg xmlns='http://www.w3.org/2000/svg'/>",
+            "image/jpeg")),
+        ("pixels", image_file((200, 100), format="PNG", mode="L")),
+        ("corrupt", SimpleUploadedFile(
+            "photo.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 64, "image/png")),
+    ],
+)
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=1000,
+                   IMAGE_UPLOAD_MAX_PIXELS=10_000)
+def test_bad_uploads_are_rejected(
+        reason: str, image, user_client: Client, published_category: Model,
+        published_location: Model
+):
+    from blog.metrics import upload_rejections
+    from blog.models import Post
+
+    response = create_post(
+        user_client, published_category, published_location, image)
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        f"Убедитесь, что загрузка отклоняется по причине `{reason}`."
+    )
+    assert not Post.objects.exists()
+    assert upload_rejections[reason].value == 1, (
+        "Убедитесь, что отклонённые загрузки учитываются в метриках."
+    )
+
+
+def test_valid_upload_is_accepted(
+        user_client: Client, published_category: Model,
+        published_location: Model
+):
+    from blog.models import Post
+
+    response = create_post(
+        user_client, published_category, published_location,
+        image_file((20, 20), format="PNG", mode="L"))
+    assert response.status_code == 302
+    assert Post.objects.get().image
+
+
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=10)
+def test_oversized_upload_is_not_written():
+    from blog.uploads import BoundedTemporaryFileUploadHandler
+
+    handler = BoundedTemporaryFileUploadHandler()
+    handler.new_file("image", "big.png", "image/png", 30)
+    offset = 0
+    for chunk in (b"x" * 8, b"y" * 8, b"z" * 14):
+        handler.receive_data_chunk(chunk, offset)
+        offset += len(chunk)
+    file = handler.file_complete(offset)
+    assert file.oversized
+    assert file.size == 30
+    assert file.read() == b"", (
+        "Убедитесь, что данные сверх лимита не сохраняются на диск."
+    )
+
+
+def test_bounded_handler_only_on_post_forms(
+        user, published_category: Model, published_location: Model
+):
+    from django.core.files.uploadhandler import MemoryFileUploadHandler
+
+    from blog.uploads import BoundedTemporaryFileUploadHandler
+
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    client.get("/posts/create/")
+    token = client.cookies["csrftoken"].value
+    response = client.post("/posts/create/", {
+        "title": "Пост с фото",
+        "text": "Текст",
+        "pub_date": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "category": published_category.pk,
+        "location": published_location.pk,
+        "is_published": True,
+        "image": image_file((20, 20), format="PNG", mode="L"),
+        "csrfmiddlewaretoken": token,
+    })
+    assert response.status_code == 302
+    handlers = response.wsgi_request.upload_handlers
+    assert isinstance(handlers[0], BoundedTemporaryFileUploadHandler), (
+        "Убедитесь, что форма поста принимает фото через"
+        " BoundedTemporaryFileUploadHandler."
+    )
+    assert client.post("/posts/create/", {}).status_code == 403, (
+        "Убедитесь, что форма поста по-прежнему проверяет CSRF."
+    )
+
+    response = client.post(
+        f"/profile/{user.username}/edit/",
+        {"username": user.username, "csrfmiddlewaretoken": token})
+    assert isinstance(
+        response.wsgi_request.upload_handlers[0], MemoryFileUploadHandler
+    ), (
+        "Убедитесь, что остальные страницы принимают файлы обработчиками"
+        " Django по умолчанию."
+    )
@@ -0,0 +1,46 @@
+import pytest
+from django.db.models import Model
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+# Два запроса уходят на сессию и пользователя, остальные — на саму
+# страницу: объект загружается один раз вместе с автором.
+PAGE_QUERIES = [
+    # Форма поста дополнительно выбирает категории и местоположения.
+    ("/posts/{post}/edit/", 5),
+    ("/posts/{post}/delete/", 3),
+    ("/posts/{post}/edit_comment/{comment}/", 3),
+    ("/posts/{post}/delete_comment/{comment}/", 3),
+    ("/posts/{post}/", 4),
+]
+
+
+@pytest.mark.parametrize("url, num_queries", PAGE_QUERIES)
+def test_author_pages_fetch_object_once(
+        url: str, num_queries: int, post_with_published_location: Model,
+        comment_to_a_post: Model, user_client: Client,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    comment = comment_to_a_post
+    comment.author = post.author
+    comment.save()
+    url = url.format(post=post.id, comment=comment.id)
+    with django_assert_num_queries(num_queries):
+        response = user_client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что автор может открыть страницу `{url}`."
+    )
+
+
+def test_comment_of_other_post_is_not_found(
+        post_with_published_location: Model, comment_to_a_post: Model,
+        mixer, user_client: Client
+):
+    other_post = mixer.blend(
+        "blog.Post", author=post_with_published_location.author)
+    comment = comment_to_a_post
+    for action in ("edit_comment", "delete_comment"):
+        url = f"/posts/{other_post.id}/{action}/{comment.id}/"
+        assert user_client.get(url).status_code == 404